@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the keystroke validation in number_entry.
+
+Types a sequence of characters into an IntEntry and a FloatEntry by calling the same
+validation code Tk calls for every keystroke, and reports how many Tcl calls and how much
+time each keystroke costs. Needs a display (on Linux CI run it under Xvfb).
+
+Usage:
+    python bench_number_entry.py [--repeat N]
+"""
+import argparse                                    # Command line parsing
+import time                                        # Timing of keystrokes
+import tkinter as tk                               # Tk root for the entries
+from number_entry import IntEntry, FloatEntry
+
+
+class TclCallCounter:
+    """Wraps a widget's Tcl interpreter and counts the calls made through it."""
+    def __init__(self, interpreter):
+        self._interpreter = interpreter
+        self.calls = 0
+
+    def call(self, *args):
+        self.calls += 1
+        return self._interpreter.call(*args)
+
+    def __getattr__(self, name):
+        return getattr(self._interpreter, name)
+
+
+def type_text(entry, text):
+    """
+    Validate the keystrokes of typing text into an empty entry, followed by a
+    backspace for every character. Returns the number of keystrokes.
+    """
+    validate = entry._NumberEntry__validate_all
+    current = ""
+    keystrokes = 0
+    # Typing
+    for ch in text:
+        proposed = current + ch
+        if validate("key", current, proposed):
+            current = proposed
+        keystrokes += 1
+    # Deleting
+    while current:
+        proposed = current[:-1]
+        validate("key", current, proposed)
+        current = proposed
+        keystrokes += 1
+    return keystrokes
+
+
+def benchmark(entry, text, repeat):
+    """Return (Tcl calls per keystroke, microseconds per keystroke)."""
+    counter = TclCallCounter(entry.tk)
+    entry.tk = counter
+    entry._NumberEntry__validate_all("focusin", "", "")
+    counter.calls = 0
+    keystrokes = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        keystrokes += type_text(entry, text)
+    elapsed = time.perf_counter() - start
+    return counter.calls / keystrokes, elapsed / keystrokes * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="how often the text is typed")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    root.withdraw()
+    cases = [
+        ("IntEntry 1-12, valid digits", IntEntry(root, lower_bound=1, upper_bound=12), "12"),
+        ("IntEntry 2-50, out of range", IntEntry(root, lower_bound=2, upper_bound=50), "1x59"),
+        ("FloatEntry 0-100, valid", FloatEntry(root, lower_bound=0.0, upper_bound=100.0), "42.125"),
+        ("FloatEntry 0-1, letters", FloatEntry(root, lower_bound=0.0, upper_bound=1.0), ".5ab7"),
+    ]
+    print(f"{'case':32} {'Tcl calls/key':>14} {'us/key':>8}")
+    for name, entry, text in cases:
+        calls, micros = benchmark(entry, text, args.repeat)
+        print(f"{name:32} {calls:14.2f} {micros:8.1f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Benchmark suite for the roll -> render -> display pipeline.
+
+Measures every stage of the hot path separately:
+
+    roll          - rolling a set like roll_single_set (memoized plan + the set's RollStream)
+    update_face   - DiceFace.update (the reused artists of the cached renderer)
+    figure_build  - creating a Figure with a dice axis (what FaceRasterizer does once)
+    canvas_draw   - canvas.draw() of a one-die Agg figure
+    rasterize     - a face cache miss (FaceRasterizer.render, PNG encoding excluded)
+    histogram     - FaceHistogram.update of a 6- and a 20-sided set (the blit to Tk excluded)
+    set_import    - validating 10,000 imported set definitions (dice_sets.validate_rows)
+    tk_show       - RenderSession.show + update_idletasks per backend (needs a display)
+    animation     - one frame of the roll animation for 12 sets of 12 dice, per backend (needs a display)
+    results_view  - show_dice_results for 1 to 12 sets (needs a display)
+    int_entry     - IntEntry/FloatEntry keystroke validation (needs a display)
+
+Stages that need a display are skipped when Tk cannot start; on Linux CI run the suite under
+Xvfb (xvfb-run python bench_pipeline.py). Results can be written as JSON and compared with a
+stored baseline; the exit code is 1 if a stage got slower than the baseline by more than the
+tolerance.
+
+Usage:
+    python bench_pipeline.py [--quick] [--json results.json] [--save-baseline baseline.json]
+                             [--baseline baseline.json] [--tolerance 0.25]
+"""
+import argparse                                    # Command line parsing
+import json                                        # Machine-readable results
+import os                                          # Temporary roll log for the GUI stages
+import platform                                    # Machine description in the results
+import runpy                                       # Loading the GUI script
+import statistics                                  # Medians of the samples
+import sys                                         # Exit code
+import tempfile                                    # Temporary roll log for the GUI stages
+import time                                        # Timing
+import numpy as np                                 # Versions and percentiles
+import matplotlib                                  # Versions
+from matplotlib.figure import Figure               # Figures for the Matplotlib stages
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # Offscreen drawing
+
+# Number of timed samples per stage (--quick uses a fifth of them)
+SAMPLES = 200
+
+
+def measure(function, samples, warmup=3):
+    """
+    Call function samples times (after a few untimed calls) and return the statistics of
+    the call durations in microseconds: median, p95, min and the number of samples.
+    """
+    for _ in range(warmup):
+        function()
+    times = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        function()
+        times.append((time.perf_counter() - start) * 1e6)
+    return {"median_us": statistics.median(times), "p95_us": float(np.percentile(times, 95)),
+            "min_us": min(times), "samples": samples}
+
+
+def bench_roll(samples):
+    """Rolling one set the way roll_single_set does, for 1, 6 and 12 dice."""
+    import dice_engine
+    import dice_expr
+    results = {}
+    for text in ("1d6", "6d6", "12d20", "4d6kh3+2", "6d10!"):
+        stream = dice_engine.RollStream(0)
+
+        def roll():
+            plan = dice_expr.compile_expression(text)
+            faces, totals = plan.evaluate(1, stream.next_generator())
+            plan.odds(int(totals[0]))
+            return faces[0].tolist()
+        results[f"roll/{text}"] = measure(roll, samples * 5)
+    return results
+
+
+def bench_matplotlib(samples):
+    """DiceFace.update, figure build, canvas.draw() and a face rasterization."""
+    from dice_render_mpl import DiceFace, FaceRasterizer
+    results = {}
+    figure = Figure(figsize=(1, 1), dpi=100)
+    canvas = FigureCanvasAgg(figure)
+    face = DiceFace(figure.add_axes([0.1, 0.1, 0.8, 0.8]))
+    for mode, use_dots, number in (("pips", True, 5), ("numeric", False, 17)):
+        results[f"update_face/{mode}"] = measure(
+            lambda: face.update(number, "white", "black", use_dots), samples)
+
+    def build():
+        new_figure = Figure(figsize=(1, 1), dpi=100)
+        FigureCanvasAgg(new_figure)
+        DiceFace(new_figure.add_axes([0.1, 0.1, 0.8, 0.8]))
+    results["figure_build"] = measure(build, samples)
+    face.update(5, "white", "black", True)
+    results["canvas_draw"] = measure(canvas.draw, samples)
+    rasterizer = FaceRasterizer()
+    results["rasterize/pips"] = measure(lambda: rasterizer.render(5, True, "white", "black", 80), samples)
+    results["rasterize/numeric"] = measure(lambda: rasterizer.render(17, False, "white", "black", 80), samples)
+    return results
+
+
+def bench_histogram(samples):
+    """FaceHistogram.update after every roll, on an offscreen chart."""
+    from dice_histogram import FaceHistogram
+    results = {}
+    rng = np.random.default_rng(0)
+    for sides in (6, 20):
+        histogram = FaceHistogram(None, sides, 400, 100)
+        counts = [0] * (sides + 1)
+        # Start with a large y axis, so the samples measure blitting and not the rescaling
+        histogram.update([0] + [1000] * sides)
+        faces = rng.integers(1, sides + 1, size=samples * 2).tolist()
+        position = [0]
+
+        def update():
+            counts[faces[position[0] % len(faces)]] += 1
+            position[0] += 1
+            histogram.update(counts)
+        results[f"histogram/d{sides}"] = measure(update, samples)
+    return results
+
+
+def bench_set_import(samples):
+    """Validation of an imported file of 10,000 sets, as read from CSV (all values strings)."""
+    import dice_sets
+    rng = np.random.default_rng(0)
+    notations = ["", "", "", "4d6kh3+2", "3d6!"]
+    rows = [{"name": f"Table {i + 1}", "count": str(rng.integers(1, 13)), "sides": str(rng.choice([4, 6, 8, 20])),
+             "dice_color": "white", "number_color": "#000000", "notation": notations[i % len(notations)]}
+            for i in range(10_000)]
+    return {"set_import/10000": measure(lambda: dice_sets.validate_rows(rows), max(5, samples // 20), warmup=1)}
+
+
+def bench_tk_show(root, samples):
+    """RenderSession.show followed by update_idletasks, per backend, for 1, 6 and 12 dice."""
+    import tkinter as tk
+    import dice_render
+    from dice_render_mpl import FaceCache
+    face_cache = FaceCache()
+    results = {}
+    rng = np.random.default_rng(0)
+    for backend in dice_render.BACKENDS:
+        for count in (1, 6, 12):
+            frame = tk.Frame(root)
+            frame.pack()
+            session = dice_render.create_session(backend, frame, 400, 300, face_cache)
+            rolls = rng.integers(1, 7, size=(64, count)).tolist()
+            position = [0]
+
+            def show():
+                session.show(rolls[position[0] % len(rolls)], "white", "black", True)
+                root.update_idletasks()
+                position[0] += 1
+            results[f"tk_show/{backend}/{count}"] = measure(show, samples)
+            session.close()
+            frame.destroy()
+    return results
+
+
+def bench_animation(root, samples):
+    """One frame of the roll animation (show_faces of 12 sets of 12 dice + update_idletasks), per backend."""
+    import tkinter as tk
+    import dice_render
+    import dice_animation
+    from dice_render_mpl import FaceCache
+    face_cache = FaceCache()
+    faces = dice_animation.tumble_faces(6)
+    results = {}
+    for backend in dice_render.BACKENDS:
+        frame = tk.Frame(root)
+        frame.pack()
+        sessions = [dice_render.create_session(backend, frame, 400, 300, face_cache) for _ in range(12)]
+        for session in sessions:
+            session.show([1] * 12, "white", "black", True)
+        position = [0]
+
+        def draw_frame():
+            for session in sessions:
+                session.show_faces(dice_animation.tumble_frame(faces, 12, position[0]), "white", "black", True)
+            root.update_idletasks()
+            position[0] += 1
+        # To be compared with the frame budget, dice_animation.FRAME_MS
+        results[f"animation/{backend}"] = measure(draw_frame, samples)
+        for session in sessions:
+            session.close()
+        frame.destroy()
+    return results
+
+
+def bench_results_view(samples):
+    """show_dice_results for 1 to 12 sets, with the GUI script loaded without its main loop."""
+    import tkinter as tk
+    # Keep the roll log of the benchmark away from the user's log
+    os.environ["DICEAPP_LOG"] = os.path.join(tempfile.mkdtemp(), "bench_rolls.log")
+    mainloop = tk.Misc.mainloop
+    tk.Misc.mainloop = lambda self, n=0: None
+    try:
+        namespace = runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dice-en.py"),
+                                   run_name="__main__")
+        # run_path returns a copy; the functions see the script's real globals (e.g. sets)
+        gui = namespace["show_dice_results"].__globals__
+    finally:
+        tk.Misc.mainloop = mainloop
+    gui["load_backend"]()
+    root = gui["root"]
+    results = {}
+    for n_sets in (1, 3, 6, 12):
+        gui["enter_set"].delete(0, "end")
+        gui["enter_set"].insert(0, str(n_sets))
+        gui["confirm_sets"]()
+        for i, (_, dice_count, dice_sides, _, _, _) in enumerate(gui["sets"]):
+            dice_count.delete(0, "end")
+            dice_count.insert(0, str(i % 12 + 1))
+            dice_sides.delete(0, "end")
+            dice_sides.insert(0, "6")
+
+        def show():
+            gui["show_dice_results"]()
+            root.update_idletasks()
+        results[f"results_view/{n_sets}"] = measure(show, max(5, samples // 10), warmup=1)
+        gui["show_settings"]()
+    gui["close_app"]()
+    return results
+
+
+def bench_int_entry(root, samples):
+    """Keystroke validation of IntEntry and FloatEntry (see bench_number_entry)."""
+    from number_entry import IntEntry, FloatEntry
+    from bench_number_entry import type_text
+    results = {}
+    cases = [("int_entry/valid", IntEntry(root, lower_bound=1, upper_bound=12), "12"),
+             ("int_entry/out_of_range", IntEntry(root, lower_bound=2, upper_bound=50), "1x59"),
+             ("float_entry/valid", FloatEntry(root, lower_bound=0.0, upper_bound=100.0), "42.125")]
+    for name, entry, text in cases:
+        entry._NumberEntry__validate_all("focusin", "", "")
+        keystrokes = type_text(entry, text)
+        stats = measure(lambda: type_text(entry, text), samples)
+        # Report per keystroke
+        results[name] = {key: value / keystrokes if key.endswith("_us") else value
+                         for key, value in stats.items()}
+    return results
+
+
+def run(samples):
+    """Run all stages and return the results document."""
+    results = {}
+    skipped = []
+    results.update(bench_roll(samples))
+    results.update(bench_matplotlib(samples))
+    results.update(bench_histogram(samples))
+    results.update(bench_set_import(samples))
+    import tkinter as tk
+    try:
+        root = tk.Tk()
+    except tk.TclError as error:
+        skipped.append(f"Tk stages (no display: {error})")
+    else:
+        root.withdraw()
+        results.update(bench_tk_show(root, samples))
+        results.update(bench_animation(root, samples))
+        results.update(bench_int_entry(root, samples))
+        root.destroy()
+        results.update(bench_results_view(samples))
+    return {"meta": {"python": platform.python_version(), "platform": platform.platform(),
+                     "numpy": np.__version__, "matplotlib": matplotlib.__version__,
+                     "samples": samples, "time": time.time()},
+            "skipped": skipped, "results": results}
+
+
+def compare(document, baseline, tolerance):
+    """Return the (name, baseline median, current median) of every stage that regressed."""
+    regressions = []
+    for name, stats in document["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if old and stats["median_us"] > old["median_us"] * (1 + tolerance):
+            regressions.append((name, old["median_us"], stats["median_us"]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--quick", action="store_true", help="fewer samples per stage")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--save-baseline", help="write the results as the new baseline to this file")
+    parser.add_argument("--baseline", help="compare the results with this baseline file")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown of the median before a stage counts as a regression")
+    args = parser.parse_args()
+
+    document = run(SAMPLES // 5 if args.quick else SAMPLES)
+    print(f"{'stage':28} {'median us':>11} {'p95 us':>11}")
+    for name, stats in document["results"].items():
+        print(f"{name:28} {stats['median_us']:11.1f} {stats['p95_us']:11.1f}")
+    for reason in document["skipped"]:
+        print(f"skipped: {reason}")
+    for path in (args.json, args.save_baseline):
+        if path:
+            with open(path, "w") as file:
+                json.dump(document, file, indent=2)
+    if args.baseline:
+        with open(args.baseline) as file:
+            regressions = compare(document, json.load(file), args.tolerance)
+        for name, old, new in regressions:
+            print(f"REGRESSION {name}: {old:.1f} us -> {new:.1f} us ({new / old - 1:+.0%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
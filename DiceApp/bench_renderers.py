@@ -0,0 +1,63 @@
+"""
+Benchmark of the dice rendering backends.
+
+Rolls sets of 1 to 12 dice many times and shows every roll with each backend of dice_render,
+flushing the drawing with update_idletasks, and reports the latency per roll. The first roll
+of each case (building the canvas and, for Matplotlib, filling the face cache) is reported
+separately. Needs a display (on Linux CI run it under Xvfb).
+
+Usage:
+    python bench_renderers.py [--rolls N] [--sides S] [--dots]
+"""
+import argparse                                    # Command line parsing
+import time                                        # Timing of rolls
+import tkinter as tk                               # Tk root for the sessions
+import numpy as np                                 # Random rolls
+import dice_render                                 # Rendering backends
+
+
+def benchmark(root, backend, count, sides, rolls, use_dots, face_cache):
+    """Return (milliseconds of the first roll, median and worst milliseconds of the other rolls)."""
+    frame = tk.Frame(root)
+    frame.pack()
+    session = dice_render.create_session(backend, frame, 400, 300, face_cache)
+    rng = np.random.default_rng(0)
+    all_rolls = rng.integers(1, sides + 1, size=(rolls + 1, count)).tolist()
+    times = []
+    for roll in all_rolls:
+        start = time.perf_counter()
+        session.show(roll, "white", "black", use_dots)
+        root.update_idletasks()
+        times.append((time.perf_counter() - start) * 1000)
+    session.close()
+    frame.destroy()
+    return times[0], float(np.median(times[1:])), max(times[1:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rolls", type=int, default=200, help="number of rolls per case")
+    parser.add_argument("--sides", type=int, default=6, help="number of sides of the dice")
+    parser.add_argument("--dots", action="store_true", help="show pips instead of numbers")
+    args = parser.parse_args()
+
+    root = tk.Tk()
+    face_cache = None
+    try:
+        from dice_render_mpl import FaceCache
+        face_cache = FaceCache()
+        backends = dice_render.BACKENDS
+    except ImportError:
+        # Without Matplotlib only the native backend can be measured
+        backends = ("tk",)
+    print(f"{'backend':12} {'dice':>4} {'first ms':>9} {'median ms':>10} {'max ms':>8}")
+    for backend in backends:
+        for count in (1, 3, 6, 12):
+            first, median, worst = benchmark(root, backend, count, args.sides, args.rolls,
+                                             args.dots, face_cache)
+            print(f"{backend:12} {count:4} {first:9.2f} {median:10.3f} {worst:8.2f}")
+    root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Load test of the local roll service (dice_server.py).
+
+Opens a number of keep-alive connections and sends GET /roll requests on all of them at once
+for a fixed time, then reports the throughput, the latency percentiles and how many requests
+the service handled per batch. Unless --address is given, a service is started in a
+subprocess on a free port and stopped afterwards.
+
+Usage:
+    python bench_server.py [--connections 64] [--seconds 5] [--dice 3d6] [--sets 12]
+                           [--address 127.0.0.1:8765] [--simulate 0]
+"""
+import argparse                                    # Command line parsing
+import asyncio                                     # Concurrent client connections
+import json                                        # Response bodies
+import os                                          # Path of the service script
+import socket                                      # Finding a free port
+import subprocess                                  # Service process
+import sys                                         # Python interpreter of the service
+import time                                        # Timing
+from urllib.parse import urlencode                 # Query strings (dice expressions contain +)
+import numpy as np                                 # Latency percentiles
+from dice_server import DEFAULT_HOST, RollClient
+
+
+def free_port():
+    """Return a TCP port on localhost that is not in use."""
+    with socket.socket() as probe:
+        probe.bind((DEFAULT_HOST, 0))
+        return probe.getsockname()[1]
+
+
+def start_service(port):
+    """Start a roll service in a subprocess and wait until it accepts connections."""
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dice_server.py")
+    process = subprocess.Popen([sys.executable, script, "--port", str(port), "--seed", "0"],
+                               stdout=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((DEFAULT_HOST, port), timeout=0.1).close()
+            return process
+        except OSError:
+            time.sleep(0.05)
+    process.kill()
+    raise RuntimeError("the roll service did not start")
+
+
+async def client(host, port, paths, stop_time, latencies, errors):
+    """Send requests over one keep-alive connection until stop_time."""
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    while time.perf_counter() < stop_time:
+        path = paths[i % len(paths)]
+        i += 1
+        start = time.perf_counter()
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        length = int(head.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+        body = await reader.readexactly(length)
+        latencies.append(time.perf_counter() - start)
+        if not head.startswith(b"HTTP/1.1 200"):
+            errors.append(json.loads(body).get("error"))
+    writer.close()
+
+
+async def load(host, port, connections, seconds, paths):
+    """Run the clients and return (latencies in seconds, error messages)."""
+    latencies = []
+    errors = []
+    stop_time = time.perf_counter() + seconds
+    await asyncio.gather(*(client(host, port, paths[i::connections] or paths, stop_time, latencies, errors)
+                           for i in range(connections)))
+    return latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=int, default=64, help="number of concurrent connections")
+    parser.add_argument("--seconds", type=float, default=5.0, help="duration of the test")
+    parser.add_argument("--dice", default="3d6", help="dice expression to roll")
+    parser.add_argument("--sets", type=int, default=12, help="number of sets the requests are spread over")
+    parser.add_argument("--simulate", type=int, default=0,
+                        help="request simulations of this many rolls instead of single rolls")
+    parser.add_argument("--address", help="host:port of a running service (default: start one)")
+    args = parser.parse_args()
+
+    process = None
+    if args.address:
+        client_of_service = RollClient(args.address)
+    else:
+        port = free_port()
+        process = start_service(port)
+        client_of_service = RollClient(f"{DEFAULT_HOST}:{port}")
+    try:
+        if args.simulate:
+            paths = [f"/simulate?{urlencode({'dice': args.dice, 'rolls': args.simulate})}"]
+        else:
+            paths = [f"/roll?{urlencode({'set': i, 'dice': args.dice})}" for i in range(args.sets)]
+        latencies, errors = asyncio.run(load(client_of_service.host, client_of_service.port,
+                                             args.connections, args.seconds, paths))
+        status = client_of_service.status()
+    finally:
+        client_of_service.close()
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies_ms = np.array(latencies) * 1000
+    batches = status["simulate_batches" if args.simulate else "roll_batches"]
+    print(f"{len(latencies)} requests in {args.seconds:.1f} s over {args.connections} connections: "
+          f"{len(latencies) / args.seconds:.0f} requests/s")
+    print(f"latency p50 {np.percentile(latencies_ms, 50):.2f} ms  p95 {np.percentile(latencies_ms, 95):.2f} ms"
+          f"  p99 {np.percentile(latencies_ms, 99):.2f} ms")
+    print(f"batches {batches['batches']}, mean {batches['mean']:.1f} requests, largest {batches['largest']}")
+    if errors:
+        print(f"{len(errors)} errors, e.g. {errors[0]}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
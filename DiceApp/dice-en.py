@@ -1,17 +1,26 @@
-<<<<<<< HEAD
 """
 Dice Roller GUI with Tkinter and Matplotlib.
 
 This application allows the user to define multiple sets of dice. Each set can have a specified number of dice and a chosen number of sides per dice. The user can roll each set individually. For dice with 2 to 6 sides, the result is shown with traditional pip dots; for dice with more than 6 sides, the numerical result is displayed.
 
-The code uses Tkinter for the user interface, Matplotlib for rendering dice faces, and a custom IntEntry widget (from number_entry module) to ensure numeric input within valid ranges.
+Instead of a count and sides, a set can also be given in dice notation, e.g. 4d6kh3+2 (keep highest/lowest, exploding dice "!" and modifiers; see dice_expr).
+
+The code uses Tkinter for the user interface, Matplotlib for rendering dice faces (rasterized once and cached), and a custom IntEntry widget (from number_entry module) to ensure numeric input within valid ranges.
 """
+import time                                        # Timing for the startup report
+# Start of the startup timing (taken before the other imports so they are included)
+startup_begin = time.perf_counter()
+import os                                          # Environment variable for the startup report
+import sys                                         # Standard error stream for the startup report
+import threading                                   # Background warm-up of the rendering backend
 import tkinter as tk                               # Tkinter for GUI elements
-from tkinter import Frame, Label, Button, Entry, messagebox, colorchooser  # Common Tkinter widgets and dialogs
-import random                                      # Random for dice rolls
+from tkinter import Frame, Label, Button, Entry, messagebox, colorchooser, filedialog  # Common Tkinter widgets and dialogs
 import math                                        # Math for calculations (e.g. ceil)
-import matplotlib.pyplot as plt                    # Matplotlib for drawing dice faces
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # To embed Matplotlib figures in Tkinter
+import dice_perf                                   # Opt-in hot-path timing (DICEAPP_PERF)
+import dice_sets                                   # Widget-free set configurations and bulk import
+import dice_animation                              # Frame-budgeted roll animation
+# The rendering backend (dice_render, optionally with Matplotlib) and the roll engine (dice_engine,
+# dice_stats with NumPy) are not needed by the settings view, so they are imported lazily by load_backend().
 
 # Try to import the custom integer entry widget (IntEntry) for numeric inputs
 try:
@@ -21,531 +30,759 @@ except ImportError:
     messagebox.showerror("Error", "Required module 'number_entry' is missing.")
     exit()
 
+# Largest number of sets (the results view only builds widgets for the sets in view)
+MAX_SETS = 999
+# Space in pixels between the cells of the results view
+CELL_PADDING = 10
+
 # Global variables for cell dimensions (used when drawing dice faces in result frames)
 cell_width = 0
 cell_height = 0
-# Factors defining what portion of each cell's width and height is used for drawing the dice
-dice_area_width_factor = 0.9    # use 90% of cell width for dice graphics
-dice_area_height_factor = 0.5   # use 50% of cell height for dice graphics
-
-def draw_dice_face(ax, number, dice_color, text_color, use_dots=False):
+# If True, the cell of every plain set shows a live histogram of its face counts (see
+# dice_histogram); toggled in the results view, preset with the DICEAPP_HISTOGRAMS environment variable
+show_histograms = os.environ.get("DICEAPP_HISTOGRAMS", "") not in ("", "0")
+# Height of the histogram strip as a fraction of the cell height
+HISTOGRAM_FRACTION = 0.25
+# If True, the dice of a set tumble for a moment before its roll is shown (see dice_animation);
+# toggled in the results view, preset with the DICEAPP_ANIMATE environment variable
+animate_rolls = os.environ.get("DICEAPP_ANIMATE", "") not in ("", "0")
+# RollAnimator that runs the animations of all sets, created with the first animation
+roll_animator = None
+# Scrollable canvas of the results view and its number of columns, set by show_dice_results
+results_canvas = None
+results_scrollbar = None
+results_columns = 1
+# Number of rows of cells that fit in the results view (the cell height is its height divided by this)
+results_rows = 1
+# Pending relayout of the results view after it was resized (see on_results_configure)
+resize_job = None
+# Delay in milliseconds after the last resize event before the results view is laid out again
+RESIZE_DEBOUNCE_MS = 150
+# Cells of the sets that are currently visible in the results view, by set index
+result_cells = {}
+# Last roll of every set in the results view, by set index, so a set that is scrolled back
+# into view can be redrawn without widgets for offscreen sets
+last_rolls = {}
+# Roll history of each set, by set index (kept while the set configuration stays the same)
+roll_histories = {}
+# Number of imported sets that get a configuration panel in the settings view (the others are
+# only kept as values until they are shown in the results view)
+IMPORT_PANELS = 12
+# Number of invalid rows listed when an import fails
+IMPORT_ERRORS_SHOWN = 10
+# Pool of set configuration panels, created on demand by confirm_sets and never destroyed
+set_panels = []
+# Rendering backend of the dice faces: "tk" (native canvas items) or "matplotlib" (cached
+# Matplotlib images), chosen with the DICEAPP_RENDERER environment variable
+render_backend = os.environ.get("DICEAPP_RENDERER", "tk")
+# Cache of rasterized dice faces shared by all sets (keyed by pixel size, so faces of an old
+# cell size simply age out), created by load_backend() for the "matplotlib" backend only
+face_cache = None
+# Seed of this session's roll streams, from the DICEAPP_SEED environment variable or fresh
+# entropy (set by load_backend(); shown in the results view so rolls can be replayed)
+session_seed = None
+# Reproducible random stream of every set, by set index (see roll_stream); only used by the worker
+roll_streams = {}
+# Worker thread that rolls sets and rasterizes their faces off the Tk thread, created by load_backend()
+roll_worker = None
+# Functions to call in the Tk thread when a worker job is done, by (key, generation)
+worker_callbacks = {}
+# Number of the latest submitted roll job (counts the jobs of all keys), the number of every
+# pending job by (key, generation), and the number of the job whose roll is in last_rolls, by
+# set index; a set's roll from an older job than the one shown is never shown
+roll_sequence = 0
+worker_sequences = {}
+last_roll_sequences = {}
+# True while poll_worker is scheduled
+worker_polling = False
+# Interval in milliseconds in which the Tk thread checks for finished worker jobs
+WORKER_POLL_MS = 15
+# Address (host:port) of a roll service (dice_server.py) that rolls for this display instead of
+# the local streams, from the DICEAPP_SERVER environment variable
+roll_server_address = os.environ.get("DICEAPP_SERVER")
+# Client of that service, created by load_backend(); only used by the worker thread
+roll_client = None
+# FaceRasterizer of the worker thread (Matplotlib backend only), created on first use
+worker_rasterizer = None
+# On-disk log of every roll (survives restarts), opened by load_backend()
+roll_log = None
+# Path of the roll log (can be changed with the DICEAPP_LOG environment variable)
+roll_log_path = os.environ.get("DICEAPP_LOG",
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), "dice_rolls.log"))
+# Makes sure the backend is loaded only once, even while the warm-up thread is still running
+backend_lock = threading.Lock()
+# Startup timings in seconds, printed if the DICEAPP_STARTUP_REPORT environment variable is set
+startup_times = {}
+# Status bar of the results view with the hot-path timings (only if DICEAPP_PERF is set)
+perf_label = None
+# Refresh interval of the timings in the status bar in milliseconds
+PERF_REFRESH_MS = 1000
+
+def load_backend():
     """
-    Draw a single dice face on the given Matplotlib axis.
-
-    Parameters:
-        ax         - Matplotlib axis on which to draw
-        number     - The rolled number to display
-        dice_color - Background color of the dice face
-        text_color - Color for the number or the pips (dots)
-        use_dots   - If True, draw a pip pattern (standard dice pips) instead of a number
-    """
-    # Clear any previous content on this axis
-    ax.clear()
-    # Remove ticks for a cleaner look
-    ax.set_xticks([])
-    ax.set_yticks([])
-    # Fix the axis limits to a 0.5x0.5 square (for consistent scaling)
-    ax.set_xlim(0, 0.5)
-    ax.set_ylim(0, 0.5)
-    # Set the background color of the dice face
-    ax.set_facecolor(dice_color)
-
-    if use_dots:
-        # Pip layouts for dice faces 1 through 6
-        pip_positions = {
-            1: [(0.25, 0.25)],  # center pip
-            2: [(0.1, 0.4), (0.4, 0.1)],  # two pips (diagonal)
-            3: [(0.1, 0.4), (0.25, 0.25), (0.4, 0.1)],  # three pips (two diagonal + center)
-            4: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1)],  # four corner pips
-            5: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1), (0.25, 0.25)],  # four corners + center
-            6: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.25), (0.4, 0.25), (0.1, 0.1), (0.4, 0.1)]  # six pips (three per column)
-        }
-        # Get the pip layout for the rolled number (default to single center pip if number not in dict)
-        dots = pip_positions.get(number, [(0.25, 0.25)])
-        # Draw each pip as a small filled circle
-        for (x, y) in dots:
-            circle = plt.Circle((x, y), 0.04, color=text_color)
-            ax.add_artist(circle)
-    else:
-        # If not using pips, display the number as text in the center of the face
-        ax.text(0.25, 0.25, str(number), fontsize=16, ha='center', va='center',
-                fontweight='bold', color=text_color)
+    Import the rendering backend and the roll engine, and create the random number generator
+    and, for the Matplotlib backend, the face cache. Only the first call does any work.
 
-def roll_single_set(result_frame, dice_count, dice_sides, set_name, dice_color, number_color):
+    A background thread calls this while the user fills in the settings, so usually the
+    backend is ready before show_dice_results needs it.
     """
-    Roll a single set of dice and display the results in the UI.
-
-    Parameters:
-        result_frame - The Tkinter frame where the dice images will be displayed
-        dice_count   - IntEntry widget for the number of dice to roll
-        dice_sides   - IntEntry widget for the number of sides on each die
-        set_name     - Name of the set (string used for labeling purposes)
-        dice_color   - Background color for the dice faces
-        number_color - Color for the numbers or pips on the dice
+    global face_cache, session_seed, roll_log, roll_worker, roll_client
+    with backend_lock:
+        if session_seed is not None:
+            return
+        start = time.perf_counter()
+        import dice_engine
+        import dice_expr  # noqa: F401  (preload in the warm-up thread, with dice_stats)
+        from dice_log import RollLog
+        # render_backend was already checked by check_render_backend in the Tk thread
+        if render_backend == "matplotlib":
+            from dice_render_mpl import FaceCache
+            face_cache = FaceCache()
+        roll_log = RollLog(roll_log_path)
+        if roll_server_address:
+            from dice_server import RollClient
+            roll_client = RollClient(roll_server_address)
+            try:
+                # All displays of the service share its seed and its streams
+                session_seed = roll_client.status()["seed"]
+            except (ConnectionError, ValueError) as error:
+                print(f"{error}; rolling locally", file=sys.stderr)
+                roll_client = None
+        if roll_client is None:
+            seed = os.environ.get("DICEAPP_SEED")
+            session_seed = dice_engine.RollStream(int(seed) if seed else None).seed
+        from dice_worker import CoalescingWorker
+        roll_worker = CoalescingWorker()
+        startup_times["backend load"] = time.perf_counter() - start
+
+def check_render_backend():
     """
-    # Remove any previous results from this frame
-    for widget in result_frame.winfo_children():
-        widget.destroy()
-    try:
-        # Retrieve the user-specified number of sides and dice count
-        sides_val = dice_sides.get()
-        count_val = dice_count.get()
-        # Validate the input ranges (Sides must be 2-50, Dice Count 1-12)
-        if not (2 <= sides_val <= 50) or not (1 <= count_val <= 12):
-            raise ValueError
-        # Generate random rolls for the given number of dice and sides
-        rolls = [random.randint(1, sides_val) for _ in range(count_val)]
-    except ValueError:
-        # If inputs are invalid, show an error dialog and abort rolling
-        messagebox.showerror("Input Error", "Please enter valid values for sides (2-50) and dice count (1-12).")
-        return
+    Fall back to the default rendering backend, with a message, if DICEAPP_RENDERER names an
+    unknown one. Called in the Tk thread before the warm-up thread starts, so the error is not
+    lost in that thread.
+    """
+    global render_backend
+    import dice_render
+    if render_backend not in dice_render.BACKENDS:
+        messagebox.showwarning("Renderer", f"Unknown rendering backend {render_backend!r} in DICEAPP_RENDERER"
+                               f" (expected one of {', '.join(dice_render.BACKENDS)}); using"
+                               f" {dice_render.DEFAULT_BACKEND!r}.")
+        render_backend = dice_render.DEFAULT_BACKEND
+
+def report_first_paint(event):
+    """
+    Record the time of the first paint of the main window and print the startup report
+    once the pending drawing is done.
+    """
+    root.unbind("<Expose>")
+    startup_times["first paint"] = time.perf_counter() - startup_begin
+    root.after_idle(print_startup_report)
 
-    # Determine layout for dice faces: up to 6 dice per row
-    dice_cols = min(6, count_val)
-    # Number of rows needed based on how many dice (6 per row maximum)
-    dice_rows = math.ceil(count_val / 6)
-
-    # Calculate an appropriate dice image size (in pixels) based on current window size and defined factors
-    die_size_pixels = min((cell_width * dice_area_width_factor) / dice_cols,
-                          (cell_height * dice_area_height_factor) / dice_rows)
-    # Convert pixel size to inches for Matplotlib (assuming 100 dpi for simplicity: 1 inch = 100 pixels)
-    fig_width = (die_size_pixels * dice_cols) / 100
-    fig_height = (die_size_pixels * dice_rows) / 100
-
-    # Create a Matplotlib figure with a grid of subplots to represent dice faces
-    fig, axes = plt.subplots(dice_rows, dice_cols, figsize=(fig_width, fig_height), dpi=100)
-    # Flatten the axes array into a simple list for easy iteration
-    if dice_rows * dice_cols == 1:
-        axes = [axes]
-    elif dice_rows == 1 or dice_cols == 1:
-        axes = list(axes)
-    else:
-        axes = [ax for row in axes for ax in row]
-
-    # Use pip (dot) representation if the dice have 6 or fewer sides, otherwise use numeric
-    use_dots = (sides_val <= 6)
-    # Draw each rolled dice face on its corresponding subplot
-    for ax, roll in zip(axes, rolls):
-        draw_dice_face(ax, roll, dice_color, number_color, use_dots=use_dots)
-    # If there are more subplot axes than dice (which can happen if count_val is not a multiple of dice_cols), hide the extras
-    for ax in axes[len(rolls):]:
-        ax.set_visible(False)
-
-    # Embed the Matplotlib figure (dice images) into the Tkinter result frame
-    canvas = FigureCanvasTkAgg(fig, master=result_frame)
-    canvas.get_tk_widget().pack(pady=5)
-    canvas.draw()
-
-    # If more than one die was rolled, also display the sum of all dice at the bottom
-    if count_val > 1:
-        total = sum(rolls)
-        Label(result_frame, text=f"Total: {total}", font=("Arial", 12, "bold")).pack(pady=5)
+def print_startup_report():
+    """Print the startup timings to standard error."""
+    parts = [f"{name} {seconds * 1000:.0f} ms" for name, seconds in startup_times.items()]
+    print("Startup: " + ", ".join(parts), file=sys.stderr)
 
-def confirm_sets():
+def set_config(index):
     """
-    Read the number of sets from user input, validate it, 
-    create a configuration panel for each set, and saves the configurations in a global list.
+    Return the dice_sets.SetConfig of the set with the given index: read from the widgets of
+    its configuration panel, or the values it was imported with (imported sets beyond the
+    first IMPORT_PANELS have no panel).
     """
+    entry = sets[index]
+    if isinstance(entry, dice_sets.SetConfig):
+        return entry
+    set_name, dice_count, dice_sides, dice_color_label, text_color_label, notation = entry
+    return dice_sets.SetConfig(set_name.get(), read_int(dice_count), read_int(dice_sides),
+                               dice_color_label["bg"], text_color_label["bg"], notation.get())
+
+def read_int(entry):
+    """Return the value of an IntEntry, or None if it is empty or out of its bounds."""
     try:
-        # Get the desired number of sets from the entry field
-        num_sets = enter_set.get()
-        # Validate that the number is within allowed range (1-12)
-        if not (1 <= num_sets <= 12):
-            raise ValueError
+        return entry.get()
     except ValueError:
-        # If input is invalid, show an error message and return early
-        messagebox.showerror("Error", "Please enter a valid number of sets (1-12).")
-        return
-
-    # Reinitialize the global sets list
-    global sets
-    sets = []
-    # Clear any existing set configuration frames
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
-
-    # Create configuration frames for each set
-    # Sets will be arranged in a grid with a maximum of 4 rows per column
-    for i in range(num_sets):
-        # Create a frame for this set's configuration (with border and padding for visibility)
-        set_frame = Frame(grid_frame, bd=1, relief="groove", padx=5, pady=5)
-        # Position frames in a grid: 4 rows per column (new column after every 4 sets)
-        set_frame.grid(row=i % 4, column=i // 4, padx=10, pady=10, sticky="nsew")
-
-        # Entry for the set name
-        Label(set_frame, text=f"Set {i+1} Name:").grid(row=0, column=0, sticky="w")
-        set_name = Entry(set_frame, width=15)
-        set_name.grid(row=0, column=1, padx=5, pady=2)
-
-        # Entry for the dice count in this set
-        Label(set_frame, text="Dice Count (max. 12):").grid(row=1, column=0, sticky="w")
-        # Use IntEntry for numeric input fields with bounds
-        dice_count = IntEntry(set_frame, width=5, lower_bound=1, upper_bound=12)
-        dice_count.grid(row=1, column=1, padx=5, pady=2)
-
-        # Entry for the number of sides per die
-        Label(set_frame, text="Dice Sides (max. 50):").grid(row=2, column=0, sticky="w")
-        dice_sides = IntEntry(set_frame, width=5, lower_bound=2, upper_bound=50)
-        dice_sides.grid(row=2, column=1, padx=5, pady=2)
-
-        # Color selection for the dice face
-        Label(set_frame, text="Dice Color:").grid(row=3, column=0, sticky="w")
-        dice_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="white")
-        dice_color_label.grid(row=3, column=1, padx=5, pady=2)
-        Button(set_frame, text="Choose",
-               command=lambda lbl=dice_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "white")
-        ).grid(row=3, column=2, padx=5, pady=2)
-
-        # Color selection for the pip/number color
-        Label(set_frame, text="Number Color:").grid(row=4, column=0, sticky="w")
-        text_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="black")
-        text_color_label.grid(row=4, column=1, padx=5, pady=2)
-        Button(set_frame, text="Choose",
-               command=lambda lbl=text_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "black")
-        ).grid(row=4, column=2, padx=5, pady=2)
-
-        # Add this set's widget references to the global list for later use
-        sets.append((set_name, dice_count, dice_sides, dice_color_label, text_color_label))
-
-    # After creating all set frames, adjust the main window size for the configurations
-    root.update_idletasks()  # Update geometry calculations
-    screen_w = root.winfo_screenwidth()
-    screen_h = root.winfo_screenheight()
-    # Calculate required size to show all set frames (with some margin)
-    req_width = settings_frame.winfo_reqwidth()
-    req_height = settings_frame.winfo_reqheight()
-    # Limit window size to screen dimensions (with small margins)
-    desired_w = min(screen_w - 50, req_width + 20)
-    desired_h = min(screen_h - 100, req_height + 20)
-    if req_width > (screen_w - 50):
-        desired_w = screen_w - 20  # use almost full width if needed
-    if req_height > (screen_h - 100):
-        desired_h = screen_h - 50  # use almost full height if needed
-    root.geometry(f"{int(desired_w)}x{int(desired_h)}")
-    # If multiple columns of sets, distribute extra space evenly
-    cols = math.ceil(num_sets / 4)
-    for c in range(cols):
-        grid_frame.grid_columnconfigure(c, weight=1)
-    # (Optionally, one could also add a scrollbar if content exceeds screen, but we avoid extra complexity)
+        return None
 
-def show_dice_results():
+def read_set_plan(config):
     """
-    Switch to the results view: hide the settings view and show the results for each set.
-    """
-    # If no sets have been configured, do not proceed to results
-    if len(sets) == 0:
-        messagebox.showerror("Error", "No sets configured. Click 'Next' to set up dice sets first.")
-        return
-    # Hide the settings frame
-    settings_frame.pack_forget()
-    # Clear any previous result widgets
-    for widget in results_menu.winfo_children():
-        widget.destroy()
-
-    # Determine layout of result frames based on number of sets
-    n_sets = len(sets)
-    # Use 3 rows if we have 3 or more sets, otherwise use one row per set
-    n_rows = 3 if n_sets >= 3 else n_sets
-    # Calculate the number of columns needed (3 sets per column)
-    n_columns = math.ceil(n_sets / 3)
-    # Get screen dimensions
-    screen_width = root.winfo_screenwidth()
-    screen_height = root.winfo_screenheight()
-    # Define window size for results (full screen minus a small margin)
-    desired_width = screen_width - 50
-    desired_height = screen_height - 100
-    # Calculate cell dimensions for each set's result area
-    global cell_width, cell_height
-    cell_width = desired_width / n_columns
-    cell_height = desired_height / n_rows
-    # Resize the main window to fit the results
-    root.geometry(f"{desired_width}x{desired_height}")
-
-    # Create a header frame with a back button to return to settings
-    header_frame = Frame(results_menu)
-    header_frame.pack(side="top", fill="x", pady=5)
-    # Back button to return to settings view
-    Button(header_frame, text="Back to Settings", command=show_settings).pack(padx=5, pady=5)
-
-    # Create a content frame to hold each set's result section
-    content_frame = Frame(results_menu)
-    content_frame.pack(fill="both", expand=True)
-
-    # Create a result display frame for each set of dice
-    for i, (set_name, dice_count, dice_sides, dice_color_label, text_color_label) in enumerate(sets):
-        # Create a fixed-size frame for this set's results
-        set_frame = Frame(content_frame, bd=1, relief="groove",
-                          width=int(cell_width), height=int(cell_height))
-        set_frame.grid_propagate(False)  # prevent the frame from shrinking to fit its content
-        set_frame.grid(row=i % 3, column=i // 3, padx=10, pady=10, sticky="nsew")
-
-        # Within each set frame, a sub-frame will hold the Matplotlib canvas for dice
-        result_frame = Frame(set_frame)
-        result_frame.pack(fill="both", expand=True)
-        # Button to roll this set's dice (capturing current parameters via lambda)
-        Button(set_frame, text=f"{set_name.get()} - Roll Dice",
-               command=lambda rf=result_frame, dc=dice_count, ds=dice_sides, sn=set_name,
-                              dc_lbl=dice_color_label, tc_lbl=text_color_label: roll_single_set(
-                                  rf, dc, ds, sn.get(), dc_lbl["bg"], tc_lbl["bg"])
-        ).pack(side="bottom", pady=2)
-
-    # Show the results frame
-    results_menu.pack(fill="both", expand=True)
+    Return the compiled dice expression (dice_expr.Plan) of a set configuration: its notation
+    if one was entered, otherwise "<count>d<sides>" (see dice_sets.set_plan).
 
-def show_settings():
+    Raises ValueError with a message for the user if a value is missing or outside the
+    allowed ranges, or if the notation is invalid or outside the limits of a set.
     """
-    Return to the settings view, hiding the results view.
+    return dice_sets.set_plan(config.count, config.sides, config.notation)
+
+def roll_stream(index):
+    """Return the random stream of the set with the given index, creating it on first use."""
+    import dice_engine
+    stream = roll_streams.get(index)
+    if stream is None:
+        stream = roll_streams[index] = dice_engine.RollStream(session_seed, index)
+    return stream
+
+def tumble_faces(plan):
+    """Return the faces the dice of a plan show while they tumble."""
+    return dice_animation.tumble_faces(max(term.sides for term in plan.terms))
+
+def animate_roll(index):
+    """Let the dice of a visible set tumble for a moment and then show its last roll."""
+    global roll_animator
+    if roll_animator is None:
+        roll_animator = dice_animation.RollAnimator(root)
+
+    def draw_frame(frame):
+        cell = result_cells.get(index)
+        # Stop if the set was scrolled out of view
+        return cell is not None and cell.show_tumble(frame)
+
+    def finish():
+        cell = result_cells.get(index)
+        if cell is not None:
+            cell.show_last_roll()
+    roll_animator.start(index, draw_frame, finish)
+
+def toggle_animation(enabled):
+    """Turn the roll animation on or off; running animations end at once."""
+    global animate_rolls
+    animate_rolls = enabled
+    if not enabled and roll_animator is not None:
+        roll_animator.stop()
+
+def uses_pips(plan, rolls):
     """
-    results_menu.pack_forget()
-    settings_frame.pack(fill="both", expand=True)
-
-# Create the main application window
-root = tk.Tk()
-root.option_add("*Font", "Arial 12")            # Use a pleasant default font for all widgets
-root.title("Dice Roller with Adaptive Sizes")   # Set window title
-
-# Global list to store each set's widgets/configuration
-sets = []
-
-# Set up the settings frame (for configuring dice sets)
-settings_frame = Frame(root)
-settings_frame.pack(fill="both", expand=True)
-
-# Top section of settings: input for number of sets
-top_frame = Frame(settings_frame)
-top_frame.pack(side="top", fill="x", pady=5)
-Label(top_frame, text="How many sets do you want to roll? (1-12)").grid(row=0, column=0, padx=5)
-enter_set = IntEntry(top_frame, width=5, lower_bound=1, upper_bound=12)
-enter_set.grid(row=0, column=1, padx=5)
-# Buttons to proceed or finish configuration:
-Button(top_frame, text="Next", command=confirm_sets).grid(row=0, column=2, padx=5)
-Button(top_frame, text="Confirm Settings", command=show_dice_results).grid(row=0, column=3, padx=5)
-
-# Frame that will contain the dynamic set configuration frames
-grid_frame = Frame(settings_frame)
-grid_frame.pack(fill="both", expand=True)
-
-# Frame (initially hidden) that will display the dice roll results for all sets
-results_menu = Frame(root)
-
-# Start the Tkinter main loop
-root.mainloop()
-=======
-"""
-Dice Roller GUI with Tkinter and Matplotlib.
-
-This application allows the user to define multiple sets of dice. Each set can have a specified number of dice and a chosen number of sides per dice. The user can roll each set individually. For dice with 2 to 6 sides, the result is shown with traditional pip dots; for dice with more than 6 sides, the numerical result is displayed.
-
-The code uses Tkinter for the user interface, Matplotlib for rendering dice faces, and a custom IntEntry widget (from number_entry module) to ensure numeric input within valid ranges.
-"""
-import tkinter as tk                               # Tkinter for GUI elements
-from tkinter import Frame, Label, Button, Entry, messagebox, colorchooser  # Common Tkinter widgets and dialogs
-import random                                      # Random for dice rolls
-import math                                        # Math for calculations (e.g. ceil)
-import matplotlib.pyplot as plt                    # Matplotlib for drawing dice faces
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg  # To embed Matplotlib figures in Tkinter
+    Return True if a roll is shown with pip (dot) faces: all dice of the plan have 6 or fewer
+    sides and no exploded die went past 6. Otherwise the numbers are shown.
+    """
+    return all(term.sides <= 6 for term in plan.terms) and max(rolls, default=0) <= 6
 
-# Try to import the custom integer entry widget (IntEntry) for numeric inputs
-try:
-    from number_entry import IntEntry
-except ImportError:
-    # If the module is missing, show an error and exit
-    messagebox.showerror("Error", "Required module 'number_entry' is missing.")
-    exit()
+@dice_perf.timed("roll_job")
+def roll_job(requests):
+    """
+    Roll sets in the worker thread (never touches Tk widgets).
 
-# Global variables for cell dimensions (used when drawing dice faces in result frames)
-cell_width = 0
-cell_height = 0
-# Factors defining what portion of each cell's width and height is used for drawing the dice
-dice_area_width_factor = 0.9    # use 90% of cell width for dice graphics
-dice_area_height_factor = 0.5   # use 50% of cell height for dice graphics
+    Parameters:
+        requests - List of (index, plan, dice_color, number_color, die_size), where die_size is
+                   the pixel size of the set's dice if its faces should be rasterized ahead for
+                   the Matplotlib backend (None otherwise)
 
-def draw_dice_face(ax, number, dice_color, text_color, use_dots=False):
+    Returns:
+        A tuple (rolls, faces): rolls is a list of (index, plan, rolls, total, odds, roll_number,
+        dice_color, number_color), faces maps face cache keys to base64 PNG data
+    """
+    global worker_rasterizer
+    results = []
+    faces = {}
+    # With a roll service, all sets of the job are rolled by one request to it
+    served = roll_client.roll([(request[0], request[1].text) for request in requests]) if roll_client else None
+    for i, (index, plan, dice_color, number_color, die_size) in enumerate(requests):
+        if served is not None:
+            # The service rolled the set from its stream of the set, which all displays share
+            roll = served[i]
+            rolls, total, roll_number = roll["faces"], roll["total"], roll["roll"]
+            odds = (roll["probability"], roll["percentile"])
+        else:
+            # Next roll of the set's own stream (it can be regenerated later from the seed and roll number).
+            # Streams are only used in the worker thread.
+            stream = roll_stream(index)
+            roll_number = stream.position
+            set_faces, totals = plan.evaluate(1, stream.next_generator())
+            rolls = set_faces[0].tolist()
+            total = int(totals[0])
+            # Exact probability and percentile of the total (memoized per plan)
+            odds = plan.odds(total)
+        results.append((index, plan, rolls, total, odds, roll_number, dice_color, number_color))
+        if die_size is not None:
+            from dice_render_mpl import FaceRasterizer, render_face_data
+            if worker_rasterizer is None:
+                worker_rasterizer = FaceRasterizer()
+            use_dots = uses_pips(plan, rolls)
+            numbers = set(rolls)
+            if animate_rolls:
+                # The tumbling faces are rasterized ahead too, so no frame of the animation misses the cache
+                numbers.update(tumble_faces(plan))
+            for number in numbers:
+                key = (number, use_dots, dice_color, number_color, die_size)
+                if key not in face_cache and key not in faces:
+                    faces[key] = render_face_data(worker_rasterizer, key)
+    return results, faces
+
+def submit_rolls(key, requests, on_done=None):
     """
-    Draw a single dice face on the given Matplotlib axis.
+    Roll sets in the worker thread; the results are recorded and shown by poll_worker.
 
     Parameters:
-        ax         - Matplotlib axis on which to draw
-        number     - The rolled number to display
-        dice_color - Background color of the dice face
-        text_color - Color for the number or the pips (dots)
-        use_dots   - If True, draw a pip pattern (standard dice pips) instead of a number
-    """
-    # Clear any previous content on this axis
-    ax.clear()
-    # Remove ticks for a cleaner look
-    ax.set_xticks([])
-    ax.set_yticks([])
-    # Fix the axis limits to a 0.5x0.5 square (for consistent scaling)
-    ax.set_xlim(0, 0.5)
-    ax.set_ylim(0, 0.5)
-    # Set the background color of the dice face
-    ax.set_facecolor(dice_color)
-
-    if use_dots:
-        # Pip layouts for dice faces 1 through 6
-        pip_positions = {
-            1: [(0.25, 0.25)],  # center pip
-            2: [(0.1, 0.4), (0.4, 0.1)],  # two pips (diagonal)
-            3: [(0.1, 0.4), (0.25, 0.25), (0.4, 0.1)],  # three pips (two diagonal + center)
-            4: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1)],  # four corner pips
-            5: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1), (0.25, 0.25)],  # four corners + center
-            6: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.25), (0.4, 0.25), (0.1, 0.1), (0.4, 0.1)]  # six pips (three per column)
-        }
-        # Get the pip layout for the rolled number (default to single center pip if number not in dict)
-        dots = pip_positions.get(number, [(0.25, 0.25)])
-        # Draw each pip as a small filled circle
-        for (x, y) in dots:
-            circle = plt.Circle((x, y), 0.04, color=text_color)
-            ax.add_artist(circle)
-    else:
-        # If not using pips, display the number as text in the center of the face
-        ax.text(0.25, 0.25, str(number), fontsize=16, ha='center', va='center',
-                fontweight='bold', color=text_color)
-
-def roll_single_set(result_frame, dice_count, dice_sides, set_name, dice_color, number_color):
+        key      - Worker key of the job: a set index, or "all" (replaces a pending job with the same key)
+        requests - List of (index, plan, dice_color, number_color)
+        on_done  - Optional function called in the Tk thread after the results were shown
     """
-    Roll a single set of dice and display the results in the UI.
+    global roll_sequence
+    import dice_render
+    jobs = []
+    for index, plan, dice_color, number_color in requests:
+        die_size = None
+        # Only the faces of visible sets are needed right away
+        if face_cache is not None and index in result_cells:
+            die_size = dice_render.die_pixels(plan.dice_count, *dice_area())
+        jobs.append((index, plan, dice_color, number_color, die_size))
+    generation = roll_worker.submit(key, lambda: roll_job(jobs))
+    roll_sequence += 1
+    worker_sequences[(key, generation)] = roll_sequence
+    if on_done is not None:
+        worker_callbacks[(key, generation)] = on_done
+    schedule_worker_poll()
+
+def schedule_worker_poll():
+    """Make sure poll_worker runs while the worker has jobs."""
+    global worker_polling
+    if not worker_polling:
+        worker_polling = True
+        root.after(WORKER_POLL_MS, poll_worker)
+
+@dice_perf.timed("poll_worker")
+def poll_worker():
+    """
+    Record the finished rolls of the worker and redraw each affected visible set once, with
+    its latest roll only. Rolls of a job that was replaced by a newer one for the same key
+    are recorded but not drawn. Jobs of different keys (a set and "all") may finish in another
+    order than they were submitted, so a set's roll from a job submitted before the one of the
+    roll already shown only goes into the history.
+    """
+    global worker_polling
+    redraw = set()
+    callbacks = []
+    for key, generation, result, error in roll_worker.drain():
+        callback = worker_callbacks.pop((key, generation), None)
+        sequence = worker_sequences.pop((key, generation), 0)
+        if error is not None:
+            messagebox.showerror("Roll Error", str(error))
+            continue
+        rolls, faces = result
+        # Faces rasterized by the worker become cache hits for the render sessions
+        for face_key, png_data in faces.items():
+            face_cache.put(face_key, png_data)
+        latest = roll_worker.is_latest(key, generation)
+        for roll in rolls:
+            index = roll[0]
+            newer = sequence >= last_roll_sequences.get(index, 0)
+            record_roll(*roll, shown=newer)
+            if newer:
+                last_roll_sequences[index] = sequence
+                if latest:
+                    redraw.add(index)
+        if callback is not None:
+            callbacks.append(callback)
+    for index in redraw:
+        cell = result_cells.get(index)
+        if cell is not None:
+            if animate_rolls:
+                animate_roll(index)
+            else:
+                cell.show_last_roll()
+    for callback in callbacks:
+        callback()
+    worker_polling = roll_worker.busy()
+    if worker_polling:
+        root.after(WORKER_POLL_MS, poll_worker)
+
+def record_roll(index, plan, rolls, total, odds, roll_number, dice_color, number_color, shown=True):
+    """
+    Record one roll of a set in its history, the roll log and last_rolls (Tk thread).
 
     Parameters:
-        result_frame - The Tkinter frame where the dice images will be displayed
-        dice_count   - IntEntry widget for the number of dice to roll
-        dice_sides   - IntEntry widget for the number of sides on each die
-        set_name     - Name of the set (string used for labeling purposes)
+        index        - Index of the set in the sets list
+        plan         - The set's compiled dice expression
+        rolls        - List of rolled numbers, one per die
+        total        - Value of the expression for this roll
+        odds         - (probability, percentile) of the total
+        roll_number  - Number of the roll in the set's stream
         dice_color   - Background color for the dice faces
         number_color - Color for the numbers or pips on the dice
+        shown        - If False, the roll only goes into the history and the log, not into
+                       last_rolls (a roll of a newer job is already shown)
     """
-    # Remove any previous results from this frame
-    for widget in result_frame.winfo_children():
-        widget.destroy()
+    from dice_history import RollHistory
+    # Only plain sets (NdS) have a per-face history and are logged; the faces of exploding
+    # dice and the totals of expressions do not fit the history and the log
+    if plan.plain is not None:
+        sides_val = plan.plain[1]
+        # Start a new history if the set is new or its number of sides was changed
+        history = roll_histories.get(index)
+        if history is None or history.sides != sides_val:
+            history = roll_histories[index] = RollHistory(sides_val)
+        history.add(rolls)
+        roll_log.append(index, sides_val, rolls)
+    # Offscreen sets only keep their roll data; visible ones are redrawn by poll_worker
+    if shown:
+        last_rolls[index] = (rolls, plan, total, dice_color, number_color, odds, roll_number)
+
+@dice_perf.timed("roll_single_set")
+def roll_single_set(index):
+    """
+    Roll a single set of dice in the worker thread; the result is shown when it is ready.
+
+    Parameters:
+        index - Index of the set in the sets list (its values are read at the time of the click)
+    """
+    config = set_config(index)
     try:
-        # Retrieve the user-specified number of sides and dice count
-        sides_val = dice_sides.get()
-        count_val = dice_count.get()
-        # Validate the input ranges (Sides must be 2-50, Dice Count 1-12)
-        if not (2 <= sides_val <= 50) or not (1 <= count_val <= 12):
-            raise ValueError
-        # Generate random rolls for the given number of dice and sides
-        rolls = [random.randint(1, sides_val) for _ in range(count_val)]
-    except ValueError:
+        # Retrieve and validate the user-specified notation, or number of sides and dice count
+        plan = read_set_plan(config)
+    except ValueError as error:
         # If inputs are invalid, show an error dialog and abort rolling
-        messagebox.showerror("Input Error", "Please enter valid values for sides (2-50) and dice count (1-12).")
+        messagebox.showerror("Input Error", str(error))
         return
+    # Rapid clicks replace the set's pending roll instead of queueing one roll per click
+    submit_rolls(index, [(index, plan, config.dice_color, config.number_color)])
 
-    # Determine layout for dice faces: up to 6 dice per row
-    dice_cols = min(6, count_val)
-    # Number of rows needed based on how many dice (6 per row maximum)
-    dice_rows = math.ceil(count_val / 6)
-
-    # Calculate an appropriate dice image size (in pixels) based on current window size and defined factors
-    die_size_pixels = min((cell_width * dice_area_width_factor) / dice_cols,
-                          (cell_height * dice_area_height_factor) / dice_rows)
-    # Convert pixel size to inches for Matplotlib (assuming 100 dpi for simplicity: 1 inch = 100 pixels)
-    fig_width = (die_size_pixels * dice_cols) / 100
-    fig_height = (die_size_pixels * dice_rows) / 100
-
-    # Create a Matplotlib figure with a grid of subplots to represent dice faces
-    fig, axes = plt.subplots(dice_rows, dice_cols, figsize=(fig_width, fig_height), dpi=100)
-    # Flatten the axes array into a simple list for easy iteration
-    if dice_rows * dice_cols == 1:
-        axes = [axes]
-    elif dice_rows == 1 or dice_cols == 1:
-        axes = list(axes)
+@dice_perf.timed("roll_all_sets")
+def roll_all_sets(status_label):
+    """
+    Roll every set in one worker job; poll_worker records all rolls and redraws the
+    visible sets in one pass, so Tk does one geometry pass instead of one per set.
+
+    Parameters:
+        status_label - Label in the results header that shows the time to all results
+    """
+    start = time.perf_counter()
+    requests = []
+    for index in range(len(sets)):
+        # Read the values now, so the displayed roll matches the moment of the click
+        config = set_config(index)
+        try:
+            plan = read_set_plan(config)
+        except ValueError as error:
+            messagebox.showerror("Input Error", f"Set {index + 1}: {error}")
+            return
+        requests.append((index, plan, config.dice_color, config.number_color))
+
+    def done():
+        # Process the pending geometry changes once for all sets before taking the time
+        root.update_idletasks()
+        if status_label.winfo_exists():
+            status_label.config(text=f"All {len(requests)} sets rolled in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    submit_rolls("all", requests, done)
+
+def create_set_panel(i):
+    """
+    Create the configuration panel for the set with index i (not yet placed in the grid).
+
+    Returns:
+        A tuple (set_frame, set_name, dice_count, dice_sides, dice_color_label, text_color_label, notation)
+    """
+    # Create a frame for this set's configuration (with border and padding for visibility)
+    set_frame = Frame(grid_frame, bd=1, relief="groove", padx=5, pady=5)
+
+    # Entry for the set name
+    Label(set_frame, text=f"Set {i+1} Name:").grid(row=0, column=0, sticky="w")
+    set_name = Entry(set_frame, width=15)
+    set_name.grid(row=0, column=1, padx=5, pady=2)
+
+    # Entry for the dice count in this set
+    Label(set_frame, text=f"Dice Count (max. {dice_sets.COUNT_BOUNDS[1]}):").grid(row=1, column=0, sticky="w")
+    # Use IntEntry for numeric input fields with bounds (the same bounds as imported sets)
+    dice_count = IntEntry(set_frame, width=5, lower_bound=dice_sets.COUNT_BOUNDS[0],
+                          upper_bound=dice_sets.COUNT_BOUNDS[1])
+    dice_count.grid(row=1, column=1, padx=5, pady=2)
+
+    # Entry for the number of sides per die
+    Label(set_frame, text=f"Dice Sides (max. {dice_sets.SIDES_BOUNDS[1]}):").grid(row=2, column=0, sticky="w")
+    dice_sides = IntEntry(set_frame, width=5, lower_bound=dice_sets.SIDES_BOUNDS[0],
+                          upper_bound=dice_sets.SIDES_BOUNDS[1])
+    dice_sides.grid(row=2, column=1, padx=5, pady=2)
+
+    # Color selection for the dice face
+    Label(set_frame, text="Dice Color:").grid(row=3, column=0, sticky="w")
+    dice_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="white")
+    dice_color_label.grid(row=3, column=1, padx=5, pady=2)
+    Button(set_frame, text="Choose",
+           command=lambda lbl=dice_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "white")
+    ).grid(row=3, column=2, padx=5, pady=2)
+
+    # Color selection for the pip/number color
+    Label(set_frame, text="Number Color:").grid(row=4, column=0, sticky="w")
+    text_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="black")
+    text_color_label.grid(row=4, column=1, padx=5, pady=2)
+    Button(set_frame, text="Choose",
+           command=lambda lbl=text_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "black")
+    ).grid(row=4, column=2, padx=5, pady=2)
+
+    # Optional dice notation such as 4d6kh3+2 or 3d6! (replaces Dice Count and Dice Sides)
+    Label(set_frame, text="Notation (optional):").grid(row=5, column=0, sticky="w")
+    notation = Entry(set_frame, width=15)
+    notation.grid(row=5, column=1, columnspan=2, padx=5, pady=2, sticky="w")
+
+    return set_frame, set_name, dice_count, dice_sides, dice_color_label, text_color_label, notation
+
+class ResultCell:
+    """
+    The widgets of one set in the results view: a frame on the results canvas with the
+    set's RenderSession, its roll history statistics and its roll button.
+
+    Cells only exist while their set is in view; layout_result_cells creates and
+    destroys them while the view is scrolled.
+    """
+    def __init__(self, index):
+        from dice_render import create_session
+        self.index = index
+        config = set_config(index)
+        # Create a fixed-size frame for this set's results at its place in the grid
+        row, column = divmod(index, results_columns)
+        self.frame = Frame(results_canvas, bd=1, relief="groove")
+        self.item = results_canvas.create_window(
+            column * cell_width + CELL_PADDING, row * cell_height + CELL_PADDING,
+            window=self.frame, anchor="nw",
+            width=int(cell_width) - 2 * CELL_PADDING, height=int(cell_height) - 2 * CELL_PADDING)
+
+        # Within each set frame, a sub-frame will hold the canvas for dice
+        result_frame = Frame(self.frame)
+        result_frame.pack(fill="both", expand=True)
+        # The render session creates the canvas once and only updates its items on every roll
+        self.session = create_session(render_backend, result_frame, *dice_area(), face_cache)
+        self.build_session()
+        # Button to roll this set's dice (its values are read again when it is clicked)
+        Button(self.frame, text=f"{config.name} - Roll Dice",
+               command=lambda: roll_single_set(index)).pack(side="bottom", pady=2)
+        # Statistics of the set's roll history (shown above the button)
+        self.history_label = Label(self.frame, font=("Arial", 10))
+        self.history_label.pack(side="bottom")
+        # Strip for the face-frequency histogram (above the statistics); the chart itself is
+        # created with the set's first recorded roll
+        self.histogram = None
+        self.histogram_frame = None
+        if show_histograms:
+            self.histogram_frame = Frame(self.frame, height=int(cell_height * HISTOGRAM_FRACTION))
+            self.histogram_frame.pack_propagate(False)
+            self.histogram_frame.pack(side="bottom", fill="x")
+        self.show_last_roll()
+
+    def build_session(self):
+        """Build the render session for the set's current dice count."""
+        try:
+            plan = read_set_plan(set_config(self.index))
+            self.session.build(plan.dice_count, show_total=plan.plain is None)
+        except ValueError:
+            pass  # invalid set: the error is reported when the set is rolled
+
+    def resize(self):
+        """Move and resize the cell to the current cell size and redraw its last roll once."""
+        row, column = divmod(self.index, results_columns)
+        results_canvas.coords(self.item, column * cell_width + CELL_PADDING, row * cell_height + CELL_PADDING)
+        results_canvas.itemconfig(self.item, width=int(cell_width) - 2 * CELL_PADDING,
+                                  height=int(cell_height) - 2 * CELL_PADDING)
+        # The session keeps its canvas if the dice keep their pixel size (and the face cache
+        # then still holds their faces); otherwise it is rebuilt here
+        self.session.resize(*dice_area())
+        if self.histogram_frame is not None:
+            # The chart follows the size of its frame and renews its cached background itself
+            self.histogram_frame.config(height=int(cell_height * HISTOGRAM_FRACTION))
+        self.build_session()
+        self.show_last_roll()
+
+    def show_last_roll(self):
+        """Show the set's last roll (if any) and its history statistics."""
+        history = roll_histories.get(self.index)
+        last_roll = last_rolls.get(self.index)
+        text = history.summary() if history else ""
+        if last_roll is not None and last_roll[1].plain is None:
+            # Expressions have no per-face history, so show their expected total instead
+            text = f"{last_roll[1].text}: expected {last_roll[1].mean():.2f}"
+        if text and last_roll is not None:
+            # The roll number and the session seed identify the last roll for replaying it
+            text += f"  roll #{last_roll[6]}"
+        elif text and self.index in roll_streams:
+            text += f"  roll #{roll_streams[self.index].position - 1}"
+        self.history_label.config(text=text)
+        if last_roll is not None:
+            rolls, plan, total, dice_color, number_color, odds, _ = last_roll
+            # Expressions show their total even for one die.
+            # The session reuses its canvas and only updates the items of the dice.
+            self.session.show(rolls, dice_color, number_color, use_dots=uses_pips(plan, rolls), odds=odds,
+                              total=None if plan.plain is not None else total)
+        if self.histogram_frame is not None and history is not None:
+            self.show_histogram(history)
+
+    def show_tumble(self, frame):
+        """
+        Show a frame of the roll animation: the dice point at faces the session already has
+        (tumble_faces), so no face is drawn. Returns False if the set has no roll to animate.
+        """
+        last_roll = last_rolls.get(self.index)
+        if last_roll is None:
+            return False
+        rolls, plan, _, dice_color, number_color, _, _ = last_roll
+        faces = dice_animation.tumble_frame(tumble_faces(plan), len(rolls), frame)
+        self.session.show_faces(faces, dice_color, number_color, use_dots=uses_pips(plan, rolls))
+        return True
+
+    def show_histogram(self, history):
+        """Update the face-frequency histogram (only the bars are redrawn, by blitting)."""
+        from dice_histogram import FaceHistogram
+        if self.histogram is None or self.histogram.sides != history.sides:
+            if self.histogram is not None:
+                self.histogram.close()
+            self.histogram = FaceHistogram(self.histogram_frame, history.sides,
+                                           int(cell_width) - 2 * CELL_PADDING, int(cell_height * HISTOGRAM_FRACTION))
+        self.histogram.update(history.counts)
+
+    def close(self):
+        """Release the render session and destroy the cell's widgets."""
+        self.session.close()
+        if self.histogram is not None:
+            self.histogram.close()
+        results_canvas.delete(self.item)
+        self.frame.destroy()
+
+def layout_result_cells(*args):
+    """
+    Create cells for the sets in the rows that are visible on the results canvas and
+    destroy the cells of sets that were scrolled out of view.
+    """
+    if results_canvas is None:
+        return
+    top = results_canvas.canvasy(0)
+    bottom = top + results_canvas.winfo_height()
+    first_row = max(0, int(top // cell_height))
+    last_row = int(bottom // cell_height)
+    visible = range(first_row * results_columns, min(len(sets), (last_row + 1) * results_columns))
+    for index in [index for index in result_cells if index not in visible]:
+        result_cells.pop(index).close()
+    for index in visible:
+        if index not in result_cells:
+            result_cells[index] = ResultCell(index)
+
+def dice_area():
+    """Return the (width, height) of the part of a cell that holds the dice (without the histogram)."""
+    if show_histograms:
+        return cell_width, cell_height * (1 - HISTOGRAM_FRACTION)
+    return cell_width, cell_height
+
+def toggle_histograms(enabled):
+    """Show or hide the face-frequency histograms by rebuilding the visible cells."""
+    global show_histograms
+    show_histograms = enabled
+    for cell in result_cells.values():
+        cell.close()
+    result_cells.clear()
+    layout_result_cells()
+
+def set_cell_size(new_cell_width, new_cell_height):
+    """Set the size of the result cells and the scroll region that covers all rows."""
+    global cell_width, cell_height
+    cell_width = new_cell_width
+    cell_height = new_cell_height
+    # The scroll region covers all rows, but cells are only created for the visible ones
+    total_rows = math.ceil(len(sets) / results_columns)
+    results_canvas.config(scrollregion=(0, 0, results_columns * cell_width, total_rows * cell_height),
+                          yscrollincrement=max(1, int(cell_height / 4)))
+
+def on_results_configure(event):
+    """
+    Schedule a relayout of the results view after it was resized. Dragging a window edge
+    sends a stream of <Configure> events; only the last one within RESIZE_DEBOUNCE_MS leads
+    to a relayout, so every set is re-rendered once per resize instead of once per event.
+    """
+    global resize_job
+    # Rows that just came into view get their cells right away (at the current cell size)
+    layout_result_cells()
+    if resize_job is not None:
+        root.after_cancel(resize_job)
+    resize_job = root.after(RESIZE_DEBOUNCE_MS, relayout_results)
+
+@dice_perf.timed("relayout_results")
+def relayout_results():
+    """Fit the cells to the current size of the results canvas and redraw them once."""
+    global resize_job
+    resize_job = None
+    if results_canvas is None:
+        return
+    width = results_canvas.winfo_width()
+    height = results_canvas.winfo_height()
+    if width <= 1 or height <= 1:
+        return  # not mapped yet
+    new_cell_width = width / results_columns
+    new_cell_height = height / results_rows
+    # Sub-pixel changes do not change any widget, so only whole pixels count
+    if (int(new_cell_width), int(new_cell_height)) != (int(cell_width), int(cell_height)):
+        set_cell_size(new_cell_width, new_cell_height)
+        for cell in result_cells.values():
+            cell.resize()
+    layout_result_cells()
+
+def on_results_scroll(first, last):
+    """Update the scrollbar and the visible cells after the results canvas scrolled."""
+    results_scrollbar.set(first, last)
+    layout_result_cells()
+
+def scroll_results(event):
+    """Scroll the results view with the mouse wheel."""
+    if results_canvas is None or not results_menu.winfo_ismapped():
+        return
+    if event.num == 4 or event.delta > 0:
+        results_canvas.yview_scroll(-1, "units")
     else:
-        axes = [ax for row in axes for ax in row]
-
-    # Use pip (dot) representation if the dice have 6 or fewer sides, otherwise use numeric
-    use_dots = (sides_val <= 6)
-    # Draw each rolled dice face on its corresponding subplot
-    for ax, roll in zip(axes, rolls):
-        draw_dice_face(ax, roll, dice_color, number_color, use_dots=use_dots)
-    # If there are more subplot axes than dice (which can happen if count_val is not a multiple of dice_cols), hide the extras
-    for ax in axes[len(rolls):]:
-        ax.set_visible(False)
-
-    # Embed the Matplotlib figure (dice images) into the Tkinter result frame
-    canvas = FigureCanvasTkAgg(fig, master=result_frame)
-    canvas.get_tk_widget().pack(pady=5)
-    canvas.draw()
-
-    # If more than one die was rolled, also display the sum of all dice at the bottom
-    if count_val > 1:
-        total = sum(rolls)
-        Label(result_frame, text=f"Total: {total}", font=("Arial", 12, "bold")).pack(pady=5)
+        results_canvas.yview_scroll(1, "units")
 
+@dice_perf.timed("confirm_sets")
 def confirm_sets():
     """
-    Read the number of sets from user input, validate it, 
-    create a configuration panel for each set, and saves the configurations in a global list.
+    Read the number of sets from user input, validate it, show a configuration panel
+    for each set, and save the configurations in a global list.
+
+    Panels are kept in a pool: pressing "Next" again only creates the panels that are
+    missing and hides the ones that are no longer needed, so no widgets (and no Tcl
+    validation commands) are created for sets that already had a panel.
     """
     try:
         # Get the desired number of sets from the entry field
         num_sets = enter_set.get()
-        # Validate that the number is within allowed range (1-12)
-        if not (1 <= num_sets <= 12):
+        # Validate that the number is within allowed range (1-MAX_SETS)
+        if not (1 <= num_sets <= MAX_SETS):
             raise ValueError
     except ValueError:
         # If input is invalid, show an error message and return early
-        messagebox.showerror("Error", "Please enter a valid number of sets (1-12).")
+        messagebox.showerror("Error", f"Please enter a valid number of sets (1-{MAX_SETS}).")
         return
 
-    # Reinitialize the global sets list
+    show_set_panels(num_sets)
+    # Reinitialize the global sets list with the widgets of the shown panels
+    use_sets([panel[1:] for panel in set_panels[:num_sets]])
+    import_status.config(text="")
+
+def use_sets(new_sets):
+    """Make new_sets the configured sets, forgetting the roll data of sets that no longer exist."""
     global sets
-    sets = []
-    # Clear any existing set configuration frames
-    for widget in grid_frame.winfo_children():
-        widget.destroy()
+    sets = new_sets
+    for index in [index for index in roll_histories if index >= len(sets)]:
+        del roll_histories[index]
+    last_rolls.clear()
+    last_roll_sequences.clear()
 
-    # Create configuration frames for each set
-    # Sets will be arranged in a grid with a maximum of 4 rows per column
-    for i in range(num_sets):
-        # Create a frame for this set's configuration (with border and padding for visibility)
-        set_frame = Frame(grid_frame, bd=1, relief="groove", padx=5, pady=5)
-        # Position frames in a grid: 4 rows per column (new column after every 4 sets)
-        set_frame.grid(row=i % 4, column=i // 4, padx=10, pady=10, sticky="nsew")
-
-        # Entry for the set name
-        Label(set_frame, text=f"Set {i+1} Name:").grid(row=0, column=0, sticky="w")
-        set_name = Entry(set_frame, width=15)
-        set_name.grid(row=0, column=1, padx=5, pady=2)
-
-        # Entry for the dice count in this set
-        Label(set_frame, text="Dice Count (max. 12):").grid(row=1, column=0, sticky="w")
-        # Use IntEntry for numeric input fields with bounds
-        dice_count = IntEntry(set_frame, width=5, lower_bound=1, upper_bound=12)
-        dice_count.grid(row=1, column=1, padx=5, pady=2)
-
-        # Entry for the number of sides per die
-        Label(set_frame, text="Dice Sides (max. 50):").grid(row=2, column=0, sticky="w")
-        dice_sides = IntEntry(set_frame, width=5, lower_bound=2, upper_bound=50)
-        dice_sides.grid(row=2, column=1, padx=5, pady=2)
-
-        # Color selection for the dice face
-        Label(set_frame, text="Dice Color:").grid(row=3, column=0, sticky="w")
-        dice_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="white")
-        dice_color_label.grid(row=3, column=1, padx=5, pady=2)
-        Button(set_frame, text="Choose",
-               command=lambda lbl=dice_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "white")
-        ).grid(row=3, column=2, padx=5, pady=2)
-
-        # Color selection for the pip/number color
-        Label(set_frame, text="Number Color:").grid(row=4, column=0, sticky="w")
-        text_color_label = Label(set_frame, text=" ", width=8, relief="solid", bg="black")
-        text_color_label.grid(row=4, column=1, padx=5, pady=2)
-        Button(set_frame, text="Choose",
-               command=lambda lbl=text_color_label: lbl.config(bg=colorchooser.askcolor()[1] or "black")
-        ).grid(row=4, column=2, padx=5, pady=2)
-
-        # Add this set's widget references to the global list for later use
-        sets.append((set_name, dice_count, dice_sides, dice_color_label, text_color_label))
+def show_set_panels(num_panels):
+    """
+    Show the first num_panels configuration panels (creating missing ones) and hide the rest,
+    then fit the window to them.
+    """
+    # Make sure the pool holds enough panels; existing panels are reused as they are, so
+    # their entered values are preserved
+    while len(set_panels) < num_panels:
+        set_panels.append(create_set_panel(len(set_panels)))
+    # Show the first num_panels panels and hide the rest (hidden panels keep their values)
+    for i, panel in enumerate(set_panels):
+        if i < num_panels:
+            # Position frames in a grid: 4 rows per column (new column after every 4 sets)
+            panel[0].grid(row=i % 4, column=i // 4, padx=10, pady=10, sticky="nsew")
+        else:
+            panel[0].grid_remove()
 
     # After creating all set frames, adjust the main window size for the configurations
     root.update_idletasks()  # Update geometry calculations
     screen_w = root.winfo_screenwidth()
     screen_h = root.winfo_screenheight()
-    # Calculate required size to show all set frames (with some margin)
-    req_width = settings_frame.winfo_reqwidth()
-    req_height = settings_frame.winfo_reqheight()
+    # Calculate required size to show all set frames (with some margin for the scrollbars)
+    req_width = max(top_frame.winfo_reqwidth(), grid_frame.winfo_reqwidth() + 20)
+    req_height = top_frame.winfo_reqheight() + grid_frame.winfo_reqheight() + 30
     # Limit window size to screen dimensions (with small margins)
     desired_w = min(screen_w - 50, req_width + 20)
     desired_h = min(screen_h - 100, req_height + 20)
@@ -554,42 +791,133 @@ def confirm_sets():
     if req_height > (screen_h - 100):
         desired_h = screen_h - 50  # use almost full height if needed
     root.geometry(f"{int(desired_w)}x{int(desired_h)}")
-    # If multiple columns of sets, distribute extra space evenly
-    cols = math.ceil(num_sets / 4)
-    for c in range(cols):
-        grid_frame.grid_columnconfigure(c, weight=1)
-    # (Optionally, one could also add a scrollbar if content exceeds screen, but we avoid extra complexity)
+    # If multiple columns of sets, distribute extra space evenly (columns of hidden sets get none)
+    cols = math.ceil(num_panels / 4)
+    for c in range(math.ceil(len(set_panels) / 4)):
+        grid_frame.grid_columnconfigure(c, weight=1 if c < cols else 0)
+
+def fill_set_panel(panel, config):
+    """Show the values of a dice_sets.SetConfig in a configuration panel."""
+    _, set_name, dice_count, dice_sides, dice_color_label, text_color_label, notation = panel
+    for entry, value in ((set_name, config.name), (notation, config.notation)):
+        entry.delete(0, "end")
+        entry.insert(0, value)
+    for entry, value, (lower, upper) in ((dice_count, config.count, dice_sets.COUNT_BOUNDS),
+                                         (dice_sides, config.sides, dice_sets.SIDES_BOUNDS)):
+        entry.clear()
+        # Sets given by notation may come with a count or sides that the fields do not accept
+        if value is not None and lower <= value <= upper:
+            entry.set(value)
+    dice_color_label.config(bg=config.dice_color)
+    text_color_label.config(bg=config.number_color)
+
+def is_tk_color(color):
+    """Return True if Tk knows the color (used to check the colors of imported sets)."""
+    try:
+        root.winfo_rgb(color)
+        return True
+    except tk.TclError:
+        return False
+
+@dice_perf.timed("import_sets")
+def import_sets(path=None):
+    """
+    Load set definitions from a CSV or JSON file (see dice_sets for the format).
 
+    The whole file is validated without widgets first; if any row is invalid, nothing is
+    imported and the invalid rows are reported. Panels are filled for the first
+    IMPORT_PANELS sets only (they can still be edited there); the other sets keep their
+    imported values and get widgets only when they are shown in the results view.
+
+    Parameters:
+        path - File to import (asks the user if None)
+    """
+    if path is None:
+        path = filedialog.askopenfilename(title="Import Sets", filetypes=[
+            ("Set definitions", "*.csv *.json"), ("All files", "*")])
+        if not path:
+            return
+    try:
+        configs, errors = dice_sets.load_sets(path, is_color=is_tk_color)
+    except (OSError, ValueError) as error:
+        messagebox.showerror("Import Error", str(error))
+        return
+    if errors:
+        lines = [f"Row {number}: {message}" for number, message in errors[:IMPORT_ERRORS_SHOWN]]
+        if len(errors) > IMPORT_ERRORS_SHOWN:
+            lines.append(f"... and {len(errors) - IMPORT_ERRORS_SHOWN} more invalid rows")
+        messagebox.showerror("Import Error", f"No sets were imported from {os.path.basename(path)}:\n\n"
+                             + "\n".join(lines))
+        return
+    if not configs:
+        messagebox.showerror("Import Error", f"{os.path.basename(path)} holds no sets.")
+        return
+    num_panels = min(len(configs), IMPORT_PANELS)
+    show_set_panels(num_panels)
+    for panel, config in zip(set_panels, configs[:num_panels]):
+        fill_set_panel(panel, config)
+    use_sets([panel[1:] for panel in set_panels[:num_panels]] + configs[num_panels:])
+    text = f"Imported {len(configs)} sets from {os.path.basename(path)}"
+    if len(configs) > num_panels:
+        text += f" (the first {num_panels} are shown here)"
+    import_status.config(text=text)
+
+def update_perf_label():
+    """Show the current hot-path timings in the status bar and schedule the next update."""
+    if perf_label is not None and perf_label.winfo_exists():
+        text = dice_perf.status_text()
+        if roll_animator is not None and roll_animator.frames:
+            stats = roll_animator.stats()
+            text += (f"\nanimation: {stats['frames']} frames, {stats['dropped']} dropped,"
+                     f" {stats['over_budget']} over the {stats['budget_ms']:.0f} ms budget")
+        perf_label.config(text=text)
+    root.after(PERF_REFRESH_MS, update_perf_label)
+
+@dice_perf.timed("show_dice_results")
 def show_dice_results():
     """
     Switch to the results view: hide the settings view and show the results for each set.
+
+    The results are a scrollable grid. Only the sets in view get widgets (see
+    layout_result_cells), so the view works the same for a few sets and for hundreds.
     """
     # If no sets have been configured, do not proceed to results
     if len(sets) == 0:
         messagebox.showerror("Error", "No sets configured. Click 'Next' to set up dice sets first.")
         return
+    # Make sure the rendering backend is loaded (waits for the warm-up thread if it is still running)
+    load_backend()
     # Hide the settings frame
     settings_frame.pack_forget()
+    # Release the cells of the previous results view before its widgets are destroyed
+    global results_canvas, results_scrollbar, results_columns, results_rows, resize_job
+    if resize_job is not None:
+        root.after_cancel(resize_job)
+        resize_job = None
+    # Running animations end on the old cells, so none of them tumbles a cell of the new view
+    if roll_animator is not None:
+        roll_animator.stop()
+    for cell in result_cells.values():
+        cell.close()
+    result_cells.clear()
+    last_rolls.clear()
+    last_roll_sequences.clear()
+    results_canvas = None
     # Clear any previous result widgets
     for widget in results_menu.winfo_children():
         widget.destroy()
 
-    # Determine layout of result frames based on number of sets
+    # Determine layout of result cells based on number of sets:
+    # up to 4 columns (3 sets per column) and up to 3 rows in view, further rows are scrolled to
     n_sets = len(sets)
-    # Use 3 rows if we have 3 or more sets, otherwise use one row per set
-    n_rows = 3 if n_sets >= 3 else n_sets
-    # Calculate the number of columns needed (3 sets per column)
-    n_columns = math.ceil(n_sets / 3)
+    results_columns = min(4, math.ceil(n_sets / 3))
+    results_rows = min(3, math.ceil(n_sets / results_columns))
     # Get screen dimensions
     screen_width = root.winfo_screenwidth()
     screen_height = root.winfo_screenheight()
     # Define window size for results (full screen minus a small margin)
     desired_width = screen_width - 50
     desired_height = screen_height - 100
-    # Calculate cell dimensions for each set's result area
-    global cell_width, cell_height
-    cell_width = desired_width / n_columns
-    cell_height = desired_height / n_rows
     # Resize the main window to fit the results
     root.geometry(f"{desired_width}x{desired_height}")
 
@@ -597,32 +925,63 @@ def show_dice_results():
     header_frame = Frame(results_menu)
     header_frame.pack(side="top", fill="x", pady=5)
     # Back button to return to settings view
-    Button(header_frame, text="Back to Settings", command=show_settings).pack(padx=5, pady=5)
-
-    # Create a content frame to hold each set's result section
-    content_frame = Frame(results_menu)
-    content_frame.pack(fill="both", expand=True)
-
-    # Create a result display frame for each set of dice
-    for i, (set_name, dice_count, dice_sides, dice_color_label, text_color_label) in enumerate(sets):
-        # Create a fixed-size frame for this set's results
-        set_frame = Frame(content_frame, bd=1, relief="groove",
-                          width=int(cell_width), height=int(cell_height))
-        set_frame.grid_propagate(False)  # prevent the frame from shrinking to fit its content
-        set_frame.grid(row=i % 3, column=i // 3, padx=10, pady=10, sticky="nsew")
-
-        # Within each set frame, a sub-frame will hold the Matplotlib canvas for dice
-        result_frame = Frame(set_frame)
-        result_frame.pack(fill="both", expand=True)
-        # Button to roll this set's dice (capturing current parameters via lambda)
-        Button(set_frame, text=f"{set_name.get()} - Roll Dice",
-               command=lambda rf=result_frame, dc=dice_count, ds=dice_sides, sn=set_name,
-                              dc_lbl=dice_color_label, tc_lbl=text_color_label: roll_single_set(
-                                  rf, dc, ds, sn.get(), dc_lbl["bg"], tc_lbl["bg"])
-        ).pack(side="bottom", pady=2)
+    Button(header_frame, text="Back to Settings", command=show_settings).pack(side="left", padx=5, pady=5)
+    # Button to roll every set at once, and a label for the time it took
+    roll_all_status = Label(header_frame, text=f"Seed {session_seed}")
+    Button(header_frame, text="Roll All Sets",
+           command=lambda: roll_all_sets(roll_all_status)).pack(side="left", padx=5, pady=5)
+    roll_all_status.pack(side="left", padx=5, pady=5)
+    # Live face-frequency histograms for fairness monitoring
+    histograms_shown = tk.BooleanVar(value=show_histograms)
+    tk.Checkbutton(header_frame, text="Face frequencies", variable=histograms_shown,
+                   command=lambda: toggle_histograms(histograms_shown.get())).pack(side="left", padx=5, pady=5)
+    # Tumbling dice before every result
+    animation_shown = tk.BooleanVar(value=animate_rolls)
+    tk.Checkbutton(header_frame, text="Animate rolls", variable=animation_shown,
+                   command=lambda: toggle_animation(animation_shown.get())).pack(side="left", padx=5, pady=5)
+
+    # Status bar with the p50/p95/p99 timings of the hot path (packed before the canvas so it
+    # keeps its place at the bottom)
+    global perf_label
+    perf_label = None
+    if dice_perf.enabled:
+        perf_label = Label(results_menu, text=dice_perf.status_text(), justify="left", anchor="w",
+                           font=("Courier", 9))
+        perf_label.pack(side="bottom", fill="x")
+
+    # Scrollable canvas that holds the cells of the sets in view
+    results_scrollbar = tk.Scrollbar(results_menu, orient="vertical")
+    results_scrollbar.pack(side="right", fill="y")
+    results_canvas = tk.Canvas(results_menu, highlightthickness=0, yscrollcommand=on_results_scroll)
+    results_canvas.pack(fill="both", expand=True)
+    results_scrollbar.config(command=results_canvas.yview)
+
+    # Estimate the cell dimensions from the space below the header; once the window is mapped
+    # (and whenever it is resized) relayout_results fits them to the actual canvas size
+    root.update_idletasks()
+    status_height = perf_label.winfo_reqheight() if perf_label is not None else 0
+    set_cell_size((desired_width - results_scrollbar.winfo_reqwidth()) / results_columns,
+                  (desired_height - header_frame.winfo_reqheight() - status_height - 10) / results_rows)
+    results_canvas.bind("<Configure>", on_results_configure)
 
     # Show the results frame
     results_menu.pack(fill="both", expand=True)
+    layout_result_cells()
+
+def close_app():
+    """Save the roll log's index and close the main window."""
+    # Closed before taking the lock: load_backend holds it while it asks the roll service for
+    # its seed, and closing the client ends a request to a slow or hung service at once
+    if roll_client is not None:
+        roll_client.close()
+    with backend_lock:
+        if roll_worker is not None:
+            roll_worker.close()
+        if roll_log is not None:
+            roll_log.close()
+    # Write the hot-path timings if DICEAPP_PERF names a JSON file
+    dice_perf.dump()
+    root.destroy()
 
 def show_settings():
     """
@@ -631,35 +990,70 @@ def show_settings():
     results_menu.pack_forget()
     settings_frame.pack(fill="both", expand=True)
 
-# Create the main application window
-root = tk.Tk()
-root.option_add("*Font", "Arial 12")            # Use a pleasant default font for all widgets
-root.title("Dice Roller with Adaptive Sizes")   # Set window title
-
-# Global list to store each set's widgets/configuration
-sets = []
-
-# Set up the settings frame (for configuring dice sets)
-settings_frame = Frame(root)
-settings_frame.pack(fill="both", expand=True)
-
-# Top section of settings: input for number of sets
-top_frame = Frame(settings_frame)
-top_frame.pack(side="top", fill="x", pady=5)
-Label(top_frame, text="How many sets do you want to roll? (1-12)").grid(row=0, column=0, padx=5)
-enter_set = IntEntry(top_frame, width=5, lower_bound=1, upper_bound=12)
-enter_set.grid(row=0, column=1, padx=5)
-# Buttons to proceed or finish configuration:
-Button(top_frame, text="Next", command=confirm_sets).grid(row=0, column=2, padx=5)
-Button(top_frame, text="Confirm Settings", command=show_dice_results).grid(row=0, column=3, padx=5)
-
-# Frame that will contain the dynamic set configuration frames
-grid_frame = Frame(settings_frame)
-grid_frame.pack(fill="both", expand=True)
-
-# Frame (initially hidden) that will display the dice roll results for all sets
-results_menu = Frame(root)
-
-# Start the Tkinter main loop
-root.mainloop()
->>>>>>> 7f9cce714ad0d44fa1f11403ef413a51d9dc890d
+# The GUI is only built when this file is run as a program, so the functions above can be
+# imported without a display (the roll logic itself lives in dice_engine)
+if __name__ == "__main__":
+    startup_times["imports"] = time.perf_counter() - startup_begin
+
+    # Create the main application window
+    tk_start = time.perf_counter()
+    root = tk.Tk()
+    root.option_add("*Font", "Arial 12")            # Use a pleasant default font for all widgets
+    root.title("Dice Roller with Adaptive Sizes")   # Set window title
+    startup_times["Tk init"] = time.perf_counter() - tk_start
+
+    # Global list to store each set's widgets/configuration
+    sets = []
+
+    # Set up the settings frame (for configuring dice sets)
+    settings_frame = Frame(root)
+    settings_frame.pack(fill="both", expand=True)
+
+    # Top section of settings: input for number of sets
+    top_frame = Frame(settings_frame)
+    top_frame.pack(side="top", fill="x", pady=5)
+    Label(top_frame, text=f"How many sets do you want to roll? (1-{MAX_SETS})").grid(row=0, column=0, padx=5)
+    enter_set = IntEntry(top_frame, width=5, lower_bound=1, upper_bound=MAX_SETS)
+    enter_set.grid(row=0, column=1, padx=5)
+    # Buttons to proceed or finish configuration:
+    Button(top_frame, text="Next", command=confirm_sets).grid(row=0, column=2, padx=5)
+    Button(top_frame, text="Confirm Settings", command=show_dice_results).grid(row=0, column=3, padx=5)
+    # Import of many sets from a CSV or JSON file, and the result of the last import
+    Button(top_frame, text="Import Sets...", command=import_sets).grid(row=0, column=4, padx=5)
+    import_status = Label(top_frame, text="")
+    import_status.grid(row=1, column=0, columnspan=5, sticky="w", padx=5)
+
+    # Scrollable area with a frame that will contain the dynamic set configuration frames
+    settings_canvas = tk.Canvas(settings_frame, highlightthickness=0)
+    settings_xscroll = tk.Scrollbar(settings_frame, orient="horizontal", command=settings_canvas.xview)
+    settings_yscroll = tk.Scrollbar(settings_frame, orient="vertical", command=settings_canvas.yview)
+    settings_canvas.config(xscrollcommand=settings_xscroll.set, yscrollcommand=settings_yscroll.set)
+    settings_xscroll.pack(side="bottom", fill="x")
+    settings_yscroll.pack(side="right", fill="y")
+    settings_canvas.pack(fill="both", expand=True)
+    grid_frame = Frame(settings_canvas)
+    settings_canvas.create_window(0, 0, window=grid_frame, anchor="nw")
+    grid_frame.bind("<Configure>",
+                    lambda event: settings_canvas.config(scrollregion=settings_canvas.bbox("all")))
+
+    # Frame (initially hidden) that will display the dice roll results for all sets
+    results_menu = Frame(root)
+    # Scroll the results with the mouse wheel (Windows/macOS and X11 events)
+    root.bind("<MouseWheel>", scroll_results)
+    root.bind("<Button-4>", scroll_results)
+    root.bind("<Button-5>", scroll_results)
+
+    # Close the roll log cleanly when the window is closed
+    root.protocol("WM_DELETE_WINDOW", close_app)
+    # Load Matplotlib and NumPy in the background while the user fills in the settings
+    check_render_backend()
+    threading.Thread(target=load_backend, daemon=True).start()
+    # Report the startup timings after the first paint if requested
+    if os.environ.get("DICEAPP_STARTUP_REPORT"):
+        root.bind("<Expose>", report_first_paint)
+    # Keep the timings in the results view's status bar up to date
+    if dice_perf.enabled:
+        root.after(PERF_REFRESH_MS, update_perf_label)
+
+    # Start the Tkinter main loop
+    root.mainloop()
@@ -0,0 +1,132 @@
+"""
+Frame-budgeted tumbling animation of rolls in the results view.
+
+A RollAnimator drives all running animations from one root.after loop with a fixed frame
+budget (FRAME_MS). Frame numbers are taken from a shared clock, so when a frame took too long
+or the timer fired late, the frames that are already overdue are dropped instead of being
+drawn late, and an animation always ends on time. Every set shows its final roll after
+DURATION_MS.
+
+A frame does not draw any faces: it only points the dice of the render sessions at a few
+faces per set (tumble_faces), which the sessions already have as canvas items or cached
+images. The time spent per frame, the number of dropped frames and the frames over budget
+are kept in stats(), so the budget can be checked on the target hardware.
+"""
+import math                                        # Rounding of timer delays
+import random                                      # Fixed pseudo-random tumble sequence
+import time                                        # Frame clock
+import dice_perf                                   # Rolling window of frame times
+
+# Frame budget in milliseconds (about 60 frames per second)
+FRAME_MS = 16
+# Length of an animation in milliseconds
+DURATION_MS = 400
+# Number of different faces a die shows while tumbling
+TUMBLE_FACES = 6
+# Pseudo-random sequence the tumbling faces are picked from (fixed, so frames cost no RNG calls)
+TUMBLE_SEQUENCE = random.Random(1234).choices(range(1 << 16), k=251)
+
+
+def tumble_faces(sides):
+    """Return the faces a die with the given number of sides shows while tumbling."""
+    if sides <= TUMBLE_FACES:
+        return tuple(range(1, sides + 1))
+    # Faces spread over the whole range, e.g. 1, 5, 9, 12, 16, 20 for a d20
+    return tuple(sorted({round(1 + i * (sides - 1) / (TUMBLE_FACES - 1)) for i in range(TUMBLE_FACES)}))
+
+
+def tumble_frame(faces, count, frame):
+    """Return the faces of count dice in the given frame of a tumble."""
+    return [faces[TUMBLE_SEQUENCE[(frame * 13 + i * 31) % len(TUMBLE_SEQUENCE)] % len(faces)]
+            for i in range(count)]
+
+
+class RollAnimator:
+    """Runs the tumbling animations of all sets on one frame clock."""
+
+    def __init__(self, root, frame_ms=FRAME_MS, duration_ms=DURATION_MS):
+        """
+        Parameters:
+            root        - Tk root window (its after() drives the frames)
+            frame_ms    - Frame budget in milliseconds
+            duration_ms - Length of an animation in milliseconds
+        """
+        self.root = root
+        self.frame_seconds = frame_ms / 1000
+        self.frames_per_roll = max(1, round(duration_ms / frame_ms))
+        # Running animations by key: (first frame, draw_frame, finish)
+        self.animations = {}
+        # Start of the frame clock, the last frame drawn and the pending timer
+        self.clock_start = 0.0
+        self.last_frame = -1
+        self.job = None
+        # Statistics
+        self.frame_times = dice_perf.Histogram()
+        self.frames = 0
+        self.dropped = 0
+        self.over_budget = 0
+
+    def start(self, key, draw_frame, finish):
+        """
+        Start an animation. A running animation with the same key is replaced (without
+        calling its finish; the new animation ends with the latest result).
+
+        Parameters:
+            key        - Key of the animation, e.g. the index of the set
+            draw_frame - Function called with the frame number (0, 1, ...) of the animation;
+                         if it returns False, the animation is stopped (e.g. its set was
+                         scrolled out of view)
+            finish     - Function called once after the last frame
+        """
+        if self.job is None:
+            # The clock only runs while there are animations
+            self.clock_start = time.perf_counter()
+            self.last_frame = -1
+            self.job = self.root.after(0, self._tick)
+        self.animations[key] = (self.last_frame + 1, draw_frame, finish)
+
+    def stop(self):
+        """Finish all running animations at once (e.g. before the results view is rebuilt)."""
+        if self.job is not None:
+            self.root.after_cancel(self.job)
+            self.job = None
+        animations = list(self.animations.values())
+        self.animations.clear()
+        for _, _, finish in animations:
+            finish()
+
+    def _tick(self):
+        """Draw the current frame of every animation and schedule the next frame."""
+        self.job = None
+        now = time.perf_counter()
+        frame = int((now - self.clock_start) / self.frame_seconds)
+        if frame > self.last_frame:
+            if self.last_frame >= 0:
+                # Frames whose time has passed are skipped, not drawn late
+                self.dropped += frame - self.last_frame - 1
+            self.last_frame = frame
+            for key, (first_frame, draw_frame, finish) in list(self.animations.items()):
+                if frame - first_frame >= self.frames_per_roll:
+                    del self.animations[key]
+                    finish()
+                elif draw_frame(frame - first_frame) is False:
+                    del self.animations[key]
+            work = time.perf_counter() - now
+            self.frame_times.add(work)
+            self.frames += 1
+            if work > self.frame_seconds:
+                self.over_budget += 1
+            if dice_perf.enabled:
+                dice_perf.record("animation.frame", work)
+        if self.animations:
+            # Wake up at the start of the next frame (never early, so no frame is drawn twice)
+            deadline = self.clock_start + (self.last_frame + 1) * self.frame_seconds
+            delay = max(1, math.ceil((deadline - time.perf_counter()) * 1000))
+            self.job = self.root.after(delay, self._tick)
+
+    def stats(self):
+        """Return the frame statistics: frame time percentiles (ms), frames, dropped and over budget."""
+        stats = self.frame_times.summary()
+        stats.update(budget_ms=self.frame_seconds * 1000, frames=self.frames, dropped=self.dropped,
+                     over_budget=self.over_budget)
+        return stats
@@ -0,0 +1,213 @@
+"""
+GUI-free dice rolling engine.
+
+A dice set is described by a (count, sides) pair. All rolls are drawn with
+numpy.random.Generator.integers in a single call per batch, so rolling many dice costs one
+vectorized call instead of one Python call per die. Large batches can be streamed in chunks,
+so no more than chunk_dice dice are held in memory at once.
+
+For reproducible rolls every set can have its own RollStream: a counter-based Philox generator
+keyed by a seed and the set's stream id. Roll k of a stream is drawn from its own block of the
+Philox counter, so any earlier roll can be regenerated in O(1) without replaying the stream,
+and streams of different sets share no state.
+"""
+import numpy as np                                 # Vectorized random numbers and arrays
+
+# Default number of dice generated per chunk in streaming mode (about 16 MB of uint8 dice)
+DEFAULT_CHUNK_DICE = 1 << 24
+
+
+def make_rng(seed=None):
+    """Return a new NumPy Generator (seeded from the OS if seed is None)."""
+    return np.random.default_rng(seed)
+
+
+def check_set(count, sides):
+    """
+    Raise ValueError if (count, sides) does not describe a valid dice set.
+
+    Parameters:
+        count - Number of dice in the set (at least 1)
+        sides - Number of sides on each die (at least 2)
+    """
+    if count < 1:
+        raise ValueError(f"dice count must be at least 1, not {count}")
+    if sides < 2:
+        raise ValueError(f"dice sides must be at least 2, not {sides}")
+
+
+def dice_dtype(max_sides):
+    """Return the smallest unsigned integer dtype that can hold a face of max_sides."""
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_sides <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _column_sides(sets):
+    """Return an array with the number of sides for every die column of the given sets."""
+    for count, sides in sets:
+        check_set(count, sides)
+    return np.repeat([sides for _, sides in sets], [count for count, _ in sets])
+
+
+def set_offsets(sets):
+    """
+    Return the index of the first die column of each set.
+
+    The columns of set i in a roll array are offsets[i]:offsets[i] + count_i.
+    """
+    counts = [count for count, _ in sets]
+    return np.concatenate(([0], np.cumsum(counts)[:-1])).astype(np.intp)
+
+
+def roll_dice(count, sides, n_rolls=1, rng=None):
+    """
+    Roll one dice set n_rolls times.
+
+    Parameters:
+        count   - Number of dice in the set
+        sides   - Number of sides on each die
+        n_rolls - Number of rolls of the whole set
+        rng     - NumPy Generator to use (a fresh one if None)
+
+    Returns:
+        An integer array of shape (n_rolls, count) with faces from 1 to sides
+    """
+    return roll_sets([(count, sides)], n_rolls, rng)
+
+
+def roll_sets(sets, n_rolls=1, rng=None):
+    """
+    Roll several dice sets together in one vectorized call.
+
+    Parameters:
+        sets    - List of (count, sides) pairs
+        n_rolls - Number of rolls of all sets
+        rng     - NumPy Generator to use (a fresh one if None)
+
+    Returns:
+        An integer array of shape (n_rolls, total dice count). The dice of each set are
+        consecutive columns, in the order of sets (see set_offsets).
+    """
+    if rng is None:
+        rng = make_rng()
+    column_sides = _column_sides(sets)
+    # high is exclusive and broadcast over the columns, so mixed sides need only one call
+    return rng.integers(1, column_sides + 1, size=(n_rolls, len(column_sides)),
+                        dtype=dice_dtype(column_sides.max()))
+
+
+def set_sums(rolls, sets):
+    """
+    Return the total of each set for every roll.
+
+    Parameters:
+        rolls - Array returned by roll_sets for the same sets
+        sets  - List of (count, sides) pairs
+
+    Returns:
+        An int64 array of shape (n_rolls, number of sets)
+    """
+    return np.add.reduceat(rolls, set_offsets(sets), axis=1, dtype=np.int64)
+
+
+def roll_chunks(sets, n_rolls, rng=None, chunk_dice=DEFAULT_CHUNK_DICE):
+    """
+    Roll several dice sets n_rolls times, yielding the rolls in chunks.
+
+    Each chunk is an array as returned by roll_sets with at most chunk_dice dice (but at
+    least one roll), so arbitrarily large batches never materialize at once.
+
+    Parameters:
+        sets       - List of (count, sides) pairs
+        n_rolls    - Total number of rolls of all sets
+        rng        - NumPy Generator to use (a fresh one if None)
+        chunk_dice - Upper bound for the number of dice in one chunk
+    """
+    if rng is None:
+        rng = make_rng()
+    dice_per_roll = sum(count for count, _ in sets)
+    rolls_per_chunk = max(1, chunk_dice // max(1, dice_per_roll))
+    remaining = n_rolls
+    while remaining > 0:
+        n = min(rolls_per_chunk, remaining)
+        yield roll_sets(sets, n, rng)
+        remaining -= n
+
+
+class RollStream:
+    """
+    Reproducible random stream of one dice set with O(1) access to every roll.
+
+    Roll k uses the Philox counter (0, k, 0, 0) with a key derived from (seed, stream_id), so
+    it only depends on the seed, the stream id, k and the set's (count, sides).
+    """
+    def __init__(self, seed=None, stream_id=0):
+        """
+        Parameters:
+            seed      - Integer seed shared by all streams of a session (fresh entropy if None;
+                        the value used is available as the seed attribute)
+            stream_id - Number of the stream, e.g. the index of the set
+        """
+        sequence = np.random.SeedSequence(seed, spawn_key=(stream_id,))
+        self.seed = sequence.entropy
+        self.stream_id = stream_id
+        # Number of the next roll
+        self.position = 0
+        self._bit_generator = np.random.Philox(key=sequence.generate_state(2, np.uint64))
+        self._generator = np.random.Generator(self._bit_generator)
+        # Reusing one bit generator and only resetting its counter is much cheaper than
+        # creating a new one for every roll
+        self._state = self._bit_generator.state
+
+    def roll_at(self, k, count, sides):
+        """
+        Return roll number k of a (count, sides) set without changing the position.
+
+        Returns:
+            An integer array of shape (count,) with faces from 1 to sides
+        """
+        check_set(count, sides)
+        return self.generator_at(k).integers(1, sides + 1, size=count, dtype=dice_dtype(sides))
+
+    def generator_at(self, k):
+        """
+        Return the stream's Generator positioned at the start of roll number k, e.g. for
+        rolling a dice expression. The Generator is shared by all rolls of the stream, so use
+        it before asking the stream for another roll.
+        """
+        if k < 0:
+            raise ValueError(f"roll number must not be negative, not {k}")
+        state = self._state
+        state["state"]["counter"][:] = (0, k, 0, 0)
+        # Discard buffered output of the previous roll
+        state["buffer_pos"] = 4
+        state["has_uint32"] = 0
+        self._bit_generator.state = state
+        return self._generator
+
+    def next_generator(self):
+        """Return the Generator positioned at the next roll and advance the stream by one roll."""
+        generator = self.generator_at(self.position)
+        self.position += 1
+        return generator
+
+    def roll(self, count, sides, n_rolls=1):
+        """
+        Roll the set n_rolls times starting at the current position and advance it.
+
+        Returns:
+            An integer array of shape (n_rolls, count)
+        """
+        rolls = np.empty((n_rolls, count), dtype=dice_dtype(sides))
+        for i in range(n_rolls):
+            rolls[i] = self.roll_at(self.position + i, count, sides)
+        self.position += n_rolls
+        return rolls
+
+    def jump(self, k):
+        """Move the stream to roll number k (O(1)); the next roll() returns roll k."""
+        if k < 0:
+            raise ValueError(f"roll number must not be negative, not {k}")
+        self.position = k
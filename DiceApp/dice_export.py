@@ -0,0 +1,164 @@
+"""
+Offscreen export of rolled dice grids to image files (no display or Tk root needed).
+
+A GridExporter draws the dice grid of one roll (up to 6 dice per row, like the results view)
+on a single Matplotlib figure with the Agg canvas and saves it as PNG or SVG. The figure and
+its dice faces are created once and reused for every export; an export only moves and updates
+the existing artists. export_rolls writes a whole batch of rolls, optionally spread over a
+pool of threads or worker processes, each with its own exporter.
+"""
+import itertools                                   # Taking jobs in batches
+import math                                        # Math for calculations (e.g. ceil)
+import os                                          # Output paths and CPU count
+import threading                                   # One exporter per thread
+from collections import namedtuple                 # Lightweight record for export jobs
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait  # Worker pools
+from matplotlib.figure import Figure               # Figure class that is not tracked by pyplot
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # Offscreen rasterization
+from dice_render import FACE_FRACTION
+from dice_render_mpl import DiceFace
+
+# One image to export:
+#   path         - Output file (the format is taken from its extension: .png or .svg)
+#   rolls        - The rolled faces (at most MAX_DICE)
+#   dice_color   - Background color of the dice faces
+#   number_color - Color of the numbers or pips
+#   use_dots     - If True, faces are drawn as pips instead of numbers
+#   title        - Text above the dice, e.g. the set name and the total ("" for none)
+ExportJob = namedtuple("ExportJob", ["path", "rolls", "dice_color", "number_color", "use_dots", "title"],
+                       defaults=["white", "black", False, ""])
+
+# Largest number of dice in one image (the largest dice count of a set)
+MAX_DICE = 12
+# Size of one die's square slot in inches
+DIE_INCHES = 1.0
+# Height of the title strip above the dice in inches
+TITLE_INCHES = 0.4
+# Jobs handed to a pool worker at once, so the pool overhead is shared by many images
+JOBS_PER_TASK = 64
+
+
+class GridExporter:
+    """Renders dice grids to files on one reusable offscreen figure."""
+
+    def __init__(self, dpi=100):
+        """
+        Parameters:
+            dpi - Resolution of PNG images (pixels per inch; a die is DIE_INCHES wide)
+        """
+        self.dpi = dpi
+        self.figure = Figure(dpi=dpi)
+        FigureCanvasAgg(self.figure)
+        # All faces are created once; faces that a roll does not need are hidden
+        self.faces = [DiceFace(self.figure.add_axes([0, 0, 1, 1])) for _ in range(MAX_DICE)]
+        for face in self.faces:
+            # Faces have no ticks, so skip drawing the (empty) axes; the spines still frame the die
+            face.ax.xaxis.set_visible(False)
+            face.ax.yaxis.set_visible(False)
+        self.title = self.figure.text(0.5, 1.0, "", ha="center", va="top", fontsize=12, fontweight="bold")
+        self.count = None
+        self.has_title = None
+
+    def _layout(self, count, has_title):
+        """Resize the figure and place the faces for a grid of count dice."""
+        if (count, has_title) == (self.count, self.has_title):
+            return
+        cols = min(6, count)
+        rows = math.ceil(count / 6)
+        title_inches = TITLE_INCHES if has_title else 0
+        width = cols * DIE_INCHES
+        height = rows * DIE_INCHES + title_inches
+        self.figure.set_size_inches(width, height)
+        margin = (1 - FACE_FRACTION) / 2 * DIE_INCHES
+        for i, face in enumerate(self.faces):
+            face.ax.set_visible(i < count)
+            if i < count:
+                # Slot position in inches from the bottom-left corner of the figure
+                x = (i % 6) * DIE_INCHES + margin
+                y = (rows - 1 - i // 6) * DIE_INCHES + margin
+                size = FACE_FRACTION * DIE_INCHES
+                face.ax.set_position([x / width, y / height, size / width, size / height])
+        self.title.set_position((0.5, 1 - 0.05 * DIE_INCHES / height))
+        self.count = count
+        self.has_title = has_title
+
+    def export(self, job):
+        """
+        Render one roll and save it to job.path.
+
+        Parameters:
+            job - An ExportJob
+        """
+        count = len(job.rolls)
+        if not 1 <= count <= MAX_DICE:
+            raise ValueError(f"an image holds 1 to {MAX_DICE} dice, not {count}")
+        self._layout(count, bool(job.title))
+        for face, number in zip(self.faces, job.rolls):
+            face.update(number, job.dice_color, job.number_color, job.use_dots)
+        self.title.set_text(job.title)
+        self.figure.savefig(job.path, dpi=self.dpi)
+        return job.path
+
+
+# Exporter of the current worker thread or process, created on first use
+_local = threading.local()
+
+
+def _export_batch(jobs, dpi):
+    """Export a list of jobs with the exporter of the current thread or process."""
+    exporter = getattr(_local, "exporter", None)
+    if exporter is None or exporter.dpi != dpi:
+        exporter = _local.exporter = GridExporter(dpi)
+    return [exporter.export(job) for job in jobs]
+
+
+def export_rolls(jobs, workers=1, pool="process", dpi=100):
+    """
+    Export many rolls to image files.
+
+    Parameters:
+        jobs    - Iterable of ExportJob (consumed lazily, e.g. a generator)
+        workers - Number of threads or worker processes; 1 exports in the calling thread
+        pool    - "process" (uses all cores) or "thread" (no process start-up, but Matplotlib
+                  drawing holds the GIL, so it mostly overlaps file writes)
+        dpi     - Resolution of PNG images
+
+    Returns:
+        The number of images written
+    """
+    if pool not in ("process", "thread"):
+        raise ValueError(f"unknown pool {pool!r} (expected 'process' or 'thread')")
+    workers = workers or os.cpu_count() or 1
+    jobs = iter(jobs)
+    directories = set()
+
+    def next_batch():
+        """Take the next JOBS_PER_TASK jobs and create their output directories."""
+        batch = list(itertools.islice(jobs, JOBS_PER_TASK))
+        for directory in {os.path.dirname(job.path) for job in batch} - directories:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            directories.add(directory)
+        return batch
+
+    # Jobs are taken from the iterable one batch at a time, so memory does not grow with
+    # the number of images
+    batch = next_batch()
+    if workers == 1 or len(batch) < JOBS_PER_TASK:
+        written = 0
+        while batch:
+            written += len(_export_batch(batch, dpi))
+            batch = next_batch()
+        return written
+    written = 0
+    executor_class = ProcessPoolExecutor if pool == "process" else ThreadPoolExecutor
+    with executor_class(max_workers=workers) as executor:
+        pending = set()
+        while batch or pending:
+            # At most two batches per worker are in flight: one running, one waiting
+            while batch and len(pending) < 2 * workers:
+                pending.add(executor.submit(_export_batch, batch, dpi))
+                batch = next_batch()
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            written += sum(len(future.result()) for future in done)
+    return written
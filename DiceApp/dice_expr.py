@@ -0,0 +1,283 @@
+"""
+Dice notation compiler, e.g. "4d6kh3 + 2d8! - 1d4 + 5".
+
+An expression is a sum of terms. A term is a constant or NdS (N dice with S sides; N defaults
+to 1 and "d%" means 100 sides) followed by optional modifiers:
+
+    !     exploding dice: a die showing its highest face is rolled again and the rolls are
+          added (at most MAX_EXPLOSIONS extra rolls per die)
+    khK   keep the K highest dice (kK is the same)
+    klK   keep the K lowest dice
+
+compile_expression parses an expression once into a Plan and memoizes it, so an expression
+that is rolled again costs only a dictionary lookup. A Plan rolls any number of rolls at once
+with one vectorized call per term, and its exact distribution is computed once per plan and
+memoized as well.
+"""
+import math                                        # Binomial coefficients for keep distributions
+import re                                          # Tokenizing expressions
+from collections import namedtuple                 # Immutable (hashable) plans
+from functools import lru_cache                    # Memoization of plans and distributions
+import numpy as np                                 # Vectorized rolls and distributions
+import dice_engine                                 # Set validation and dice dtypes
+import dice_stats                                  # Exact sums of dice
+
+# Most extra rolls of one exploding die (keeps rolls and distributions finite)
+MAX_EXPLOSIONS = 20
+# One term with its sign: a dice term NdS with modifiers, or an integer constant
+TERM_PATTERN = re.compile(r"\s*([+-])?\s*(?:(\d*)\s*d\s*(\d+|%)((?:\s*(?:!|k[hl]?\s*\d+))*)|(\d+))\s*", re.IGNORECASE)
+MODIFIER_PATTERN = re.compile(r"\s*(?:(!)|k([hl]?)\s*(\d+))", re.IGNORECASE)
+
+# A dice term of a plan:
+#   sign        - +1 or -1
+#   count       - Number of dice
+#   sides       - Number of sides on each die
+#   explode     - If True, dice showing their highest face are rolled again and added
+#   keep        - Number of dice that count towards the total (None for all)
+#   keep_lowest - If True, the lowest keep dice count instead of the highest
+DiceTerm = namedtuple("DiceTerm", ["sign", "count", "sides", "explode", "keep", "keep_lowest"])
+
+
+class Plan(namedtuple("Plan", ["text", "terms", "constant"])):
+    """
+    Compiled dice expression: the dice terms in order and the sum of the constants.
+    Plans are immutable and hashable, so they can be memoized and used as cache keys.
+    """
+    __slots__ = ()
+
+    @property
+    def dice_count(self):
+        """Number of dice rolled (without the extra rolls of exploding dice)."""
+        return sum(term.count for term in self.terms)
+
+    @property
+    def plain(self):
+        """(count, sides) if the plan is a plain NdS with no modifiers, otherwise None."""
+        if self.constant == 0 and len(self.terms) == 1:
+            term = self.terms[0]
+            if term.sign > 0 and not term.explode and term.keep is None:
+                return term.count, term.sides
+        return None
+
+    def evaluate(self, n_rolls=1, rng=None):
+        """
+        Roll the expression n_rolls times.
+
+        Parameters:
+            n_rolls - Number of rolls
+            rng     - NumPy Generator to use (a fresh one if None)
+
+        Returns:
+            A tuple (faces, totals): faces is an integer array of shape (n_rolls, dice_count)
+            with the value of every die (including explosions) in term order, totals an int64
+            array of shape (n_rolls,) with the value of the expression
+        """
+        if rng is None:
+            rng = dice_engine.make_rng()
+        totals = np.full(n_rolls, self.constant, dtype=np.int64)
+        faces = []
+        for term in self.terms:
+            values = _roll_term(term, n_rolls, rng)
+            faces.append(values)
+            if term.keep is None:
+                kept = values
+            elif term.keep_lowest:
+                kept = np.partition(values, term.keep - 1, axis=1)[:, :term.keep]
+            else:
+                kept = np.partition(values, term.count - term.keep, axis=1)[:, term.count - term.keep:]
+            totals += term.sign * kept.sum(axis=1, dtype=np.int64)
+        if not faces:
+            # An expression of constants only rolls no dice
+            faces = [np.zeros((n_rolls, 0), dtype=np.uint8)]
+        return (faces[0] if len(faces) == 1 else np.concatenate(faces, axis=1)), totals
+
+    def distribution(self):
+        """Return the exact distribution as (min_total, pmf, cdf); see plan_distribution."""
+        return plan_distribution(self)
+
+    def mean(self):
+        """Return the exact expected value of the expression."""
+        min_total, pmf, _ = plan_distribution(self)
+        return float(np.dot(np.arange(min_total, min_total + len(pmf)), pmf))
+
+    def odds(self, total):
+        """
+        Return the probability of rolling exactly total and its percentile (the percentage
+        of rolls with a total less than or equal to total), like dice_stats.total_odds.
+        """
+        min_total, pmf, cdf = plan_distribution(self)
+        i = total - min_total
+        if i < 0:
+            return 0.0, 0.0
+        if i >= len(pmf):
+            return 0.0, 100.0
+        return float(pmf[i]), float(cdf[i]) * 100
+
+
+@lru_cache(maxsize=256)
+def compile_expression(text):
+    """
+    Parse a dice expression into a Plan (memoized on the expression text).
+
+    Parameters:
+        text - The expression, e.g. "4d6kh3+2" or "3d6!"
+
+    Raises:
+        ValueError if the expression is not valid dice notation
+    """
+    terms = []
+    constant = 0
+    position = 0
+    text = text.strip()
+    if not text:
+        raise ValueError("empty dice expression")
+    while position < len(text):
+        match = TERM_PATTERN.match(text, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"invalid dice expression {text!r} at position {position + 1}")
+        sign_text, count_text, sides_text, modifiers, number = match.groups()
+        # Every term after the first one needs an operator
+        if sign_text is None and position > 0:
+            raise ValueError(f"missing + or - in dice expression {text!r} at position {position + 1}")
+        sign = -1 if sign_text == "-" else 1
+        if number is not None:
+            constant += sign * int(number)
+        else:
+            terms.append(_dice_term(text, sign, count_text, sides_text, modifiers))
+        position = match.end()
+    return Plan(text, tuple(terms), constant)
+
+
+def _dice_term(text, sign, count_text, sides_text, modifiers):
+    """Build the DiceTerm of one NdS term and its modifiers."""
+    count = int(count_text) if count_text else 1
+    sides = 100 if sides_text == "%" else int(sides_text)
+    try:
+        dice_engine.check_set(count, sides)
+    except ValueError as error:
+        raise ValueError(f"invalid dice expression {text!r}: {error}") from None
+    explode = False
+    keep = None
+    keep_lowest = False
+    for bang, lowest, keep_text in MODIFIER_PATTERN.findall(modifiers):
+        if bang:
+            explode = True
+        else:
+            keep = int(keep_text)
+            keep_lowest = lowest.lower() == "l"
+            if keep < 1:
+                raise ValueError(f"invalid dice expression {text!r}: must keep at least one die")
+    # Keeping all dice is the same as keeping none out
+    if keep is not None and keep >= count:
+        keep = None
+        keep_lowest = False
+    return DiceTerm(sign, count, sides, explode, keep, keep_lowest)
+
+
+def _roll_term(term, n_rolls, rng):
+    """Return the values of the dice of one term for n_rolls rolls, shape (n_rolls, count)."""
+    # The same dtype as dice_engine, so a plain NdS plan rolls the same faces as RollStream.roll_at
+    values = rng.integers(1, term.sides + 1, size=(n_rolls, term.count), dtype=dice_engine.dice_dtype(term.sides))
+    if not term.explode:
+        return values
+    values = values.astype(np.int64)
+    exploding = values == term.sides
+    for _ in range(MAX_EXPLOSIONS):
+        n_exploding = int(exploding.sum())
+        if n_exploding == 0:
+            break
+        extra = rng.integers(1, term.sides + 1, size=n_exploding)
+        values[exploding] += extra
+        # Only the dice whose extra roll was the highest face explode again
+        again = np.zeros_like(exploding)
+        again[exploding] = extra == term.sides
+        exploding = again
+    return values
+
+
+def _die_pmf(term):
+    """Return the PMF of one die of the term; index i is the probability of the value 1 + i."""
+    sides = term.sides
+    if not term.explode:
+        return np.full(sides, 1.0 / sides)
+    # The value m * sides + r (r < sides) needs m explosions followed by the roll r; after
+    # MAX_EXPLOSIONS explosions the last roll counts as it is
+    pmf = np.zeros(sides * (MAX_EXPLOSIONS + 1))
+    for m in range(MAX_EXPLOSIONS):
+        pmf[m * sides:m * sides + sides - 1] = sides ** -(m + 1.0)
+    pmf[MAX_EXPLOSIONS * sides:] = sides ** -(MAX_EXPLOSIONS + 1.0)
+    return pmf
+
+
+def _keep_pmf(die_pmf, count, keep, lowest):
+    """
+    Return the PMF of the sum of the keep highest (or lowest) of count dice with the PMF die_pmf
+    (index i is the probability of the value 1 + i). Index i of the result is the probability
+    of the kept sum i.
+
+    The dice values are visited from the best to the worst. For every value, the number of the
+    remaining dice that show it is binomial given that they show this value or a worse one; once
+    keep dice are assigned, the rest cannot change the kept sum.
+    """
+    values = np.nonzero(die_pmf)[0] + 1
+    if not lowest:
+        values = values[::-1]
+    probabilities = die_pmf[values - 1]
+    # Probability mass of the value and all worse ones, in visiting order
+    tails = np.cumsum(probabilities[::-1])[::-1]
+    length = keep * int(values.max()) + 1
+    # states[a] is the distribution of the kept sum after a dice were assigned (a < keep)
+    states = [np.zeros(length) for _ in range(keep)]
+    states[0][0] = 1.0
+    result = np.zeros(length)
+    for value, probability, tail in zip(values.tolist(), probabilities.tolist(), tails.tolist()):
+        chance = min(1.0, probability / tail)
+        new_states = [np.zeros(length) for _ in range(keep)]
+        for assigned, state in enumerate(states):
+            if not state.any():
+                continue
+            remaining = count - assigned
+            for j in range(remaining + 1):
+                weight = math.comb(remaining, j) * chance ** j * (1 - chance) ** (remaining - j)
+                if weight == 0.0:
+                    continue
+                shift = min(j, keep - assigned) * value
+                target = result if assigned + j >= keep else new_states[assigned + j]
+                target[shift:] += weight * state[:length - shift]
+        states = new_states
+    return result
+
+
+@lru_cache(maxsize=128)
+def plan_distribution(plan):
+    """
+    Return the exact distribution of a plan's total (memoized per plan).
+
+    Returns:
+        A tuple (min_total, pmf, cdf) of read-only arrays, where pmf[i] is the probability
+        of the total min_total + i
+    """
+    if plan.plain is not None:
+        # Shared with the odds of plain sets in dice_stats
+        min_total, pmf = dice_stats.pool_pmf([plan.plain])
+    else:
+        min_total, pmf = plan.constant, np.ones(1)
+        for term in plan.terms:
+            die_pmf = _die_pmf(term)
+            if term.keep is None:
+                part_min, part = term.count, dice_stats.power_pmf(die_pmf, term.count)
+            else:
+                part = _keep_pmf(die_pmf, term.count, term.keep, term.keep_lowest)
+                part_min = int(np.argmax(part > 0))
+                part = part[part_min:]
+            if term.sign < 0:
+                # The total of a subtracted term runs from -max to -min
+                part_min, part = -(part_min + len(part) - 1), part[::-1]
+            min_total += part_min
+            pmf = dice_stats.convolve(pmf, part)
+        pmf = pmf / pmf.sum()
+    cdf = np.minimum(np.cumsum(pmf), 1.0)
+    pmf = np.array(pmf)
+    pmf.flags.writeable = False
+    cdf.flags.writeable = False
+    return min_total, pmf, cdf
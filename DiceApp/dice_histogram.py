@@ -0,0 +1,108 @@
+"""
+Live face-frequency histogram of a dice set, for watching the fairness of the dice while rolling.
+
+The bar chart is drawn in full only when it is created, resized or rescaled. The axes without
+the bars (frame, ticks, labels) are then cached as a background image. A roll restores that
+background, draws the bars and the expected-count line with their new heights and blits the
+axes area to the screen, so the cost of an update does not depend on the rest of the figure.
+The y axis grows in steps (doubling), so a full redraw is needed only O(log n) times for n rolls.
+"""
+import numpy as np                                 # Corners of the bars
+from matplotlib.collections import PolyCollection  # All bars as one artist
+from matplotlib.figure import Figure               # Figure class that is not tracked by pyplot
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # Offscreen canvas (no Tk master)
+from matplotlib.ticker import MaxNLocator          # Integer ticks for the faces
+import dice_perf                                   # Opt-in hot-path timing (DICEAPP_PERF)
+
+# Color of the bars and of the line at the count a fair die would give
+BAR_COLOR = "#4a78b5"
+EXPECTED_COLOR = "#c03030"
+# Smallest upper limit of the y axis (in rolls of a face)
+MIN_YLIM = 4
+
+
+class FaceHistogram:
+    """Bar chart of the face counts of one set, updated by blitting."""
+
+    def __init__(self, master, sides, width, height, dpi=100):
+        """
+        Parameters:
+            master - Tkinter widget the chart is packed into (None for an offscreen chart, e.g.
+                     for benchmarks; its updates stop before the blit to the screen)
+            sides  - Number of sides on each die (one bar per face)
+            width  - Width of the chart in pixels
+            height - Height of the chart in pixels
+            dpi    - Resolution of the figure
+        """
+        self.sides = sides
+        self.figure = Figure(figsize=(max(width, 50) / dpi, max(height, 30) / dpi), dpi=dpi)
+        if master is None:
+            self.canvas = FigureCanvasAgg(self.figure)
+            self.widget = None
+        else:
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+            self.widget = self.canvas.get_tk_widget()
+            self.widget.pack(fill="both", expand=True)
+        self.ax = self.figure.add_axes([0.08, 0.2, 0.9, 0.75])
+        self.ax.tick_params(labelsize=7, length=2, pad=1)
+        self.ax.xaxis.set_major_locator(MaxNLocator(nbins=12, integer=True))
+        self.ax.yaxis.set_major_locator(MaxNLocator(nbins=3, integer=True))
+        self.ax.set_xlim(0.5, sides + 0.5)
+        self.ax.set_ylim(0, MIN_YLIM)
+        # The bars are one collection of rectangles, so they are drawn with a single call.
+        # _verts[i] holds the corners of the bar of face i + 1; an update only moves the top ones.
+        left = np.arange(1, sides + 1) - 0.4
+        self._verts = np.zeros((sides, 4, 2))
+        self._verts[:, :, 0] = np.column_stack([left, left, left + 0.8, left + 0.8])
+        # Animated artists are left out of full draws; they are only drawn by blitting
+        self.bars = PolyCollection(self._verts, facecolors=BAR_COLOR, edgecolors="none", animated=True)
+        self.ax.add_collection(self.bars)
+        self.expected = self.ax.axhline(0, color=EXPECTED_COLOR, linewidth=1, linestyle="--", animated=True)
+        self.background = None
+        # Every full draw (first show, resize, expose, new y limit) renews the cached background
+        self.canvas.mpl_connect("draw_event", self._on_draw)
+        self.canvas.draw()
+
+    def _on_draw(self, event):
+        """Cache the freshly drawn background and draw the bars on top of it."""
+        self.background = self.canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_animated()
+
+    def _draw_animated(self):
+        """Draw the bars and the expected-count line."""
+        self.ax.draw_artist(self.bars)
+        self.ax.draw_artist(self.expected)
+
+    @dice_perf.timed("FaceHistogram.update")
+    def update(self, counts):
+        """
+        Show new face counts.
+
+        Parameters:
+            counts - counts[f] is how often face f was rolled (index 0 is unused), like
+                     dice_history.RollHistory.counts
+        """
+        heights = counts[1:self.sides + 1]
+        self._verts[:, 1:3, 1] = np.asarray(heights, dtype=float)[:, None]
+        self.bars.set_verts(self._verts)
+        total = sum(heights)
+        self.expected.set_ydata([total / self.sides] * 2)
+        top = max(max(heights, default=0), total / self.sides)
+        ylim = self.ax.get_ylim()[1]
+        if top > ylim or self.background is None:
+            # The tick labels change, so the background has to be drawn again
+            while top > ylim:
+                ylim *= 2
+            self.ax.set_ylim(0, ylim)
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            self._draw_animated()
+        self.canvas.blit(self.ax.bbox)
+
+    def close(self):
+        """Destroy the chart's widget."""
+        if self.widget is not None:
+            self.widget.destroy()
+            self.widget = None
@@ -0,0 +1,130 @@
+"""
+Compact per-set roll history with incremental statistics.
+
+Faces are stored in a growable array('B') (one byte per die, enough for up to 255 sides; larger
+dice use two bytes). Every statistic is updated in O(1) per die while rolls are added:
+the mean and variance of the faces (Welford's algorithm), the count of each face and the
+chi-square statistic of those counts against a fair die.
+"""
+import math                                        # Square root for the standard deviation
+from array import array                            # Compact growable storage of faces
+import numpy as np                                 # Bulk updates from roll arrays
+
+
+class RollHistory:
+    """History and running statistics of one dice set."""
+
+    def __init__(self, sides):
+        """
+        Parameters:
+            sides - Number of sides on each die of the set
+        """
+        if sides < 2:
+            raise ValueError(f"dice sides must be at least 2, not {sides}")
+        self.sides = sides
+        # All faces in roll order, and the number of dice of every roll
+        self.faces = array("B" if sides <= 255 else "H")
+        self.roll_sizes = array("H")
+        # Welford state: number of dice, mean and sum of squared deviations of the faces
+        self.n = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        # counts[f] is how often face f was rolled (index 0 is unused)
+        self.counts = [0] * (sides + 1)
+        # Sum of the squared face counts, which gives the chi-square statistic in O(1)
+        self._sum_sq_counts = 0
+
+    def add(self, rolls):
+        """
+        Add one roll of the set.
+
+        Parameters:
+            rolls - The rolled faces (a list or a one-dimensional array)
+        """
+        rolls = [int(face) for face in rolls]
+        for face in rolls:
+            if not 1 <= face <= self.sides:
+                raise ValueError(f"face {face} is not between 1 and {self.sides}")
+        self.faces.extend(rolls)
+        self.roll_sizes.append(len(rolls))
+        for face in rolls:
+            # Welford's update of mean and squared deviations
+            self.n += 1
+            delta = face - self.mean
+            self.mean += delta / self.n
+            self._m2 += delta * (face - self.mean)
+            # (c + 1)^2 - c^2 = 2c + 1
+            self._sum_sq_counts += 2 * self.counts[face] + 1
+            self.counts[face] += 1
+
+    def add_many(self, rolls):
+        """
+        Add many rolls at once.
+
+        Parameters:
+            rolls - Array of shape (number of rolls, dice per roll)
+        """
+        rolls = np.asarray(rolls)
+        if rolls.size == 0:
+            return
+        if rolls.min() < 1 or rolls.max() > self.sides:
+            raise ValueError(f"faces must be between 1 and {self.sides}")
+        flat = rolls.reshape(-1)
+        self.faces.frombytes(flat.astype(self.faces.typecode).tobytes())
+        self.roll_sizes.extend([rolls.shape[1]] * rolls.shape[0])
+        # Merge the batch statistics into the running ones (Chan et al.)
+        n_b = flat.size
+        mean_b = float(flat.mean())
+        m2_b = float(((flat - mean_b) ** 2).sum())
+        n = self.n + n_b
+        delta = mean_b - self.mean
+        self.mean += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self.n * n_b / n
+        self.n = n
+        batch_counts = np.bincount(flat, minlength=self.sides + 1).tolist()
+        self.counts = [a + b for a, b in zip(self.counts, batch_counts)]
+        self._sum_sq_counts = sum(c * c for c in self.counts)
+
+    @property
+    def rolls(self):
+        """Number of rolls in the history."""
+        return len(self.roll_sizes)
+
+    @property
+    def variance(self):
+        """Sample variance of the faces (0 for fewer than two dice)."""
+        return self._m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def std(self):
+        """Sample standard deviation of the faces."""
+        return math.sqrt(self.variance)
+
+    def chi_square(self):
+        """
+        Return the chi-square statistic of the face counts against a fair die.
+        It has sides - 1 degrees of freedom.
+        """
+        if self.n == 0:
+            return 0.0
+        # sum((c - e)^2 / e) with e = n / sides simplifies to sides * sum(c^2) / n - n
+        return self.sides * self._sum_sq_counts / self.n - self.n
+
+    def as_array(self):
+        """
+        Return a copy of all faces as a NumPy array. It is a copy because a view would keep
+        the growable array from resizing, so the next add() would fail while it is held:
+
+            >>> history = RollHistory(6)
+            >>> history.add([3, 5])
+            >>> faces = history.as_array()
+            >>> history.add([6])
+            >>> faces.tolist(), history.as_array().tolist()
+            ([3, 5], [3, 5, 6])
+        """
+        return np.array(self.faces, dtype=np.uint8 if self.faces.typecode == "B" else np.uint16)
+
+    def summary(self):
+        """Return a one-line summary of the statistics."""
+        return (f"Rolls: {self.rolls}  mean {self.mean:.2f}  sd {self.std:.2f}"
+                f"  chi² {self.chi_square():.1f} (df {self.sides - 1})")
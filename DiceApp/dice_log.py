@@ -0,0 +1,208 @@
+"""
+Append-only on-disk log of dice rolls.
+
+The log file starts with a 16-byte header (magic bytes and record size) followed by fixed-width
+24-byte records, one per roll of a set:
+
+    timestamp  float64  seconds since the epoch
+    set_id     uint16   index of the set
+    count      uint8    number of dice in the roll
+    sides      uint8    number of sides on each die
+    faces      12 x uint8, the rolled faces (unused slots are 0)
+
+The file is read through mmap, so records are exposed as NumPy views without copying or loading
+the log into memory. Summary statistics per set are kept in a small JSON sidecar file
+(<log>.idx). On reopen only the records written after the sidecar was last saved are scanned,
+so reopening a large log is instant.
+"""
+import json                                        # Sidecar index format
+import mmap                                        # Memory-mapped reading of the log
+import os                                          # File sizes and atomic replace
+import time                                        # Timestamps of rolls
+import numpy as np                                 # Zero-copy record views
+
+# Magic bytes at the start of every log file
+MAGIC = b"DICELOG1"
+# Maximum number of dice in one record
+MAX_DICE = 12
+# Layout of one record (little-endian, 24 bytes)
+RECORD_DTYPE = np.dtype([("timestamp", "<f8"), ("set_id", "<u2"), ("count", "u1"),
+                         ("sides", "u1"), ("faces", "u1", (MAX_DICE,))])
+# Size of the file header: magic bytes plus the record size as uint64
+HEADER_SIZE = 16
+
+
+class RollLog:
+    """An append-only roll log with memory-mapped, zero-copy queries."""
+
+    def __init__(self, path):
+        """
+        Open the log at path, creating it if it does not exist.
+
+        Parameters:
+            path - Path of the log file; the sidecar index is path + ".idx"
+        """
+        self.path = path
+        self.index_path = path + ".idx"
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            with open(path, "wb") as file:
+                file.write(MAGIC + np.uint64(RECORD_DTYPE.itemsize).tobytes())
+        with open(path, "rb") as file:
+            header = file.read(HEADER_SIZE)
+        if header[:8] != MAGIC or int(np.frombuffer(header[8:], "<u8")[0]) != RECORD_DTYPE.itemsize:
+            raise ValueError(f"{path} is not a roll log")
+        # Drop a partially written last record (e.g. after a crash)
+        size = os.path.getsize(path)
+        complete = HEADER_SIZE + (size - HEADER_SIZE) // RECORD_DTYPE.itemsize * RECORD_DTYPE.itemsize
+        if complete != size:
+            os.truncate(path, complete)
+        self._file = open(path, "ab")
+        self._mmap = None
+        self._mapped_size = 0
+        self._count = (complete - HEADER_SIZE) // RECORD_DTYPE.itemsize
+        self._record = np.zeros(1, dtype=RECORD_DTYPE)
+        self._load_index()
+
+    def __len__(self):
+        return self._count
+
+    def append(self, set_id, sides, faces, timestamp=None):
+        """
+        Append one roll of a set to the log.
+
+        Parameters:
+            set_id    - Index of the set
+            sides     - Number of sides on each die
+            faces     - The rolled faces (at most MAX_DICE)
+            timestamp - Time of the roll (default: now)
+        """
+        if len(faces) > MAX_DICE:
+            raise ValueError(f"a record holds at most {MAX_DICE} dice")
+        timestamp = time.time() if timestamp is None else timestamp
+        record = self._record[0]
+        record["timestamp"] = timestamp
+        record["set_id"] = set_id
+        record["count"] = len(faces)
+        record["sides"] = sides
+        record["faces"] = 0
+        record["faces"][:len(faces)] = faces
+        self._file.write(self._record.tobytes())
+        self._file.flush()
+        self._count += 1
+        self._add_to_index(set_id, len(faces), int(sum(faces)), timestamp)
+
+    def records(self):
+        """Return all records as a read-only NumPy view of the memory-mapped file."""
+        size = HEADER_SIZE + self._count * RECORD_DTYPE.itemsize
+        if self._mmap is None or self._mapped_size < size:
+            # The file has grown: map it again (views of the old mapping stay valid)
+            self._file.flush()
+            with open(self.path, "rb") as file:
+                self._mmap = mmap.mmap(file.fileno(), size, access=mmap.ACCESS_READ)
+            self._mapped_size = size
+        return np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=self._count, offset=HEADER_SIZE)
+
+    def time_range(self, start=None, end=None):
+        """
+        Return the records with start <= timestamp < end as a zero-copy view.
+        Records are appended in time order, so the bounds are found by binary search.
+        """
+        records = self.records()
+        timestamps = records["timestamp"]
+        first = 0 if start is None else int(np.searchsorted(timestamps, start, side="left"))
+        last = len(records) if end is None else int(np.searchsorted(timestamps, end, side="left"))
+        return records[first:last]
+
+    def query(self, start=None, end=None, set_id=None):
+        """
+        Return the records of a time range, optionally only those of one set.
+
+        Without set_id the result is a zero-copy view; with set_id only the matching
+        records of the time range are copied.
+        """
+        records = self.time_range(start, end)
+        if set_id is None:
+            return records
+        return records[records["set_id"] == set_id]
+
+    def summary(self, set_id=None):
+        """
+        Return summary statistics from the sidecar index without reading the log.
+
+        Returns a dict with rolls, dice, sum, first and last (timestamps), either for
+        one set or for the whole log.
+        """
+        if set_id is not None:
+            return dict(self._index["sets"].get(str(set_id), _empty_summary()))
+        total = _empty_summary()
+        for stats in self._index["sets"].values():
+            _merge_summary(total, stats)
+        return total
+
+    def flush(self):
+        """Flush the log and save the sidecar index."""
+        self._file.flush()
+        self._index["records"] = self._count
+        temporary = self.index_path + ".tmp"
+        with open(temporary, "w") as file:
+            json.dump(self._index, file)
+        os.replace(temporary, self.index_path)
+
+    def close(self):
+        """Save the sidecar index and close the log."""
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        self._mmap = None
+
+    def _load_index(self):
+        """Read the sidecar index and catch up with records written after it was saved."""
+        self._index = {"records": 0, "sets": {}}
+        try:
+            with open(self.index_path) as file:
+                index = json.load(file)
+            if index.get("records", 0) <= self._count:
+                self._index = index
+        except (OSError, ValueError):
+            pass
+        missing = self.records()[self._index["records"]:]
+        if len(missing):
+            # Per-set sums of the missing records with one bincount each
+            set_ids = missing["set_id"]
+            rolls = np.bincount(set_ids)
+            dice = np.bincount(set_ids, weights=missing["count"])
+            sums = np.bincount(set_ids, weights=missing["faces"].sum(axis=1, dtype=np.int64))
+            present, first = np.unique(set_ids, return_index=True)
+            _, last_reversed = np.unique(set_ids[::-1], return_index=True)
+            last = len(set_ids) - 1 - last_reversed
+            timestamps = missing["timestamp"]
+            for set_id, i, j in zip(present.tolist(), first.tolist(), last.tolist()):
+                _merge_summary(self._index["sets"].setdefault(str(set_id), _empty_summary()),
+                               {"rolls": int(rolls[set_id]), "dice": int(dice[set_id]),
+                                "sum": int(sums[set_id]),
+                                "first": float(timestamps[i]), "last": float(timestamps[j])})
+            self._index["records"] = self._count
+
+    def _add_to_index(self, set_id, count, total, timestamp):
+        """Add one roll to the in-memory sidecar index."""
+        stats = self._index["sets"].setdefault(str(set_id), _empty_summary())
+        _merge_summary(stats, {"rolls": 1, "dice": count, "sum": total,
+                               "first": timestamp, "last": timestamp})
+        self._index["records"] = self._count
+
+
+def _empty_summary():
+    """Return the summary of no rolls."""
+    return {"rolls": 0, "dice": 0, "sum": 0, "first": None, "last": None}
+
+
+def _merge_summary(stats, other):
+    """Add the summary other to stats (in place)."""
+    stats["rolls"] += other["rolls"]
+    stats["dice"] += other["dice"]
+    stats["sum"] += other["sum"]
+    if other["first"] is not None and (stats["first"] is None or other["first"] < stats["first"]):
+        stats["first"] = other["first"]
+    if other["last"] is not None and (stats["last"] is None or other["last"] > stats["last"]):
+        stats["last"] = other["last"]
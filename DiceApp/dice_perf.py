@@ -0,0 +1,120 @@
+"""
+Opt-in timing of the GUI's hot path.
+
+Set the DICEAPP_PERF environment variable to enable it (DICEAPP_PERF=1, or the path of a JSON
+file that the statistics are written to when the app is closed). Functions are instrumented
+with the timed decorator:
+
+    @dice_perf.timed("roll_single_set")
+    def roll_single_set(...):
+
+When instrumentation is disabled, timed returns the function itself, so the disabled path
+costs nothing per call. When enabled, every call is timed with time.perf_counter and added to
+a rolling window of the most recent WINDOW samples of its name, from which p50/p95/p99 are
+computed on demand.
+"""
+import functools                                   # Wrapping instrumented functions
+import json                                        # JSON dump of the statistics
+import math                                        # Rounding of percentile ranks
+import os                                          # Environment variable
+import time                                        # High-resolution timer
+from collections import deque                      # Rolling window of samples
+
+# DICEAPP_PERF is read once at import time, so instrumented functions are wrapped or not for good
+setting = os.environ.get("DICEAPP_PERF", "")
+enabled = setting not in ("", "0")
+# File the statistics are written to at exit (if DICEAPP_PERF names a .json file)
+dump_path = setting if setting.endswith(".json") else None
+# Number of most recent samples the percentiles are computed from
+WINDOW = 1000
+
+
+class Histogram:
+    """Rolling window of durations of one instrumented stage."""
+
+    def __init__(self, window=WINDOW):
+        """
+        Parameters:
+            window - Number of most recent samples that are kept
+        """
+        self.samples = deque(maxlen=window)
+        # All-time count and total, which the window does not limit
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        """Add one duration in seconds."""
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+
+    def summary(self):
+        """Return the statistics in milliseconds as a dict."""
+        ordered = sorted(self.samples)
+        return {"count": self.count, "mean_ms": self.total / self.count * 1000 if self.count else 0.0,
+                "p50_ms": _nearest_rank(ordered, 50) * 1000, "p95_ms": _nearest_rank(ordered, 95) * 1000,
+                "p99_ms": _nearest_rank(ordered, 99) * 1000, "max_ms": ordered[-1] * 1000 if ordered else 0.0}
+
+
+def _nearest_rank(ordered, q):
+    """Return the q-th percentile (0-100) of sorted samples by the nearest-rank method."""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(q / 100 * len(ordered)) - 1))]
+
+
+# Histograms by stage name
+histograms = {}
+
+
+def record(name, seconds):
+    """Add a duration in seconds to the histogram of the stage name."""
+    histogram = histograms.get(name)
+    if histogram is None:
+        histogram = histograms[name] = Histogram()
+    histogram.add(seconds)
+
+
+def timed(name):
+    """
+    Decorator that records the duration of every call under name. Returns the function
+    unchanged if instrumentation is disabled.
+    """
+    def decorate(function):
+        if not enabled:
+            return function
+        histogram = histograms.setdefault(name, Histogram())
+        perf_counter = time.perf_counter
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.add(perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def report():
+    """Return the statistics of all stages that were called, by name."""
+    return {name: histogram.summary() for name, histogram in histograms.items() if histogram.count}
+
+
+def status_text():
+    """Return a short multi-line summary for the performance overlay."""
+    lines = []
+    for name, stats in report().items():
+        lines.append(f"{name}: p50 {stats['p50_ms']:.2f}  p95 {stats['p95_ms']:.2f}"
+                     f"  p99 {stats['p99_ms']:.2f} ms  (n={stats['count']})")
+    return "\n".join(lines) or "No timings yet"
+
+
+def dump(path=None):
+    """Write the statistics as JSON to path (default: the file named by DICEAPP_PERF)."""
+    path = path or dump_path
+    if path is None:
+        return
+    with open(path, "w") as file:
+        json.dump({"time": time.time(), "window": WINDOW, "stages": report()}, file, indent=2)
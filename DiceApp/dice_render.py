@@ -0,0 +1,281 @@
+"""
+Rendering of dice faces for the Dice Roller GUI.
+
+Each dice set in the results view owns one RenderSession, a persistent drawing surface that is
+built once for the set's dice count and then only updated when the set is rolled again. The
+way faces are drawn is pluggable; two backends are available:
+
+    "tk"          - CanvasRenderSession draws rectangles, ovals and text directly on a Tk canvas
+                    and updates the existing items in place (itemconfig/coords). It needs no
+                    Matplotlib at all.
+    "matplotlib"  - SpriteRenderSession (in dice_render_mpl) rasterizes faces once with a
+                    Matplotlib DiceFace, caches them as images and blits them onto a Tk canvas.
+
+Use create_session() to build a session for a backend by name.
+"""
+import math                                        # Math for calculations (e.g. ceil)
+from tkinter import Canvas, Label                  # Canvas for the dice, Label for the total
+import dice_perf                                   # Opt-in hot-path timing (DICEAPP_PERF)
+
+# Names of the available rendering backends
+BACKENDS = ("tk", "matplotlib")
+DEFAULT_BACKEND = "tk"
+
+# Factors defining what portion of each cell's width and height is used for drawing the dice
+dice_area_width_factor = 0.9    # use 90% of cell width for dice graphics
+dice_area_height_factor = 0.5   # use 50% of cell height for dice graphics
+
+# Pip layouts for dice faces 1 through 6 (coordinates inside a 0.5x0.5 face)
+PIP_POSITIONS = {
+    1: [(0.25, 0.25)],  # center pip
+    2: [(0.1, 0.4), (0.4, 0.1)],  # two pips (diagonal)
+    3: [(0.1, 0.4), (0.25, 0.25), (0.4, 0.1)],  # three pips (two diagonal + center)
+    4: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1)],  # four corner pips
+    5: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.1), (0.4, 0.1), (0.25, 0.25)],  # four corners + center
+    6: [(0.1, 0.4), (0.4, 0.4), (0.1, 0.25), (0.4, 0.25), (0.1, 0.1), (0.4, 0.1)]  # six pips (three per column)
+}
+# Radius of a single pip
+PIP_RADIUS = 0.04
+
+
+def dice_layout(count, cell_width, cell_height):
+    """
+    Compute how the dice of one set are arranged inside a result cell.
+
+    Parameters:
+        count       - Number of dice in the set
+        cell_width  - Width of the set's result cell in pixels
+        cell_height - Height of the set's result cell in pixels
+
+    Returns:
+        A tuple (dice_cols, dice_rows, die_size_pixels)
+    """
+    # Up to 6 dice per row
+    dice_cols = min(6, count)
+    # Number of rows needed based on how many dice (6 per row maximum)
+    dice_rows = math.ceil(count / 6)
+    # Calculate an appropriate dice image size (in pixels) based on the cell size and defined factors
+    die_size_pixels = min((cell_width * dice_area_width_factor) / dice_cols,
+                          (cell_height * dice_area_height_factor) / dice_rows)
+    return dice_cols, dice_rows, die_size_pixels
+
+
+def die_pixels(count, cell_width, cell_height):
+    """Return the whole-pixel size of one die of a set with count dice in a result cell."""
+    return max(1, int(dice_layout(count, cell_width, cell_height)[2]))
+
+
+# Portion of the die's square slot that is covered by the face (the rest is a margin)
+FACE_FRACTION = 0.8
+# Font of the numbers on faces with more than 6 sides
+NUMBER_FONT = ("Arial", 16, "bold")
+
+
+class RenderSession:
+    """
+    Persistent drawing surface for one dice set in the results view (renderer interface).
+
+    A Tkinter canvas is created once for a given dice count, together with whatever items a
+    backend needs per die. A roll only updates those items. Call close() when the results
+    view is rebuilt to release the canvas. Backends implement _build_dice and _show_dice.
+    """
+    def __init__(self, master, cell_width, cell_height):
+        """
+        Parameters:
+            master      - The Tkinter frame where the dice images will be displayed
+            cell_width  - Width of the set's result cell in pixels
+            cell_height - Height of the set's result cell in pixels
+        """
+        self.master = master
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.count = 0
+        self.show_total = False
+        self.die_size = 0
+        self.canvas = None
+        self.total_label = None
+
+    def build(self, count, show_total=False):
+        """
+        Create the canvas and the items of every die for the given number of dice.
+        Does nothing if the session is already built for this count.
+
+        Parameters:
+            count      - Number of dice
+            show_total - If True, the total is shown even for a single die (e.g. for an
+                         expression with a modifier); it is always shown for several dice
+        """
+        if (count, show_total) == (self.count, self.show_total) and self.canvas is not None:
+            return
+        # Release the surface built for a different dice count
+        self.close()
+        dice_cols, dice_rows, _ = dice_layout(count, self.cell_width, self.cell_height)
+        self.die_size = die_pixels(count, self.cell_width, self.cell_height)
+
+        self.canvas = Canvas(self.master, width=self.die_size * dice_cols,
+                             height=self.die_size * dice_rows, highlightthickness=0)
+        self.canvas.pack(pady=5)
+        # Up to 6 dice per row, each in a square slot of die_size pixels
+        self._build_dice([((i % 6) * self.die_size, (i // 6) * self.die_size) for i in range(count)])
+        # If more than one die is rolled, the sum of all dice is shown at the bottom
+        if count > 1 or show_total:
+            self.total_label = Label(self.master, font=("Arial", 12, "bold"))
+            self.total_label.pack(pady=5)
+        self.count = count
+        self.show_total = show_total
+
+    @dice_perf.timed("RenderSession.show")
+    def show(self, rolls, dice_color, number_color, use_dots=False, odds=None, total=None):
+        """
+        Display a roll by updating the existing canvas items.
+
+        Parameters:
+            rolls        - List of rolled numbers, one per die
+            dice_color   - Background color for the dice faces
+            number_color - Color for the numbers or pips on the dice
+            use_dots     - If True, show pip patterns instead of numbers
+            odds         - Optional (probability, percentile) of the total, shown next to it
+            total        - Total to show instead of the sum of the dice (e.g. of a dice expression
+                           with kept dice and modifiers); it is shown even for a single die
+        """
+        self.build(len(rolls), show_total=total is not None)
+        self._show_dice(rolls, dice_color, number_color, use_dots)
+        if self.total_label is not None:
+            text = f"Total: {sum(rolls) if total is None else total}"
+            if odds is not None:
+                probability, percentile = odds
+                text += f"  (P = {probability:.2%}, percentile {percentile:.1f})"
+            self.total_label.config(text=text)
+
+    def show_faces(self, rolls, dice_color, number_color, use_dots=False):
+        """
+        Only point the dice at other faces, e.g. for a frame of the roll animation; the total
+        is left as it is.
+        """
+        self.build(len(rolls), show_total=self.show_total)
+        self._show_dice(rolls, dice_color, number_color, use_dots)
+
+    def resize(self, cell_width, cell_height):
+        """
+        Use a new cell size. The canvas is only rebuilt (on the next build or show) if the
+        dice get a different pixel size; otherwise the existing items are kept.
+
+        Parameters:
+            cell_width  - New width of the set's result cell in pixels
+            cell_height - New height of the set's result cell in pixels
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        if self.canvas is not None and die_pixels(self.count, cell_width, cell_height) != self.die_size:
+            self.close()
+
+    def close(self):
+        """Destroy the canvas and the total label of this session."""
+        if self.canvas is not None:
+            self.canvas.destroy()
+            self.canvas = None
+        if self.total_label is not None:
+            self.total_label.destroy()
+            self.total_label = None
+        self._close_dice()
+        self.count = 0
+
+    def _build_dice(self, slots):
+        """Create the canvas items of every die; slots holds the top-left corner of each die."""
+        raise NotImplementedError
+
+    def _show_dice(self, rolls, dice_color, number_color, use_dots):
+        """Update the canvas items of every die to show the roll."""
+        raise NotImplementedError
+
+    def _close_dice(self):
+        """Forget the per-die state after the canvas was destroyed."""
+
+
+class CanvasRenderSession(RenderSession):
+    """
+    Native Tk backend: every die is a rectangle, six ovals for the pips and a text item.
+
+    The items are created once; a roll moves and recolors them with coords/itemconfig and
+    hides the ones that are not needed. Only the items of a die that differ from what it
+    shows are touched, so dice whose face did not change cost nothing.
+    """
+    def __init__(self, master, cell_width, cell_height):
+        super().__init__(master, cell_width, cell_height)
+        # Per die: (face rectangle, pip ovals, number text, corner of the face, face size)
+        self.dice = []
+        # Per die: the (number, use_dots, dice_color, number_color) currently shown
+        self.shown = []
+
+    def _build_dice(self, slots):
+        face_size = self.die_size * FACE_FRACTION
+        margin = (self.die_size - face_size) / 2
+        for x, y in slots:
+            left, top = x + margin, y + margin
+            face = self.canvas.create_rectangle(left, top, left + face_size, top + face_size,
+                                                outline="black")
+            pips = [self.canvas.create_oval(0, 0, 0, 0, width=0, state="hidden") for _ in range(6)]
+            text = self.canvas.create_text(left + face_size / 2, top + face_size / 2,
+                                           font=NUMBER_FONT, state="hidden")
+            self.dice.append((face, pips, text, (left, top), face_size))
+            self.shown.append(None)
+
+    def _show_dice(self, rolls, dice_color, number_color, use_dots):
+        for i, (die, number) in enumerate(zip(self.dice, rolls)):
+            state = (number, use_dots, dice_color, number_color)
+            previous = self.shown[i]
+            if previous == state:
+                continue
+            self.shown[i] = state
+            old_number, old_dots, old_dice_color, old_number_color = previous or (None, None, None, None)
+            face, pips, text, (left, top), face_size = die
+            if dice_color != old_dice_color:
+                self.canvas.itemconfig(face, fill=dice_color)
+            if use_dots:
+                if (number, number_color, old_dots) != (old_number, old_number_color, True):
+                    self._show_pips(pips, PIP_POSITIONS.get(number, [(0.25, 0.25)]), number_color,
+                                    left, top, face_size)
+                if old_dots is not True:
+                    self.canvas.itemconfig(text, state="hidden")
+            else:
+                if old_dots is not False:
+                    self._show_pips(pips, [], number_color, left, top, face_size)
+                self.canvas.itemconfig(text, text=str(number), fill=number_color, state="normal")
+
+    def _show_pips(self, pips, dots, number_color, left, top, face_size):
+        """Place and show the pip ovals of one die for the given dots and hide the others."""
+        # Pip coordinates are given in a 0.5x0.5 square with y pointing up
+        scale = face_size / 0.5
+        radius = PIP_RADIUS * scale
+        for j, pip in enumerate(pips):
+            if j < len(dots):
+                cx = left + dots[j][0] * scale
+                cy = top + (0.5 - dots[j][1]) * scale
+                self.canvas.coords(pip, cx - radius, cy - radius, cx + radius, cy + radius)
+                self.canvas.itemconfig(pip, fill=number_color, state="normal")
+            else:
+                self.canvas.itemconfig(pip, state="hidden")
+
+    def _close_dice(self):
+        self.dice = []
+        self.shown = []
+
+
+def create_session(backend, master, cell_width, cell_height, face_cache=None):
+    """
+    Create a RenderSession of the given backend.
+
+    Parameters:
+        backend     - "tk" or "matplotlib"
+        master      - The Tkinter frame where the dice images will be displayed
+        cell_width  - Width of the set's result cell in pixels
+        cell_height - Height of the set's result cell in pixels
+        face_cache  - FaceCache shared by all sets (only used by the "matplotlib" backend)
+    """
+    if backend == "tk":
+        return CanvasRenderSession(master, cell_width, cell_height)
+    if backend == "matplotlib":
+        # Imported here so the "tk" backend never loads Matplotlib
+        from dice_render_mpl import SpriteRenderSession
+        return SpriteRenderSession(master, cell_width, cell_height, face_cache)
+    raise ValueError(f"unknown rendering backend {backend!r} (expected one of {', '.join(BACKENDS)})")
@@ -0,0 +1,219 @@
+"""
+Matplotlib rendering backend for the Dice Roller GUI.
+
+Dice faces are drawn with Matplotlib (the reused artists of a DiceFace), but only once per
+distinct look: a FaceRasterizer renders a face into an RGBA buffer on a single offscreen Agg
+figure, and a FaceCache keeps the resulting Tk images in a bounded LRU cache keyed by (face value,
+pip-or-number mode, dice color, number color, pixel size). SpriteRenderSession blits the cached
+images onto a plain Tk canvas. Figures are created with matplotlib.figure.Figure instead of
+pyplot, so they are never registered with pyplot's figure manager.
+"""
+import base64                                      # Encode PNG data for Tk images
+import io                                          # In-memory buffer for PNG data
+from collections import OrderedDict                # Ordered dict used as LRU cache
+from tkinter import PhotoImage                     # Tk images of cached faces
+import numpy as np                                 # RGBA buffers of rasterized faces
+from matplotlib.figure import Figure               # Figure class that is not tracked by pyplot
+from matplotlib.patches import Circle              # Circles for the pips
+from matplotlib.backends.backend_agg import FigureCanvasAgg  # Offscreen rasterization
+import matplotlib.image as mpimg                   # PNG encoding of RGBA buffers
+import dice_perf                                   # Opt-in hot-path timing (DICEAPP_PERF)
+from dice_render import PIP_POSITIONS, PIP_RADIUS, FACE_FRACTION, RenderSession
+
+
+class DiceFace:
+    """
+    The artists of one dice face that are reused between rolls.
+
+    The axis is prepared once; a roll only changes the face color, moves and recolors the
+    pips and updates the number text.
+    """
+    def __init__(self, ax):
+        self.ax = ax
+        # Prepare the axis once: no ticks and a fixed 0.5x0.5 square
+        ax.set_xticks([])
+        ax.set_yticks([])
+        ax.set_xlim(0, 0.5)
+        ax.set_ylim(0, 0.5)
+        # Text artist for numeric faces (hidden while pips are shown)
+        self.text = ax.text(0.25, 0.25, "", fontsize=16, ha='center', va='center',
+                            fontweight='bold', visible=False)
+        # Six pip circles are enough for every pip layout; unused ones are hidden
+        self.pips = []
+        for _ in range(6):
+            pip = Circle((0.25, 0.25), PIP_RADIUS, visible=False)
+            ax.add_artist(pip)
+            self.pips.append(pip)
+
+    @dice_perf.timed("DiceFace.update")
+    def update(self, number, dice_color, text_color, use_dots=False):
+        """
+        Show a new rolled number on this face by updating the existing artists.
+
+        Parameters:
+            number     - The rolled number to display
+            dice_color - Background color of the dice face
+            text_color - Color for the number or the pips (dots)
+            use_dots   - If True, show a pip pattern instead of a number
+        """
+        self.ax.set_facecolor(dice_color)
+        dots = PIP_POSITIONS.get(number, [(0.25, 0.25)]) if use_dots else []
+        for i, pip in enumerate(self.pips):
+            if i < len(dots):
+                pip.center = dots[i]
+                pip.set_color(text_color)
+                pip.set_visible(True)
+            else:
+                pip.set_visible(False)
+        if use_dots:
+            self.text.set_visible(False)
+        else:
+            self.text.set_text(str(number))
+            self.text.set_color(text_color)
+            self.text.set_visible(True)
+
+
+class FaceRasterizer:
+    """
+    Rasterize single dice faces into RGBA buffers without a display.
+
+    One Agg figure with one axis is created and reused for every face; only its size in
+    pixels and the artists of the face change between calls.
+    """
+    def __init__(self):
+        self.figure = Figure(dpi=100)
+        self.figure.patch.set_alpha(0)  # transparent margin around the face
+        self.canvas = FigureCanvasAgg(self.figure)
+        # canvas.draw, timed if DICEAPP_PERF is set (otherwise the bound method itself)
+        self._draw = dice_perf.timed("canvas.draw")(self.canvas.draw)
+        margin = (1 - FACE_FRACTION) / 2
+        self.face = DiceFace(self.figure.add_axes([margin, margin, FACE_FRACTION, FACE_FRACTION]))
+        self.size = None
+
+    def render(self, number, use_dots, dice_color, text_color, size):
+        """
+        Return the face as an RGBA array of shape (size, size, 4).
+
+        Parameters:
+            number     - The rolled number to display
+            use_dots   - If True, draw a pip pattern instead of a number
+            dice_color - Background color of the dice face
+            text_color - Color for the number or the pips (dots)
+            size       - Width and height of the image in pixels
+        """
+        if size != self.size:
+            # Pixel size to inches at 100 dpi
+            self.figure.set_size_inches(size / 100, size / 100)
+            self.size = size
+        self.face.update(number, dice_color, text_color, use_dots=use_dots)
+        self._draw()
+        # Copy, because the Agg buffer is overwritten by the next render
+        return np.array(self.canvas.buffer_rgba())
+
+
+def rgba_to_png_data(rgba):
+    """Encode an RGBA array as base64 PNG data for a Tk PhotoImage (does not need Tk)."""
+    buffer = io.BytesIO()
+    mpimg.imsave(buffer, rgba, format="png")
+    return base64.b64encode(buffer.getvalue())
+
+
+def rgba_to_photo(rgba):
+    """Convert an RGBA array into a Tk PhotoImage (requires a Tk root)."""
+    return PhotoImage(data=rgba_to_png_data(rgba))
+
+
+def render_face_data(rasterizer, key):
+    """
+    Rasterize the face with the given cache key and return it as base64 PNG data.
+    Safe to call from a worker thread with the thread's own FaceRasterizer; the Tk thread
+    turns the data into an image with FaceCache.put.
+    """
+    return rgba_to_png_data(rasterizer.render(*key))
+
+
+class FaceCache:
+    """
+    LRU-bounded cache of rasterized dice faces stored as Tk PhotoImages.
+
+    The key is (number, use_dots, dice_color, text_color, size), so after a resize the faces
+    of the old die size are never hit again and simply age out. Hits, misses and evictions
+    are counted so the cache efficiency can be checked.
+    """
+    def __init__(self, max_size=512):
+        self.max_size = max_size
+        self.rasterizer = FaceRasterizer()
+        self._images = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        return key in self._images
+
+    def get(self, number, use_dots, dice_color, text_color, size):
+        """Return the PhotoImage for a face, rasterizing it on a cache miss."""
+        key = (number, use_dots, dice_color, text_color, size)
+        image = self._images.get(key)
+        if image is not None:
+            self.hits += 1
+            self._images.move_to_end(key)
+            return image
+        self.misses += 1
+        return self._add(key, rgba_to_photo(self.rasterizer.render(*key)))
+
+    def put(self, key, png_data):
+        """
+        Add a face that was rasterized elsewhere (e.g. by render_face_data in a worker thread).
+
+        Parameters:
+            key      - (number, use_dots, dice_color, text_color, size)
+            png_data - Base64 PNG data of the face
+        """
+        if key not in self._images:
+            self._add(key, PhotoImage(data=png_data))
+
+    def _add(self, key, image):
+        """Store an image and drop the least recently used faces once the cache is full."""
+        self._images[key] = image
+        while len(self._images) > self.max_size:
+            self._images.popitem(last=False)
+            self.evictions += 1
+        return image
+
+    def stats(self):
+        """Return the cache counters as a dictionary."""
+        return {"size": len(self._images), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+
+class SpriteRenderSession(RenderSession):
+    """
+    Matplotlib backend: one image item per die, pointed at cached face images on every roll.
+    """
+    def __init__(self, master, cell_width, cell_height, face_cache):
+        """
+        Parameters:
+            master      - The Tkinter frame where the dice images will be displayed
+            cell_width  - Width of the set's result cell in pixels
+            cell_height - Height of the set's result cell in pixels
+            face_cache  - FaceCache shared by all sets
+        """
+        super().__init__(master, cell_width, cell_height)
+        self.face_cache = face_cache
+        self.items = []
+        # Images currently shown, referenced here so they survive eviction from the cache
+        self.images = []
+
+    def _build_dice(self, slots):
+        self.items = [self.canvas.create_image(x, y, anchor="nw") for x, y in slots]
+
+    def _show_dice(self, rolls, dice_color, number_color, use_dots):
+        self.images = [self.face_cache.get(roll, use_dots, dice_color, number_color, self.die_size)
+                       for roll in rolls]
+        for item, image in zip(self.items, self.images):
+            self.canvas.itemconfig(item, image=image)
+
+    def _close_dice(self):
+        self.items = []
+        self.images = []
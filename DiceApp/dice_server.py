@@ -0,0 +1,469 @@
+"""
+Local roll service: one authoritative source of rolls for several table displays.
+
+The service runs the roll engine of the GUI (dice_expr plans rolled from each set's
+dice_engine.RollStream) without Tk and serves it over HTTP/1.1 with keep-alive on localhost.
+Every response is JSON:
+
+    GET  /roll?set=0&dice=4d6kh3          the next roll of set 0 (set numbers start at 0)
+    POST /roll                             several rolls at once; the body is a JSON list of
+                                           {"set": 0, "dice": "3d6"} objects, the response a
+                                           list of rolls (or {"error": ...} for rejected ones)
+    GET  /simulate?dice=3d6&rolls=100000   histogram of the totals of many rolls
+    GET  /status                           session seed and batching statistics
+
+A roll is {"set", "dice", "roll", "faces", "total", "probability", "percentile", "seed"}.
+Since every set has its own RollStream keyed by the session seed, any roll can be regenerated
+with "python -m diceapp replay --seed SEED --set-number SET+1 --roll ROLL".
+
+Concurrent requests are batched: the requests that arrive in the same event loop iteration are
+handled together by one call into the engine. Simulations of the same dice in a batch are drawn
+with one vectorized Plan.evaluate call. Rolls keep one Philox counter per roll (so they stay
+replayable), but share the plan lookup, the memoized odds and one wake-up of the event loop.
+
+Usage:
+    python dice_server.py [--host 127.0.0.1] [--port 8765] [--seed 1234]
+
+The GUI rolls through a running service if the DICEAPP_SERVER environment variable is set to
+its address (e.g. DICEAPP_SERVER=127.0.0.1:8765); see RollClient.
+"""
+import argparse                                    # Command line parsing
+import asyncio                                     # Event loop of the service
+import http.client                                 # Keep-alive connection of the client
+import json                                        # Request and response bodies
+import socket                                      # Shutting down the client socket
+from urllib.parse import parse_qsl, urlsplit       # Query strings and addresses
+import numpy as np                                 # Histograms of simulations
+import dice_engine                                 # Per-set roll streams
+import dice_expr                                   # Compiled dice expressions
+import dice_sets                                   # Limits of a set
+
+# Address the service listens on by default (localhost only)
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Limits of a roll, the same as for a set in the GUI: sets 0 to MAX_SETS - 1 (as many as an
+# imported set file can hold) with 1 to 12 dice of at most 255 sides
+MAX_SETS = dice_sets.MAX_IMPORT_SETS
+MAX_DICE = dice_sets.MAX_NOTATION_DICE
+MAX_SIDES = dice_sets.MAX_NOTATION_SIDES
+# Largest number of rolls of one simulation request
+MAX_SIMULATE_ROLLS = 1_000_000
+# Largest request body in bytes
+MAX_BODY = 1 << 20
+# Reason phrases of the status codes the service sends
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large"}
+
+
+class RequestError(Exception):
+    """A request that cannot be served; status is the HTTP status code of the response."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def roll_plan(text):
+    """
+    Return the compiled plan of a roll request's dice.
+
+    Raises:
+        RequestError if the dice are not valid notation or outside the limits of a set
+    """
+    try:
+        plan = dice_expr.compile_expression(str(text))
+    except ValueError as error:
+        raise RequestError(str(error)) from None
+    if not (1 <= plan.dice_count <= MAX_DICE) or any(term.sides > MAX_SIDES for term in plan.terms):
+        raise RequestError(f"{text!r} must roll 1 to {MAX_DICE} dice with at most {MAX_SIDES} sides")
+    return plan
+
+
+def _chunks(members, max_rolls):
+    """
+    Split (result index, number of rolls) requests into consecutive chunks of at most
+    max_rolls rolls (a single request is never larger), so one evaluate call of a batch
+    needs no more memory than the largest allowed request.
+    """
+    chunk = []
+    chunk_rolls = 0
+    for member in members:
+        if chunk and chunk_rolls + member[1] > max_rolls:
+            yield chunk
+            chunk = []
+            chunk_rolls = 0
+        chunk.append(member)
+        chunk_rolls += member[1]
+    if chunk:
+        yield chunk
+
+
+class RollService:
+    """The roll engine of the service: one RollStream per set, shared by all clients."""
+
+    def __init__(self, seed=None):
+        """
+        Parameters:
+            seed - Session seed of the roll streams (fresh entropy if None)
+        """
+        self.seed = dice_engine.RollStream(seed).seed
+        self.streams = {}
+        # Simulations do not need to be replayable, so they use one generator of their own
+        # (keyed by a stream id that no set uses)
+        sequence = np.random.SeedSequence(self.seed, spawn_key=(1 << 32,))
+        self.simulate_rng = np.random.Generator(np.random.Philox(sequence))
+
+    def stream(self, index):
+        """Return the random stream of the set with the given index, creating it on first use."""
+        stream = self.streams.get(index)
+        if stream is None:
+            stream = self.streams[index] = dice_engine.RollStream(self.seed, index)
+        return stream
+
+    def roll_batch(self, requests):
+        """
+        Roll a batch of (set index, dice) requests in order.
+
+        Returns:
+            A list with the roll (a dict) or the RequestError of every request
+        """
+        results = []
+        for index, text in requests:
+            try:
+                if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < MAX_SETS:
+                    raise RequestError(f"set must be a number from 0 to {MAX_SETS - 1}, not {index!r}")
+                plan = roll_plan(text)
+            except RequestError as error:
+                results.append(error)
+                continue
+            stream = self.stream(index)
+            roll_number = stream.position
+            faces, totals = plan.evaluate(1, stream.next_generator())
+            total = int(totals[0])
+            probability, percentile = plan.odds(total)
+            results.append({"set": index, "dice": plan.text, "roll": roll_number, "faces": faces[0].tolist(),
+                            "total": total, "probability": probability, "percentile": percentile,
+                            "seed": self.seed})
+        return results
+
+    def simulate_batch(self, requests):
+        """
+        Simulate a batch of (dice, number of rolls) requests. Requests for the same dice are
+        drawn together with one vectorized call per MAX_SIMULATE_ROLLS rolls and split afterwards.
+
+        Returns:
+            A list with the histogram (a dict) or the RequestError of every request
+        """
+        results = [None] * len(requests)
+        groups = {}
+        for i, (text, n_rolls) in enumerate(requests):
+            try:
+                if (isinstance(n_rolls, bool) or not isinstance(n_rolls, int)
+                        or not 1 <= n_rolls <= MAX_SIMULATE_ROLLS):
+                    raise RequestError(f"rolls must be a number from 1 to {MAX_SIMULATE_ROLLS}, not {n_rolls!r}")
+                plan = roll_plan(text)
+            except RequestError as error:
+                results[i] = error
+                continue
+            groups.setdefault(plan, []).append((i, n_rolls))
+        for plan, members in groups.items():
+            for chunk in _chunks(members, MAX_SIMULATE_ROLLS):
+                self._simulate_chunk(plan, chunk, results)
+        return results
+
+    def _simulate_chunk(self, plan, members, results):
+        """Draw the rolls of (result index, number of rolls) requests with one call and split them."""
+        _, totals = plan.evaluate(sum(n_rolls for _, n_rolls in members), self.simulate_rng)
+        min_total = plan.distribution()[0]
+        start = 0
+        for i, n_rolls in members:
+            counts = np.bincount(totals[start:start + n_rolls] - min_total)
+            start += n_rolls
+            mean = float(np.dot(np.arange(min_total, min_total + len(counts)), counts)) / n_rolls
+            results[i] = {"dice": plan.text, "rolls": n_rolls, "min_total": int(min_total),
+                          "counts": counts.tolist(), "mean": mean, "expected_mean": plan.mean()}
+
+
+class Batcher:
+    """
+    Collects the requests that arrive in one event loop iteration and runs them as one batch.
+
+    The first request of a batch schedules the batch with call_soon, so it runs after every
+    connection that became readable in the same iteration has submitted its request.
+    """
+
+    def __init__(self, run_batch):
+        """
+        Parameters:
+            run_batch - Function that takes a list of requests and returns a list with the
+                        result or the exception of every request
+        """
+        self.run_batch = run_batch
+        self.requests = []
+        self.futures = []
+        # Statistics for /status
+        self.batches = 0
+        self.handled = 0
+        self.largest = 0
+
+    def submit(self, request):
+        """Add a request to the current batch and return a future of its result."""
+        loop = asyncio.get_running_loop()
+        if not self.requests:
+            loop.call_soon(self.flush)
+        future = loop.create_future()
+        self.requests.append(request)
+        self.futures.append(future)
+        return future
+
+    def flush(self):
+        """Run the current batch and resolve the futures of its requests."""
+        requests, futures = self.requests, self.futures
+        self.requests, self.futures = [], []
+        self.batches += 1
+        self.handled += len(requests)
+        self.largest = max(self.largest, len(requests))
+        try:
+            results = self.run_batch(requests)
+        except Exception as error:
+            results = [error] * len(requests)
+        for future, result in zip(futures, results):
+            if future.cancelled():
+                continue  # the client disconnected
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        """Return the batching statistics as a dict."""
+        return {"batches": self.batches, "requests": self.handled, "largest": self.largest,
+                "mean": self.handled / self.batches if self.batches else 0.0}
+
+
+class RollServer:
+    """HTTP front end of a RollService (minimal HTTP/1.1 with keep-alive, JSON only)."""
+
+    def __init__(self, service):
+        """
+        Parameters:
+            service - The RollService that serves all clients
+        """
+        self.service = service
+        self.rolls = Batcher(service.roll_batch)
+        self.simulations = Batcher(service.simulate_batch)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the asyncio server."""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def handle_connection(self, reader, writer):
+        """Serve the requests of one connection until the client closes it."""
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                    break
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, target, version = lines[0].split(" ", 2)
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "malformed request line"}, close=True)
+                    break
+                headers = {}
+                for line in lines[1:]:
+                    name, _, value = line.partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                try:
+                    length = int(headers.get("content-length") or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    await self.respond(writer, 400, {"error": "invalid Content-Length header"}, close=True)
+                    break
+                if length > MAX_BODY:
+                    await self.respond(writer, 413, {"error": f"request body larger than {MAX_BODY} bytes"},
+                                       close=True)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except asyncio.IncompleteReadError:
+                    break
+                close = (headers.get("connection", "").lower() == "close"
+                         or (version == "HTTP/1.0" and headers.get("connection", "").lower() != "keep-alive"))
+                try:
+                    status, document = 200, await self.route(method, target, body)
+                except RequestError as error:
+                    status, document = error.status, {"error": str(error)}
+                await self.respond(writer, status, document, close)
+                if close:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def route(self, method, target, body):
+        """Return the response document of a request."""
+        url = urlsplit(target)
+        query = dict(parse_qsl(url.query))
+        if url.path == "/roll":
+            if method == "GET":
+                return await self.rolls.submit((_query_int(query, "set", 0), query.get("dice", "")))
+            if method == "POST":
+                try:
+                    requests = json.loads(body)
+                    requests = [(request.get("set", 0), request.get("dice", "")) for request in requests]
+                except (ValueError, TypeError, AttributeError):
+                    raise RequestError('the body must be a JSON list of {"set": ..., "dice": ...} objects') from None
+                # A rejected roll does not fail the others; its place in the list holds the error
+                results = await asyncio.gather(*[self.rolls.submit(request) for request in requests],
+                                               return_exceptions=True)
+                return [{"error": str(result)} if isinstance(result, RequestError) else result
+                        for result in results]
+            raise RequestError(f"{method} is not allowed for /roll", 405)
+        if url.path == "/simulate":
+            if method != "GET":
+                raise RequestError(f"{method} is not allowed for /simulate", 405)
+            return await self.simulations.submit((query.get("dice", ""), _query_int(query, "rolls", 1)))
+        if url.path == "/status":
+            return {"seed": self.service.seed, "sets": len(self.service.streams),
+                    "roll_batches": self.rolls.stats(), "simulate_batches": self.simulations.stats()}
+        raise RequestError(f"no such resource {url.path!r}", 404)
+
+    async def respond(self, writer, status, document, close=False):
+        """Send a JSON response."""
+        body = json.dumps(document).encode()
+        head = (f"HTTP/1.1 {status} {REASONS[status]}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: {'close' if close else 'keep-alive'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def _query_int(query, name, default):
+    """Return the integer query parameter name (default if it is missing)."""
+    try:
+        return int(query.get(name, default))
+    except ValueError:
+        raise RequestError(f"{name} must be a number, not {query[name]!r}") from None
+
+
+class RollClient:
+    """
+    Blocking client of a roll service over one keep-alive connection (used by the GUI's
+    worker thread, so it never blocks Tk).
+    """
+
+    def __init__(self, address, timeout=5.0):
+        """
+        Parameters:
+            address - host:port of the service (an http:// URL works as well)
+            timeout - Seconds to wait for the service before a request fails
+        """
+        url = urlsplit(address if "//" in address else "//" + address)
+        self.host = url.hostname or DEFAULT_HOST
+        self.port = url.port or DEFAULT_PORT
+        self.timeout = timeout
+        self.connection = None
+        # Set by close(); a closed client does not reconnect
+        self.closed = False
+
+    def request(self, method, path, document=None):
+        """
+        Send a request and return the decoded JSON response. A dropped keep-alive connection
+        is reopened once.
+
+        Raises:
+            ConnectionError if the service cannot be reached, ValueError if it rejected the request
+        """
+        body = json.dumps(document).encode() if document is not None else None
+        for attempt in (1, 2):
+            if self.closed:
+                raise ConnectionError(f"client of the roll service at {self.host}:{self.port} is closed")
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self.connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                response = self.connection.getresponse()
+                data = json.loads(response.read())
+                break
+            except (OSError, http.client.HTTPException) as error:
+                self._disconnect()
+                if attempt == 2:
+                    raise ConnectionError(f"roll service at {self.host}:{self.port} is not reachable: {error}") from None
+        if response.status != 200:
+            raise ValueError(data.get("error", f"roll service error {response.status}"))
+        return data
+
+    def status(self):
+        """Return the service's status (its seed and batching statistics)."""
+        return self.request("GET", "/status")
+
+    def roll(self, requests):
+        """
+        Roll several sets in one request.
+
+        Parameters:
+            requests - List of (set index, dice expression text)
+
+        Returns:
+            The rolls as dicts, in the order of the requests
+
+        Raises:
+            ValueError if the service rejected one of the rolls
+        """
+        rolls = self.request("POST", "/roll", [{"set": index, "dice": text} for index, text in requests])
+        for roll in rolls:
+            if "error" in roll:
+                raise ValueError(roll["error"])
+        return rolls
+
+    def _disconnect(self):
+        """Close the connection (the next request opens a new one)."""
+        connection = self.connection
+        self.connection = None
+        if connection is not None:
+            connection.close()
+
+    def close(self):
+        """
+        Close the client. It may be called from another thread while a request is waiting for
+        the service: the socket is shut down, so that request fails at once instead of after
+        the timeout, and no new connection is opened.
+        """
+        self.closed = True
+        connection = self.connection
+        if connection is not None and connection.sock is not None:
+            try:
+                connection.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._disconnect()
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, seed=None):
+    """Run a roll service until the task is cancelled."""
+    roll_server = RollServer(RollService(seed))
+    server = await roll_server.start(host, port)
+    print(f"Roll service on {host}:{port}, seed {roll_server.service.seed}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    """Run the roll service from the command line."""
+    parser = argparse.ArgumentParser(description="Local roll service for several dice displays.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="address to listen on (localhost by default)")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="port to listen on")
+    parser.add_argument("--seed", type=int, default=None, help="session seed of the roll streams")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.seed))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,175 @@
+"""
+Widget-free model of dice set configurations, and bulk import of sets from CSV or JSON files.
+
+The range rules of a set are defined here once: the IntEntry fields of the settings panels use
+the same bounds, and set_plan applies them to plain values, so a file with thousands of sets
+is validated without creating a single widget. validate_rows checks all rows in one pass and
+reports every invalid row, not only the first one.
+
+A CSV file has a header row with the columns name, count, sides, dice_color, number_color and
+notation; a JSON file holds a list of objects with the same keys. Only count and sides (or
+notation instead of both) are required:
+
+    name,count,sides,dice_color,number_color,notation
+    Table 1,3,6,white,black,
+    Table 2,,,#ffd700,#000000,4d6kh3+2
+"""
+import csv                                         # CSV files
+import json                                        # JSON files
+import os                                          # File extensions
+import re                                          # Color syntax
+from collections import namedtuple                 # Lightweight record for set configurations
+
+# Configuration of one set:
+#   name         - Name of the set (shown on its roll button)
+#   count        - Number of dice (None if not given, e.g. when notation is used)
+#   sides        - Number of sides on each die (None if not given)
+#   dice_color   - Background color of the dice faces
+#   number_color - Color of the numbers or pips
+#   notation     - Dice notation such as "4d6kh3+2" that replaces count and sides ("" for none)
+SetConfig = namedtuple("SetConfig", ["name", "count", "sides", "dice_color", "number_color", "notation"],
+                       defaults=[None, None, "white", "black", ""])
+
+# Bounds of the Dice Count and Dice Sides fields (inclusive)
+COUNT_BOUNDS = (1, 12)
+SIDES_BOUNDS = (2, 50)
+# Limits of a set given by notation: the results view shows up to 12 dice, and the roll log
+# stores sides as one byte
+MAX_NOTATION_DICE = 12
+MAX_NOTATION_SIDES = 255
+# Largest number of sets in one imported file
+MAX_IMPORT_SETS = 10_000
+# Columns of an import file
+COLUMNS = SetConfig._fields
+# Tk color syntax: #RGB, #RRGGBB, #RRRGGGBBB, #RRRRGGGGBBBB or a color name
+COLOR_PATTERN = re.compile(r"#(?:[0-9a-fA-F]{3}){1,4}|[A-Za-z][A-Za-z0-9 ]*")
+
+
+def set_plan(count, sides, notation=""):
+    """
+    Return the compiled dice expression (dice_expr.Plan) of a set: its notation if one was
+    given, otherwise "<count>d<sides>". Plans are memoized, so this is cheap on every roll.
+
+    Raises ValueError with a message for the user if a value is missing or outside the
+    allowed ranges, or if the notation is invalid or outside the limits of a set.
+    """
+    import dice_expr
+    text = (notation or "").strip()
+    if not text:
+        if (count is None or sides is None or not SIDES_BOUNDS[0] <= sides <= SIDES_BOUNDS[1]
+                or not COUNT_BOUNDS[0] <= count <= COUNT_BOUNDS[1]):
+            raise ValueError(f"Please enter valid values for sides ({SIDES_BOUNDS[0]}-{SIDES_BOUNDS[1]})"
+                             f" and dice count ({COUNT_BOUNDS[0]}-{COUNT_BOUNDS[1]}).")
+        return dice_expr.compile_expression(f"{count}d{sides}")
+    plan = dice_expr.compile_expression(text)
+    if (not 1 <= plan.dice_count <= MAX_NOTATION_DICE
+            or any(term.sides > MAX_NOTATION_SIDES for term in plan.terms)):
+        raise ValueError(f"The notation {text!r} must roll 1 to {MAX_NOTATION_DICE} dice"
+                         f" with at most {MAX_NOTATION_SIDES} sides.")
+    return plan
+
+
+def _int_field(row, key):
+    """Return the integer in a row's field (None if it is empty or missing)."""
+    value = row.get(key)
+    if value is None or value == "":
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, str)):
+        raise ValueError(f"{key} must be a whole number, not {value!r}")
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be a whole number, not {value!r}") from None
+
+
+def validate_rows(rows, is_color=None):
+    """
+    Validate set definitions in one pass.
+
+    Parameters:
+        rows     - Iterable of dicts with the keys of SetConfig (values may be strings)
+        is_color - Optional function that returns True if a color name is valid (e.g. one
+                   that asks Tk); by default only the syntax is checked
+
+    Returns:
+        A tuple (configs, errors): configs is the list of SetConfig of the valid rows, errors
+        a list of (row number, message) with row numbers starting at 1
+    """
+    configs = []
+    errors = []
+    # Rows usually share a few colors and notations, so each is only checked once
+    checked_colors = {}
+    checked_plans = {}
+    for number, row in enumerate(rows, 1):
+        try:
+            if not isinstance(row, dict):
+                raise ValueError("a set must be an object with the set's fields")
+            count = _int_field(row, "count")
+            sides = _int_field(row, "sides")
+            notation = str(row.get("notation") or "").strip()
+            key = (count, sides, notation)
+            error = checked_plans.get(key)
+            if error is None:
+                try:
+                    set_plan(count, sides, notation)
+                    error = ""
+                except ValueError as plan_error:
+                    error = str(plan_error)
+                checked_plans[key] = error
+            if error:
+                raise ValueError(error)
+            colors = []
+            for field, default in (("dice_color", "white"), ("number_color", "black")):
+                color = str(row.get(field) or default).strip()
+                valid = checked_colors.get(color)
+                if valid is None:
+                    valid = checked_colors[color] = (COLOR_PATTERN.fullmatch(color) is not None
+                                                     and (is_color is None or is_color(color)))
+                if not valid:
+                    raise ValueError(f"{field} {color!r} is not a color")
+                colors.append(color)
+            name = str(row.get("name") or f"Set {number}").strip()
+            configs.append(SetConfig(name, count, sides, colors[0], colors[1], notation))
+        except ValueError as error:
+            errors.append((number, str(error)))
+    if len(configs) > MAX_IMPORT_SETS:
+        errors.append((MAX_IMPORT_SETS + 1, f"a file can hold at most {MAX_IMPORT_SETS} sets"))
+    return configs, errors
+
+
+def read_rows(path):
+    """
+    Read the set definitions of a CSV or JSON file (chosen by the extension).
+
+    Raises:
+        ValueError if the file is not a CSV or JSON file of set definitions
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        with open(path, encoding="utf-8") as file:
+            try:
+                rows = json.load(file)
+            except json.JSONDecodeError as error:
+                raise ValueError(f"{os.path.basename(path)} is not valid JSON: {error}") from None
+        if not isinstance(rows, list):
+            raise ValueError(f"{os.path.basename(path)} must hold a list of sets")
+        return rows
+    if extension == ".csv":
+        with open(path, encoding="utf-8-sig", newline="") as file:
+            reader = csv.DictReader(file)
+            unknown = set(reader.fieldnames or ()) - set(COLUMNS)
+            if unknown:
+                raise ValueError(f"unknown columns in {os.path.basename(path)}: {', '.join(sorted(unknown))}"
+                                 f" (expected {', '.join(COLUMNS)})")
+            return list(reader)
+    raise ValueError(f"cannot import {os.path.basename(path)}: expected a .csv or .json file")
+
+
+def load_sets(path, is_color=None):
+    """
+    Read and validate the sets of a CSV or JSON file.
+
+    Returns:
+        A tuple (configs, errors) like validate_rows
+    """
+    return validate_rows(read_rows(path), is_color)
@@ -0,0 +1,146 @@
+"""
+Headless Monte Carlo simulation of dice-set configurations.
+
+Trials are split into fixed-size shards that run in a ProcessPoolExecutor. Every shard gets its
+own child of a numpy SeedSequence (SeedSequence.spawn), so a simulation is reproducible for a given
+seed no matter how many worker processes are used. Workers only return a histogram of the totals of
+each set; the raw rolls never leave the worker, and the partial histograms are summed in the parent.
+"""
+import math                                        # Math for calculations (e.g. ceil)
+import os                                          # CPU count for the default number of workers
+import time                                        # Timing for the trials/sec report
+from collections import namedtuple                 # Lightweight record for set definitions
+from concurrent.futures import ProcessPoolExecutor # Worker processes
+import numpy as np                                 # Vectorized rolls and histograms
+import dice_engine                                 # Vectorized dice rolling engine
+
+# A dice set with optional house rules:
+#   keep_highest - if set, only the highest keep_highest dice count towards the total
+#   reroll_ones  - if True, every die showing 1 is rerolled once
+SimulationSet = namedtuple("SimulationSet", ["count", "sides", "keep_highest", "reroll_ones"],
+                           defaults=[None, False])
+
+# Number of trials in one shard (the unit of work of a worker process)
+SHARD_TRIALS = 250_000
+# Number of trials rolled at once inside a shard, which bounds the worker's memory use
+CHUNK_TRIALS = 50_000
+
+
+def max_total(sim_set):
+    """Return the highest total a set can roll."""
+    kept = sim_set.count if sim_set.keep_highest is None else min(sim_set.keep_highest, sim_set.count)
+    return kept * sim_set.sides
+
+
+def set_totals(sim_set, trials, rng):
+    """
+    Roll one set trials times and return the total of every trial after the house rules.
+
+    Parameters:
+        sim_set - The SimulationSet to roll
+        trials  - Number of trials
+        rng     - NumPy Generator to use
+    """
+    rolls = dice_engine.roll_dice(sim_set.count, sim_set.sides, trials, rng)
+    if sim_set.reroll_ones:
+        ones = rolls == 1
+        rolls[ones] = rng.integers(1, sim_set.sides + 1, size=int(ones.sum()), dtype=rolls.dtype)
+    if sim_set.keep_highest is not None and sim_set.keep_highest < sim_set.count:
+        # Move the highest dice to the end of each row without fully sorting it
+        k = sim_set.keep_highest
+        rolls = np.partition(rolls, sim_set.count - k, axis=1)[:, -k:]
+    return rolls.sum(axis=1, dtype=np.int64)
+
+
+def _simulate_shard(sim_sets, trials, seed_sequence):
+    """Run one shard in a worker and return one histogram of totals per set."""
+    rng = np.random.default_rng(seed_sequence)
+    histograms = [np.zeros(max_total(s) + 1, dtype=np.int64) for s in sim_sets]
+    remaining = trials
+    while remaining > 0:
+        n = min(CHUNK_TRIALS, remaining)
+        for histogram, sim_set in zip(histograms, sim_sets):
+            histogram += np.bincount(set_totals(sim_set, n, rng), minlength=len(histogram))
+        remaining -= n
+    return histograms
+
+
+def _merge(sim_sets, partials):
+    """Sum the per-shard histograms as they arrive."""
+    histograms = [np.zeros(max_total(s) + 1, dtype=np.int64) for s in sim_sets]
+    for partial in partials:
+        for histogram, part in zip(histograms, partial):
+            histogram += part
+    return histograms
+
+
+class SimulationResult:
+    """Merged outcome of a simulation: one histogram of totals per set plus timing."""
+    def __init__(self, sim_sets, trials, histograms, elapsed, workers):
+        self.sim_sets = sim_sets
+        self.trials = trials
+        # histograms[i][t] is the number of trials in which set i rolled the total t
+        self.histograms = histograms
+        self.elapsed = elapsed
+        self.workers = workers
+
+    @property
+    def trials_per_sec(self):
+        """Simulated trials per second of wall-clock time."""
+        return self.trials / self.elapsed if self.elapsed > 0 else float("inf")
+
+    def mean(self, index):
+        """Return the mean total of the set with the given index."""
+        histogram = self.histograms[index]
+        return float(np.dot(np.arange(len(histogram)), histogram) / self.trials)
+
+    def report(self):
+        """Return a short human-readable summary."""
+        lines = [f"{self.trials:,} trials in {self.elapsed:.2f} s with {self.workers} worker(s)"
+                 f" = {self.trials_per_sec:,.0f} trials/sec"]
+        for i, s in enumerate(self.sim_sets):
+            lines.append(f"  set {i + 1}: {s.count}d{s.sides}"
+                         f"{f' keep {s.keep_highest}' if s.keep_highest is not None else ''}"
+                         f"{' reroll 1s' if s.reroll_ones else ''}"
+                         f"  mean total {self.mean(i):.3f}")
+        return "\n".join(lines)
+
+
+def simulate(sim_sets, trials, workers=None, seed=None):
+    """
+    Simulate trials rolls of all sets, sharded across worker processes.
+
+    Parameters:
+        sim_sets - List of SimulationSet (or (count, sides) pairs)
+        trials   - Total number of trials
+        workers  - Number of worker processes (default: number of CPUs); 1 runs in-process
+        seed     - Seed for the root SeedSequence (None for a random one)
+
+    Returns:
+        A SimulationResult
+
+    Raises:
+        ValueError if a set is invalid (including keep_highest below 1) or trials is below 1
+    """
+    if trials < 1:
+        raise ValueError(f"trials must be at least 1, not {trials}")
+    sim_sets = [s if isinstance(s, SimulationSet) else SimulationSet(*s) for s in sim_sets]
+    for s in sim_sets:
+        dice_engine.check_set(s.count, s.sides)
+        if s.keep_highest is not None and s.keep_highest < 1:
+            raise ValueError(f"keep highest must be at least 1, not {s.keep_highest}")
+    workers = workers or os.cpu_count() or 1
+    # The shard layout only depends on trials, so the result only depends on the seed
+    n_shards = max(1, math.ceil(trials / SHARD_TRIALS))
+    shard_trials = [SHARD_TRIALS] * (n_shards - 1) + [trials - SHARD_TRIALS * (n_shards - 1)]
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_shards)
+
+    start = time.perf_counter()
+    args = ([sim_sets] * n_shards, shard_trials, seed_sequences)
+    if workers == 1:
+        histograms = _merge(sim_sets, map(_simulate_shard, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            histograms = _merge(sim_sets, executor.map(_simulate_shard, *args))
+    elapsed = time.perf_counter() - start
+    return SimulationResult(sim_sets, trials, histograms, elapsed, workers)
@@ -0,0 +1,135 @@
+"""
+Exact probability distributions of dice totals.
+
+The probability mass function (PMF) of the sum of N dice with S sides is the N-th power of the
+polynomial (x + x^2 + ... + x^S) / S. It is computed by exponentiation by squaring, where each
+polynomial product is a convolution: small ones use numpy.convolve, large ones use an FFT.
+Distributions are memoized on (count, sides), and on the whole pool for mixed pools, so showing
+the odds of a total again costs only a lookup.
+"""
+from functools import lru_cache                    # Memoization of computed distributions
+import numpy as np                                 # Convolutions and FFTs
+
+# Above this number of output coefficients the product is computed with an FFT
+FFT_THRESHOLD = 2048
+
+
+def convolve(a, b):
+    """
+    Return the product of two polynomials given as coefficient arrays.
+
+    Uses direct convolution for small inputs and an FFT for large ones.
+    """
+    n = len(a) + len(b) - 1
+    if n <= FFT_THRESHOLD or min(len(a), len(b)) < 32:
+        return np.convolve(a, b)
+    result = np.fft.irfft(np.fft.rfft(a, n) * np.fft.rfft(b, n), n)
+    # Round-off of the FFT can produce tiny negative probabilities
+    np.maximum(result, 0, out=result)
+    return result
+
+
+def _freeze(array):
+    """Mark an array read-only, because memoized arrays are shared between callers."""
+    array.flags.writeable = False
+    return array
+
+
+@lru_cache(maxsize=256)
+def sum_pmf(count, sides):
+    """
+    Return the exact PMF of the sum of count dice with the given number of sides.
+
+    Parameters:
+        count - Number of dice (at least 1)
+        sides - Number of sides on each die (at least 2)
+
+    Returns:
+        A read-only float array of length count * (sides - 1) + 1, where index i is the
+        probability of the total count + i
+    """
+    if count < 1 or sides < 2:
+        raise ValueError("count must be at least 1 and sides at least 2")
+    # PMF of one die, shifted so that index 0 is the face 1
+    return _freeze(power_pmf(np.full(sides, 1.0 / sides), count))
+
+
+def power_pmf(pmf, count):
+    """
+    Return the PMF of the sum of count independent values that each have the given PMF.
+
+    Parameters:
+        pmf   - Probabilities of one value, where index i is the probability of the lowest value + i
+        count - Number of values (at least 1)
+
+    Returns:
+        A float array where index i is the probability of count times the lowest value + i
+    """
+    power = np.asarray(pmf, dtype=float)
+    result = None
+    n = count
+    # Exponentiation by squaring: O(log count) polynomial products
+    while n:
+        if n & 1:
+            result = power if result is None else convolve(result, power)
+        n >>= 1
+        if n:
+            power = convolve(power, power)
+    # Renormalize to remove accumulated rounding error
+    return result / result.sum()
+
+
+@lru_cache(maxsize=64)
+def _pool_distribution(pools):
+    """Return (minimum total, PMF, CDF) for a normalized tuple of (count, sides) pairs."""
+    pmf = None
+    for count, sides in pools:
+        part = sum_pmf(count, sides)
+        pmf = part if pmf is None else convolve(pmf, part)
+    pmf = pmf / pmf.sum()
+    cdf = np.minimum(np.cumsum(pmf), 1.0)
+    min_total = sum(count for count, _ in pools)
+    return min_total, _freeze(pmf), _freeze(cdf)
+
+
+def _normalize_pools(pools):
+    """Merge pools with the same number of sides and return them as a sorted tuple."""
+    counts = {}
+    for count, sides in pools:
+        counts[sides] = counts.get(sides, 0) + count
+    return tuple(sorted((count, sides) for sides, count in counts.items()))
+
+
+def pool_pmf(pools):
+    """
+    Return the exact distribution of the total of a mixed dice pool.
+
+    Parameters:
+        pools - List of (count, sides) pairs, e.g. one pair per configured set
+
+    Returns:
+        A tuple (min_total, pmf) where pmf[i] is the probability of the total min_total + i
+    """
+    min_total, pmf, _ = _pool_distribution(_normalize_pools(pools))
+    return min_total, pmf
+
+
+def total_odds(total, pools):
+    """
+    Return the probability of rolling exactly total and its percentile.
+
+    Parameters:
+        total - The rolled total
+        pools - List of (count, sides) pairs that were rolled
+
+    Returns:
+        A tuple (probability, percentile), where percentile is the percentage of rolls
+        with a total less than or equal to total
+    """
+    min_total, pmf, cdf = _pool_distribution(_normalize_pools(pools))
+    i = total - min_total
+    if i < 0:
+        return 0.0, 0.0
+    if i >= len(pmf):
+        return 0.0, 100.0
+    return float(pmf[i]), float(cdf[i]) * 100
@@ -0,0 +1,115 @@
+"""
+Background worker for the GUI's rolls and face rasterization.
+
+Tk widgets may only be used from the thread that runs the main loop, but rolling and
+rasterizing faces with Matplotlib do not need Tk. The CoalescingWorker runs such jobs in one
+daemon thread and hands their results back through a queue that the Tk thread drains from a
+root.after callback.
+
+Jobs are submitted under a key (e.g. the index of a set). Only the latest pending job per key
+is kept: a job that is replaced before the worker started it is dropped, so rapid clicks on
+the same set cost one job instead of one per click. Every result carries the generation of
+its job, so the Tk thread can tell if a newer job for the same key was submitted meanwhile.
+"""
+import queue                                       # Results handed back to the Tk thread
+import threading                                   # The worker thread
+from collections import deque                      # Keys in submission order
+
+
+class CoalescingWorker:
+    """
+    One worker thread that runs the latest job per key.
+
+    Pending keys run in the order of their first submission. A job that replaces a pending
+    job keeps that job's place in the queue, so it can run before a job for another key
+    that was submitted earlier than itself. A key that is submitted again and again still
+    gets its turn and is never pushed back behind the others. is_latest only compares jobs of
+    the same key; callers that need the submission order across keys number their jobs
+    themselves (as poll_worker in dice-en.py does per set).
+    """
+
+    def __init__(self, name="dice-worker"):
+        """
+        Parameters:
+            name - Name of the worker thread
+        """
+        self._condition = threading.Condition()
+        # Latest pending job per key, and the keys with a pending job in submission order
+        self._pending = {}
+        self._order = deque()
+        # Generation of the latest submitted job per key
+        self._generations = {}
+        # Number of jobs submitted but not yet handed back
+        self._outstanding = 0
+        self._closed = False
+        self.results = queue.SimpleQueue()
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, key, job):
+        """
+        Run job() in the worker thread, replacing a pending job with the same key (the new
+        job takes over the pending job's place in the queue).
+
+        Returns:
+            The generation of the job (increases with every submission for the key)
+        """
+        with self._condition:
+            generation = self._generations.get(key, 0) + 1
+            self._generations[key] = generation
+            if key in self._pending:
+                # The replaced job never runs, so its result is not waited for either
+                self.dropped += 1
+            else:
+                self._order.append(key)
+                self._outstanding += 1
+            self._pending[key] = (generation, job)
+            self._condition.notify()
+        return generation
+
+    def is_latest(self, key, generation):
+        """Return True if no newer job was submitted for key after the given generation."""
+        return self._generations.get(key) == generation
+
+    def busy(self):
+        """Return True while submitted jobs have not been handed back through results."""
+        return self._outstanding > 0
+
+    def drain(self):
+        """
+        Return all results that are ready, as (key, generation, result, error) tuples in the
+        order they finished. Call from the Tk thread.
+        """
+        finished = []
+        while True:
+            try:
+                finished.append(self.results.get_nowait())
+            except queue.Empty:
+                break
+        with self._condition:
+            self._outstanding -= len(finished)
+        return finished
+
+    def close(self):
+        """Stop the worker thread after the current job; pending jobs are dropped."""
+        with self._condition:
+            self._closed = True
+            self._pending.clear()
+            self._order.clear()
+            self._condition.notify()
+
+    def _run(self):
+        """Take the oldest pending job, run it and put its result on the queue."""
+        while True:
+            with self._condition:
+                while not self._order and not self._closed:
+                    self._condition.wait()
+                if self._closed:
+                    return
+                key = self._order.popleft()
+                generation, job = self._pending.pop(key)
+            try:
+                self.results.put((key, generation, job(), None))
+            except Exception as error:
+                self.results.put((key, generation, None, error))
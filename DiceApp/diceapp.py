@@ -0,0 +1,277 @@
+"""
+Command line interface for the dice engine (no display needed).
+
+Usage (from the DiceApp folder):
+    python -m diceapp roll --set attack=3d6 --set damage=2d20 --rolls 1000000 --format json
+    python -m diceapp simulate --set stats=4d6kh3 --set save=1d20r1 --trials 10000000
+    python -m diceapp export --set attack=3d6 --rolls 1000 --out images --image-format png
+    python -m diceapp replay --seed 1234 --set-number 2 --roll 17 --set 3d6
+    python -m diceapp gui
+
+A set is given as NAME=COUNTdSIDES (the name is optional). For simulations a set can also use
+the house rules kh<N> (keep the N highest dice) and r1 (reroll ones once). replay takes any dice
+notation of the GUI (see dice_expr), e.g. NAME=4d6kh3+2.
+
+Results are streamed to standard output as newline-delimited JSON or CSV. Rolls are generated
+in chunks and passed through a pipeline of generators, so memory use does not grow with the
+number of rolls. The export command writes one image of the dice grid per roll and set
+(rendered offscreen, so no display is needed).
+"""
+import argparse                                    # Command line parsing
+import csv                                         # CSV output
+import json                                        # JSON output
+import os                                          # Path of the GUI script
+import re                                          # Parsing of set definitions
+import runpy                                       # Running the GUI script
+import sys                                         # Standard output and error streams
+import time                                        # Timing for the export report
+import dice_engine                                 # Vectorized dice rolling engine
+
+# Dice generated per chunk; small enough that converting a chunk to Python values stays cheap
+CLI_CHUNK_DICE = 1 << 16
+# NAME=COUNTdSIDES with the optional house rules kh<N> and r1
+SET_PATTERN = re.compile(r"^(?:(?P<name>[^=]+)=)?(?P<count>\d+)d(?P<sides>\d+)"
+                         r"(?:kh(?P<keep>\d+))?(?P<reroll>r1)?$")
+
+
+def parse_set(text, index):
+    """
+    Parse one set definition.
+
+    Parameters:
+        text  - The definition, e.g. "attack=3d6" or "4d6kh3"
+        index - Position of the set, used for the default name
+
+    Returns:
+        A tuple (name, count, sides, keep_highest, reroll_ones)
+
+    Raises:
+        argparse.ArgumentTypeError if the definition is invalid; kh<N> must keep 1 to COUNT
+        dice (a larger N is rejected rather than clamped, as it is most likely a typo)
+    """
+    match = SET_PATTERN.match(text.strip())
+    if match is None:
+        raise argparse.ArgumentTypeError(f"invalid set definition {text!r} (expected NAME=COUNTdSIDES)")
+    count = int(match["count"])
+    sides = int(match["sides"])
+    try:
+        dice_engine.check_set(count, sides)
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid set definition {text!r}: {error}")
+    keep = int(match["keep"]) if match["keep"] else None
+    if keep is not None and not 1 <= keep <= count:
+        raise argparse.ArgumentTypeError(f"invalid set definition {text!r}: kh must keep 1 to {count} dice")
+    return match["name"] or f"set{index + 1}", count, sides, keep, bool(match["reroll"])
+
+
+def replay_roll(text, seed, set_number, roll_number):
+    """
+    Regenerate a roll of a set in the GUI (or the roll service) from the session seed.
+
+    Parameters:
+        text        - The set as NAME=DICE, where DICE is COUNTdSIDES or any dice notation of
+                      the GUI (e.g. "4d6kh3+2"); the name is optional
+        seed        - Session seed shown in the results view
+        set_number  - Number of the set (1 for Set 1)
+        roll_number - Roll number shown in the set's cell
+
+    Returns:
+        A tuple (name, faces, total)
+
+    Raises:
+        ValueError if the dice are not valid for a set
+    """
+    import dice_sets
+    name, _, notation = text.strip().rpartition("=")
+    plan = dice_sets.set_plan(None, None, notation)
+    # Set n is rolled from the stream with id n - 1, with the generator at the start of the roll
+    generator = dice_engine.RollStream(seed, set_number - 1).generator_at(roll_number)
+    faces, totals = plan.evaluate(1, generator)
+    return name or "set1", faces[0].tolist(), int(totals[0])
+
+
+def roll_records(sets, n_rolls, seed=None, chunk_dice=CLI_CHUNK_DICE):
+    """
+    Yield one record per roll and set: (roll number, set name, faces, total).
+
+    Parameters:
+        sets       - List of parsed set definitions
+        n_rolls    - Number of rolls of all sets
+        seed       - Seed of the random number generator
+        chunk_dice - Number of dice generated per chunk
+    """
+    pairs = [(count, sides) for _, count, sides, _, _ in sets]
+    names = [name for name, _, _, _, _ in sets]
+    offsets = dice_engine.set_offsets(pairs)
+    rng = dice_engine.make_rng(seed)
+    roll_number = 0
+    for chunk in dice_engine.roll_chunks(pairs, n_rolls, rng, chunk_dice):
+        totals = dice_engine.set_sums(chunk, pairs).tolist()
+        for row, row_totals in zip(chunk.tolist(), totals):
+            roll_number += 1
+            for name, (count, _), offset, total in zip(names, pairs, offsets, row_totals):
+                yield roll_number, name, row[offset:offset + count], total
+
+
+def histogram_records(sets, trials, workers=None, seed=None):
+    """
+    Run a Monte Carlo simulation and yield one record per set and total:
+    (set name, total, number of trials, probability).
+    """
+    import dice_simulate
+    sim_sets = [dice_simulate.SimulationSet(count, sides, keep, reroll)
+                for _, count, sides, keep, reroll in sets]
+    result = dice_simulate.simulate(sim_sets, trials, workers, seed)
+    print(result.report(), file=sys.stderr)
+    for (name, *_), histogram in zip(sets, result.histograms):
+        for total in histogram.nonzero()[0].tolist():
+            yield name, total, int(histogram[total]), int(histogram[total]) / trials
+
+
+def export_jobs(sets, n_rolls, out_dir, image_format, seed=None):
+    """
+    Yield one dice_export.ExportJob per roll and set, named <roll>-<set>.<format> in out_dir.
+    Dice with up to 6 sides are drawn with pips, like in the GUI.
+    """
+    from dice_export import ExportJob
+    sides = {name: set_sides for name, _, set_sides, _, _ in sets}
+    width = len(str(n_rolls))
+    for roll_number, name, faces, total in roll_records(sets, n_rolls, seed):
+        path = os.path.join(out_dir, f"{roll_number:0{width}d}-{name}.{image_format}")
+        yield ExportJob(path, faces, use_dots=sides[name] <= 6, title=f"{name}: {total}")
+
+
+def format_json(records, fields):
+    """Turn records into newline-delimited JSON lines."""
+    for record in records:
+        yield json.dumps(dict(zip(fields, record))) + "\n"
+
+
+def format_csv(records, fields):
+    """Turn records into CSV lines (list values are joined with spaces)."""
+    class LineBuffer:
+        """File-like object that keeps the last line written by csv.writer."""
+        line = ""
+
+        def write(self, text):
+            self.line = text
+
+    buffer = LineBuffer()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(fields)
+    yield buffer.line
+    for record in records:
+        writer.writerow([" ".join(map(str, value)) if isinstance(value, list) else value
+                         for value in record])
+        yield buffer.line
+
+
+def write_lines(lines, stream):
+    """Write lines to the stream, stopping quietly if the reader goes away (e.g. | head)."""
+    try:
+        for line in lines:
+            stream.write(line)
+        stream.flush()
+    except BrokenPipeError:
+        # Keep Python from complaining again when stdout is closed at exit
+        sys.stdout = None
+
+
+def build_parser():
+    """Create the argument parser with the roll, simulate and gui commands."""
+    parser = argparse.ArgumentParser(prog="python -m diceapp", description="Dice roller engine.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_common(command):
+        command.add_argument("--set", dest="sets", action="append", required=True, metavar="NAME=NdS",
+                             help="a dice set, e.g. attack=3d6 (repeat for several sets)")
+        command.add_argument("--seed", type=int, default=None, help="seed of the random number generator")
+        command.add_argument("--format", choices=["json", "csv"], default="json", help="output format")
+
+    roll = commands.add_parser("roll", help="roll the sets and stream every roll")
+    add_common(roll)
+    roll.add_argument("--rolls", type=int, default=1, help="number of rolls of all sets")
+    roll.add_argument("--chunk-dice", type=int, default=CLI_CHUNK_DICE,
+                      help="number of dice generated at once")
+
+    simulate = commands.add_parser("simulate", help="simulate the sets and stream the histogram of totals")
+    add_common(simulate)
+    simulate.add_argument("--trials", type=int, default=1_000_000, help="number of trials")
+    simulate.add_argument("--workers", type=int, default=None, help="number of worker processes")
+
+    replay = commands.add_parser("replay", help="regenerate a roll of a set in the GUI from its seed")
+    replay.add_argument("--set", dest="sets", action="append", required=True, metavar="NAME=DICE",
+                        help="the dice set as in the GUI, e.g. attack=3d6 or stats=4d6kh3")
+    replay.add_argument("--seed", type=int, required=True, help="session seed shown in the results view")
+    replay.add_argument("--set-number", type=int, required=True, help="number of the set (1 for Set 1)")
+    replay.add_argument("--roll", type=int, required=True, help="roll number shown in the set's cell")
+    replay.add_argument("--format", choices=["json", "csv"], default="json", help="output format")
+
+    export = commands.add_parser("export", help="roll the sets and write an image of every roll")
+    export.add_argument("--set", dest="sets", action="append", required=True, metavar="NAME=NdS",
+                        help="a dice set, e.g. attack=3d6 (repeat for several sets)")
+    export.add_argument("--seed", type=int, default=None, help="seed of the random number generator")
+    export.add_argument("--rolls", type=int, default=1, help="number of rolls of all sets")
+    export.add_argument("--out", default=".", help="output directory")
+    export.add_argument("--image-format", choices=["png", "svg"], default="png", help="image format")
+    export.add_argument("--dpi", type=int, default=100, help="resolution of PNG images")
+    export.add_argument("--workers", type=int, default=1,
+                        help="number of threads or worker processes (0 for one per CPU)")
+    export.add_argument("--pool", choices=["process", "thread"], default="process",
+                        help="kind of worker pool")
+
+    commands.add_parser("gui", help="start the graphical dice roller")
+    return parser
+
+
+def main(argv=None):
+    """Run the command line interface."""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.command == "gui":
+        runpy.run_path(os.path.join(os.path.dirname(os.path.abspath(__file__)), "dice-en.py"),
+                       run_name="__main__")
+        return 0
+
+    if args.command == "replay":
+        if len(args.sets) != 1 or args.set_number < 1 or args.roll < 0:
+            parser.error("replay needs one --set, a --set-number of at least 1 and a --roll of at least 0")
+        try:
+            name, faces, total = replay_roll(args.sets[0], args.seed, args.set_number, args.roll)
+        except ValueError as error:
+            parser.error(f"invalid set definition {args.sets[0]!r}: {error}")
+        formatter = format_json if args.format == "json" else format_csv
+        write_lines(formatter([(args.roll, name, faces, total)], ["roll", "set", "faces", "total"]), sys.stdout)
+        return 0
+
+    try:
+        sets = [parse_set(text, i) for i, text in enumerate(args.sets)]
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+    if args.command != "simulate" and any(keep is not None or reroll for _, _, _, keep, reroll in sets):
+        parser.error("house rules (kh, r1) are only supported by simulate")
+    if args.command == "export":
+        import dice_export
+        if any(count > dice_export.MAX_DICE for _, count, _, _, _ in sets):
+            parser.error(f"export draws at most {dice_export.MAX_DICE} dice per image")
+        start = time.perf_counter()
+        written = dice_export.export_rolls(
+            export_jobs(sets, args.rolls, args.out, args.image_format, args.seed),
+            args.workers, args.pool, args.dpi)
+        elapsed = time.perf_counter() - start
+        print(f"{written:,} images written to {args.out} in {elapsed:.2f} s"
+              f" = {written / elapsed * 60 if elapsed > 0 else 0:,.0f} images/min", file=sys.stderr)
+        return 0
+    if args.command == "roll":
+        fields = ["roll", "set", "faces", "total"]
+        records = roll_records(sets, args.rolls, args.seed, args.chunk_dice)
+    else:
+        fields = ["set", "total", "count", "probability"]
+        records = histogram_records(sets, args.trials, args.workers, args.seed)
+    formatter = format_json if args.format == "json" else format_csv
+    write_lines(formatter(records, fields), sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
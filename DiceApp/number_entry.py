@@ -54,6 +54,11 @@ class _NumberEntry(Entry):
             (self.register(self.__validate_all), "%V", "%s", "%P")
         self.config(**kwargs)
         self._original_style = {"bg": self["bg"], "fg": self["fg"]}
+        # The visual state that is currently configured in Tk. Keeping
+        # track of it avoids a Tcl round-trip on every keystroke when
+        # the style or the validate mode doesn't change.
+        self.__validate_mode = "focusin"
+        self.__showing_error = False
 
     # Each time a _NumberEntry gets the keyboard focus,
     # select all the text in that entry.
@@ -79,13 +84,28 @@ class _NumberEntry(Entry):
         return valid
 
     def __focus_in(self, current_text):
-        self.config({"validate": "all"})
+        self.__set_validate_mode("all")
         return self.__validate_focus(current_text)
 
     def __focus_out(self, current_text):
-        self.config({"validate": "focusin"})
+        self.__set_validate_mode("focusin")
         return self.__validate_focus(current_text)
 
+    def __set_validate_mode(self, mode):
+        """Configure the validate option only if it changes."""
+        if mode != self.__validate_mode:
+            self.config({"validate": mode})
+            self.__validate_mode = mode
+
+    def _show_valid(self, valid):
+        """Show the normal or the error style, configuring the
+        entry only if the style changes.
+        """
+        if valid == self.__showing_error:
+            style = self._original_style if valid else _NumberEntry._ERROR_STYLE
+            self.config(style)
+            self.__showing_error = not valid
+
     def __validate_focus(self, current_text):
         valid = False
         try:
@@ -93,8 +113,7 @@ class _NumberEntry(Entry):
             valid = self._in_bounds(n)
         except ValueError:
             pass
-        style = self._original_style if valid else _NumberEntry._ERROR_STYLE
-        self.config(style)
+        self._show_valid(valid)
         return valid
 
     def _in_bounds(self, n):
@@ -119,8 +138,8 @@ class _NumberEntry(Entry):
 
     def clear(self):
         """Clear the entry and reset validation style."""
-        self.config({"validate": "focusin"})
-        self.config(self._original_style)
+        self.__set_validate_mode("focusin")
+        self._show_valid(True)
         self.delete(0, tk.END)
 
 class IntEntry(_NumberEntry):
@@ -155,8 +174,7 @@ class IntEntry(_NumberEntry):
             except ValueError:
                 pass
 
-        style = self._original_style if valid else _NumberEntry._ERROR_STYLE
-        self.config(style)
+        self._show_valid(valid)
         return allowed
 
     @staticmethod
@@ -214,8 +232,7 @@ class FloatEntry(_NumberEntry):
             except ValueError:
                 pass
 
-        style = self._original_style if valid else _NumberEntry._ERROR_STYLE
-        self.config(style)
+        self._show_valid(valid)
         return allowed
 
     @staticmethod